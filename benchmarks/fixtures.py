@@ -0,0 +1,704 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+"""synthetic input generators for the loader benchmarks"""
+
+from datetime import datetime, timedelta
+import json
+import math
+import os
+import random
+import sqlite3
+import zipfile
+
+SWOB_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<om:ObservationCollection
+    xmlns="http://dms.ec.gc.ca/schema/point-observation/2.0"
+    xmlns:gml="http://www.opengis.net/gml"
+    xmlns:om="http://www.opengis.net/om/1.0"
+    xmlns:xlink="http://www.w3.org/1999/xlink"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <om:member>
+    <om:Observation>
+      <om:metadata>
+        <set>
+          <general>
+            <author build="build.4063" name="MSC-DMS-PG-WXO-Summary"
+                    version="2.4"/>
+            <dataset
+                name="mscobservation/atmospheric/surface_weather/ca-1.1-ascii/"/>
+            <phenomenon name=""/>
+          </general>
+          <identification-elements>
+            <element name="stn_nam" uom="unitless" value="STATION {station}"/>
+            <element name="tc_id" uom="unitless" value="{station}"/>
+            <element name="date_tm" uom="datetime" value="{date}"/>
+            <element name="stn_elev" uom="m" value="{elevation}"/>
+            <element name="msc_id" uom="unitless" value="{msc_id}"/>
+            <element name="lat" uom="deg" value="{lat}"/>
+            <element name="long" uom="deg" value="{lon}"/>
+          </identification-elements>
+        </set>
+      </om:metadata>
+      <om:samplingTime>
+        <gml:TimeInstant>
+          <gml:timePosition>{date}</gml:timePosition>
+        </gml:TimeInstant>
+      </om:samplingTime>
+      <om:resultTime>
+        <gml:TimeInstant>
+          <gml:timePosition>{date}</gml:timePosition>
+        </gml:TimeInstant>
+      </om:resultTime>
+      <om:procedure
+        xlink:href="msc/observation/atmospheric/surface_weather/ca-1.1-ascii"/>
+      <om:result>
+        <elements>
+{elements}
+        </elements>
+      </om:result>
+    </om:Observation>
+  </om:member>
+</om:ObservationCollection>
+'''
+
+CITYPAGE_TEMPLATE = '''<?xml version="1.0" encoding="ISO-8859-1"?>
+<siteData>
+  <location>
+    <name code="{sitecode}" lat="{lat}N" lon="{lon}W">City {n}</name>
+  </location>
+  <currentConditions>
+    <station code="yyz" lat="{lat}N" lon="{lon}W">Airport {n}</station>
+    <dateTime name="observation" zone="UTC" UTCOffset="0">
+      <timeStamp>20201010120000</timeStamp>
+    </dateTime>
+    <condition>Mostly Cloudy</condition>
+    <iconCode format="gif">03</iconCode>
+    <temperature unitType="metric" units="C">{temp}</temperature>
+    <dewpoint unitType="metric" units="C">2.1</dewpoint>
+    <windChill unitType="metric">-3</windChill>
+    <pressure unitType="metric" units="kPa" change="0.05"
+              tendency="rising">101.5</pressure>
+    <relativeHumidity units="%">71</relativeHumidity>
+    <wind>
+      <speed unitType="metric" units="km/h">20</speed>
+      <gust unitType="metric" units="km/h">35</gust>
+      <direction>NW</direction>
+      <bearing units="degrees">315.0</bearing>
+    </wind>
+  </currentConditions>
+</siteData>
+'''
+
+CAP_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<alert xmlns="urn:oasis:names:tc:emergency:cap:1.2">
+  <identifier>urn:oid:2.49.0.1.124.{n}.2020</identifier>
+  <sender>cap-pac@canada.ca</sender>
+  <sent>2020-10-10T12:00:00-00:00</sent>
+  <status>Actual</status>
+  <msgType>Update</msgType>
+  <scope>Public</scope>
+  <references>cap-pac@canada.ca,urn:oid:2.49.0.1.124.{previous}.2020,2020-10-10T11:00:00-00:00</references>
+{infos}
+</alert>
+'''
+
+CAP_INFO_TEMPLATE = '''  <info>
+    <language>{language}</language>
+    <category>Met</category>
+    <event>wind</event>
+    <effective>2020-10-10T12:00:00-00:00</effective>
+    <expires>{expires}</expires>
+    <headline>{headline}</headline>
+    <description>
+      Strong winds are expected.
+    </description>
+    <parameter><valueName>layer:EC-MSC-SMC:1.0:Alert_Type</valueName><value>warning</value></parameter>
+    <parameter><valueName>layer:EC-MSC-SMC:1.0:Broadcast_Intrusive</valueName><value>no</value></parameter>
+    <parameter><valueName>layer:EC-MSC-SMC:1.0:Alert_Location_Status</valueName><value>active</value></parameter>
+    <parameter><valueName>layer:EC-MSC-SMC:1.0:Alert_Name</valueName><value>wind</value></parameter>
+    <parameter><valueName>layer:EC-MSC-SMC:1.0:Alert_Coverage</valueName><value>x</value></parameter>
+    <parameter><valueName>layer:EC-MSC-SMC:1.0:Designation_Code</valueName><value>WW</value></parameter>
+{areas}
+  </info>'''
+
+CAP_AREA_TEMPLATE = '''    <area>
+      <areaDesc>Area {area}</areaDesc>
+      <polygon>{polygon}</polygon>
+      <geocode><valueName>layer:EC-MSC-SMC:1.0:CLC</valueName><value>{area}</value></geocode>
+    </area>'''
+
+
+def _random_point():
+    """random coordinates within Canada"""
+
+    lon = round(random.uniform(-140, -53), 4)
+    lat = round(random.uniform(42, 70), 4)
+
+    return lon, lat
+
+
+def generate_swob(directory, scale=1):
+    """
+    generate SWOB-ML files with ~100 result elements each
+
+    :param directory: output directory
+    :param scale: size multiplier
+
+    :returns: `int` of number of files generated
+    """
+
+    count = 1000 * scale
+    directory = os.path.join(directory, 'observations', 'swob-ml')
+    os.makedirs(directory, exist_ok=True)
+
+    for i in range(count):
+        elements = []
+        for j in range(100):
+            value = random.choice([str(round(random.uniform(-40, 40), 1)),
+                                   str(random.randint(0, 100)), 'MSNG'])
+            qualifiers = ('<qualifier name="qa_summary" uom="unitless" '
+                          'value="100"/>')
+            if j % 10 == 0:
+                qualifiers += ('<qualifier name="data_flag" uom="unitless" '
+                               'value="5" code-src="std_code_src"/>')
+            elements.append(
+                '          <element name="elem_{}" uom="°C" value="{}">'
+                '{}</element>'.format(j, value, qualifiers))
+
+        lon, lat = _random_point()
+        filename = '2020-10-10-{:04d}-C{:03d}-AUTO-swob.xml'.format(
+            i % 1440, i)
+        with open(os.path.join(directory, filename), 'w') as fh:
+            fh.write(SWOB_TEMPLATE.format(
+                station='C{:03d}'.format(i), date='2020-10-10T00:00:00.000Z',
+                elevation=random.randint(0, 2000), msc_id=1000000 + i,
+                lat=lat, lon=lon, elements='\n'.join(elements)))
+
+    return count
+
+
+def generate_hydrometric(directory, scale=1):
+    """
+    generate a hydrometric station list (in <directory>/cache) and hourly
+    realtime CSV files of 5-minute observations over the last day
+
+    :param directory: output directory
+    :param scale: size multiplier
+
+    :returns: `int` of number of files generated
+    """
+
+    count = 200 * scale
+    cache = os.path.join(directory, 'cache')
+    csv_dir = os.path.join(directory, 'hydrometric', 'csv', 'ON', 'hourly')
+    os.makedirs(cache, exist_ok=True)
+    os.makedirs(csv_dir, exist_ok=True)
+
+    stations = ['02HA{:03d}'.format(i) for i in range(count)]
+
+    with open(os.path.join(cache, 'hydrometric_StationList.csv'), 'w') as fh:
+        fh.write('ID,Name,Latitude,Longitude,Prov/Terr,Timezone\n')
+        for station in stations:
+            lon, lat = _random_point()
+            fh.write('{},"RIVER {}",{},{},ON,UTC-05:00\n'.format(
+                station, station, lat, lon))
+
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    start -= timedelta(hours=24)
+
+    for station in stations:
+        filename = 'ON_{}_hourly_hydrometric.csv'.format(station)
+        with open(os.path.join(csv_dir, filename), 'w') as fh:
+            fh.write('ID,Date,Water Level / Niveau d\'eau (m),Grade,'
+                     'Symbol / Symbole,QA/QC,Discharge / Débit (cms),'
+                     'Grade,Symbol / Symbole,QA/QC\n')
+            for step in range(288):
+                date = start + timedelta(minutes=5 * step)
+                fh.write('{},{}-05:00,{:.3f},,,1,{:.2f},,,1\n'.format(
+                    station, date.strftime('%Y-%m-%dT%H:%M:%S'),
+                    random.uniform(0, 10), random.uniform(0, 500)))
+
+    return count
+
+
+def generate_citypage(directory, scale=1):
+    """
+    generate citypage weather XML files (English and French) and the
+    matching lib/msc_pygeoapi/resources/wxo_lookup.json
+
+    :param directory: output directory (MSC_PYGEOAPI_BASEPATH)
+    :param scale: size multiplier
+
+    :returns: `int` of number of files generated
+    """
+
+    count = 500 * scale
+    resources = os.path.join(directory, 'lib', 'msc_pygeoapi', 'resources')
+    xml_dir = os.path.join(directory, 'citypage_weather', 'xml', 'ON')
+    os.makedirs(resources, exist_ok=True)
+    os.makedirs(xml_dir, exist_ok=True)
+
+    lookup = {}
+    for i in range(count):
+        sitecode = 's{:07d}'.format(i)
+        lookup[sitecode] = {'citycode': 'on-{}'.format(i)}
+        lon, lat = _random_point()
+        for language in ['e', 'f']:
+            filename = '{}_{}.xml'.format(sitecode, language)
+            with open(os.path.join(xml_dir, filename), 'w',
+                      encoding='ISO-8859-1') as fh:
+                fh.write(CITYPAGE_TEMPLATE.format(
+                    sitecode=sitecode, lat=lat, lon=-lon, n=i,
+                    temp=round(random.uniform(-30, 30), 1)))
+
+    with open(os.path.join(resources, 'wxo_lookup.json'), 'w') as fh:
+        json.dump(lookup, fh)
+
+    return count * 2
+
+
+def generate_cap(directory, scale=1):
+    """
+    generate CAP alert XML files with English and French info blocks
+    covering 10 areas each
+
+    :param directory: output directory
+    :param scale: size multiplier
+
+    :returns: `int` of number of files generated
+    """
+
+    count = 200 * scale
+    cap_dir = os.path.join(directory, 'alerts', 'cap', '20201010', 'CWUL',
+                           '12')
+    os.makedirs(cap_dir, exist_ok=True)
+
+    expires = (datetime.utcnow() + timedelta(days=1)).strftime(
+        '%Y-%m-%dT%H:%M:%S-00:00')
+
+    for i in range(count):
+        areas = []
+        for area in range(10):
+            lon, lat = _random_point()
+            ring = [(lat, lon), (lat + 0.5, lon), (lat + 0.5, lon + 0.5),
+                    (lat, lon + 0.5), (lat, lon)]
+            areas.append(CAP_AREA_TEMPLATE.format(
+                area=i * 10 + area,
+                polygon=' '.join('{},{}'.format(*pt) for pt in ring)))
+
+        infos = [CAP_INFO_TEMPLATE.format(
+            language=language, expires=expires, headline=headline,
+            areas='\n'.join(areas))
+            for language, headline in [('en-CA', 'wind warning'),
+                                       ('fr-CA', 'avertissement de vent')]]
+
+        filename = 'T_WOCN{:04d}_C_CWUL_202010101200_{}.cap'.format(i, i)
+        with open(os.path.join(cap_dir, filename), 'w') as fh:
+            fh.write(CAP_TEMPLATE.format(n=i, previous=i + count,
+                                         infos='\n'.join(infos)))
+
+    return count
+
+
+def generate_hydat(directory, scale=1):
+    """
+    generate a HYDAT SQLite database with the tables used by the loader
+
+    :param directory: output directory
+    :param scale: size multiplier
+
+    :returns: `str` of path to the SQLite database
+    """
+
+    stations = 20 * scale
+    years = range(1990, 2020)
+    db = os.path.join(directory, 'Hydat.sqlite3')
+    os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(db)
+    _create_daily_tables(conn)
+    conn.executescript('''
+        CREATE TABLE STATIONS (STATION_NUMBER TEXT PRIMARY KEY,
+            STATION_NAME TEXT, PROV_TERR_STATE_LOC TEXT,
+            REGIONAL_OFFICE_ID TEXT, HYD_STATUS TEXT, SED_STATUS TEXT,
+            LATITUDE REAL, LONGITUDE REAL, DRAINAGE_AREA_GROSS REAL,
+            DRAINAGE_AREA_EFFECT REAL, RHBN INTEGER, REAL_TIME INTEGER,
+            CONTRIBUTOR_ID INTEGER, OPERATOR_ID INTEGER, DATUM_ID INTEGER);
+        CREATE TABLE DATA_SYMBOLS (SYMBOL_ID TEXT PRIMARY KEY,
+            SYMBOL_EN TEXT, SYMBOL_FR TEXT);
+        CREATE TABLE DATA_TYPES (DATA_TYPE TEXT PRIMARY KEY,
+            DATA_TYPE_EN TEXT, DATA_TYPE_FR TEXT);
+        CREATE TABLE ANNUAL_STATISTICS (STATION_NUMBER TEXT,
+            DATA_TYPE TEXT, YEAR INTEGER, MEAN REAL, MIN_MONTH INTEGER,
+            MIN_DAY INTEGER, MIN REAL, MIN_SYMBOL TEXT, MAX_MONTH INTEGER,
+            MAX_DAY INTEGER, MAX REAL, MAX_SYMBOL TEXT,
+            PRIMARY KEY (STATION_NUMBER, DATA_TYPE, YEAR));
+        CREATE TABLE ANNUAL_INSTANT_PEAKS (STATION_NUMBER TEXT,
+            DATA_TYPE TEXT, YEAR INTEGER, PEAK_CODE TEXT,
+            PRECISION_CODE INTEGER, MONTH INTEGER, DAY INTEGER,
+            HOUR INTEGER, MINUTE INTEGER, TIME_ZONE TEXT, PEAK REAL,
+            SYMBOL TEXT,
+            PRIMARY KEY (STATION_NUMBER, DATA_TYPE, YEAR, PEAK_CODE));
+        CREATE TABLE AGENCY_LIST (AGENCY_ID INTEGER PRIMARY KEY,
+            AGENCY_EN TEXT, AGENCY_FR TEXT);
+        CREATE TABLE DATUM_LIST (DATUM_ID INTEGER PRIMARY KEY,
+            DATUM_EN TEXT, DATUM_FR TEXT);
+        CREATE TABLE STN_STATUS_CODES (STATUS_CODE TEXT PRIMARY KEY,
+            STATUS_EN TEXT, STATUS_FR TEXT);
+        CREATE TABLE PRECISION_CODES (PRECISION_CODE INTEGER PRIMARY KEY,
+            PRECISION_EN TEXT, PRECISION_FR TEXT);
+        CREATE TABLE PEAK_CODES (PEAK_CODE TEXT PRIMARY KEY, PEAK_EN TEXT,
+            PEAK_FR TEXT);
+    ''')
+
+    symbols = [('B', 'Ice Conditions', 'Conditions à glace'),
+               ('E', 'Estimated', 'Estimé'),
+               ('A', 'Partial Day', 'Journée incomplète')]
+    conn.executemany('INSERT INTO DATA_SYMBOLS VALUES (?, ?, ?)', symbols)
+    conn.executemany('INSERT INTO DATA_TYPES VALUES (?, ?, ?)', [
+        ('Q', 'Flow', 'Débit'), ('H', 'Water Level', 'Niveaux d\'eau')])
+    conn.executemany('INSERT INTO AGENCY_LIST VALUES (?, ?, ?)', [
+        (1, 'Agency', 'Agence')])
+    conn.executemany('INSERT INTO DATUM_LIST VALUES (?, ?, ?)', [
+        (1, 'Assumed Datum', 'Datum arbitraire')])
+    conn.executemany('INSERT INTO STN_STATUS_CODES VALUES (?, ?, ?)', [
+        ('A', 'Active', 'Active'), ('D', 'Discontinued', 'Fermée')])
+    conn.executemany('INSERT INTO PRECISION_CODES VALUES (?, ?, ?)', [
+        (8, 'Precision to 3 decimal places', 'Précision à 3 décimales')])
+    conn.executemany('INSERT INTO PEAK_CODES VALUES (?, ?, ?)', [
+        ('H', 'Maximum', 'Maximale'), ('L', 'Minimum', 'Minimale')])
+
+    symbol_ids = [None, None, None, '', 'B', 'E', 'A']
+    flow_sql = 'INSERT INTO DLY_FLOWS VALUES ({})'.format(
+        ', '.join(['?'] * 73))
+    level_sql = 'INSERT INTO DLY_LEVELS VALUES ({})'.format(
+        ', '.join(['?'] * 74))
+
+    for i in range(stations):
+        station = '{:02d}AB{:03d}'.format(i % 12, i)
+        lon, lat = _random_point()
+        conn.execute('INSERT INTO STATIONS VALUES '
+                     '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                     (station, 'RIVER {}'.format(station), 'ON', '1',
+                      random.choice(['A', 'D']), None, lat, lon, 100.0,
+                      None, 0, 0, 1, 1, 1))
+
+        for year in years:
+            for month in range(1, 13):
+                no_days = 28 if month == 2 else (
+                    30 if month in (4, 6, 9, 11) else 31)
+                flows = []
+                levels = []
+                for day in range(1, 32):
+                    valid = day <= no_days
+                    flows.extend([
+                        random.uniform(0, 500) if valid else None,
+                        random.choice(symbol_ids) if valid else None])
+                    levels.extend([
+                        random.uniform(0, 10) if valid else None,
+                        random.choice(symbol_ids) if valid else None])
+
+                conn.execute(flow_sql, [station, year, month, 1, no_days,
+                                        random.uniform(0, 500), None, 1,
+                                        0.0, 1, 0.0] + flows)
+                if month % 2:
+                    conn.execute(level_sql, [station, year, month, 8, 1,
+                                             no_days, random.uniform(0, 10),
+                                             None, 1, 0.0, 1, 0.0] + levels)
+
+            for data_type in ['Q', 'H']:
+                conn.execute('INSERT INTO ANNUAL_STATISTICS VALUES '
+                             '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                             (station, data_type, year, 1.0, 3, 12, 0.5,
+                              random.choice(symbol_ids), 5, 2, 9.5,
+                              random.choice(symbol_ids)))
+                for peak_code in ['H', 'L']:
+                    conn.execute('INSERT INTO ANNUAL_INSTANT_PEAKS VALUES '
+                                 '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                 (station, data_type, year, peak_code, 8, 4,
+                                  21, 13, 45, 'EST', 5.5,
+                                  random.choice(symbol_ids)))
+
+    conn.commit()
+    conn.close()
+
+    return db
+
+
+def _create_daily_tables(conn):
+    """(re)create DLY_FLOWS and DLY_LEVELS with their 31 day columns"""
+
+    for table, word, extra in [('DLY_FLOWS', 'FLOW', ''),
+                               ('DLY_LEVELS', 'LEVEL',
+                                'PRECISION_CODE INTEGER, ')]:
+        days = ', '.join('{0}{1} REAL, {0}_SYMBOL{1} TEXT'.format(word, i)
+                         for i in range(1, 32))
+        conn.execute('DROP TABLE IF EXISTS {}'.format(table))
+        conn.execute(
+            'CREATE TABLE {} (STATION_NUMBER TEXT, YEAR INTEGER, '
+            'MONTH INTEGER, {}FULL_MONTH INTEGER, NO_DAYS INTEGER, '
+            'MONTHLY_MEAN REAL, MONTHLY_TOTAL REAL, FIRST_DAY_MIN INTEGER, '
+            'MIN REAL, FIRST_DAY_MAX INTEGER, MAX REAL, {}, '
+            'PRIMARY KEY (STATION_NUMBER, YEAR, MONTH))'.format(
+                table, extra, days))
+
+
+def generate_ahccd(directory, scale=1):
+    """
+    generate AHCCD GeoJSON files and the JSON locations file expected by
+    the ahccd command
+
+    :param directory: output directory
+    :param scale: size multiplier
+
+    :returns: `str` of path to the JSON locations file
+    """
+
+    stations = 100 * scale
+    os.makedirs(directory, exist_ok=True)
+
+    def feature(properties):
+        lon, lat = _random_point()
+        return {'type': 'Feature', 'properties': properties,
+                'geometry': {'type': 'Point', 'coordinates': [lon, lat]}}
+
+    datasets = {
+        'stations': [feature({'station_id__id_station': str(i),
+                              'station_name__nom_station': 'STN {}'.format(i)})
+                     for i in range(stations)],
+        'trends': [feature({'station_id__id_station': str(i),
+                            'period__periode': period,
+                            'measurement_type__type_mesure': 'temp_mean',
+                            'trend_value__valeur_tendance': 0.1})
+                   for i in range(stations) for period in ['Ann', 'Win']],
+        'annual': [feature({'identifier__identifiant': '{}.{}'.format(i, y),
+                            'temp_mean__temp_moyenne': 1.0})
+                   for i in range(stations) for y in range(1900, 2020)],
+        'seasonal': [feature({'identifier__identifiant': '{}.{}.{}'.format(
+                              i, y, s), 'temp_mean__temp_moyenne': 1.0})
+                     for i in range(stations) for y in range(1950, 2020)
+                     for s in ['Win', 'Spr', 'Smr', 'Fal']],
+        'monthly': [feature({'identifier__identifiant': '{}.{}.{:02d}'.format(
+                             i, y, m), 'year__annee': y,
+                             'temp_mean__temp_moyenne': 1.0})
+                    for i in range(stations) for y in range(1950, 2020)
+                    for m in range(1, 13)]
+    }
+
+    locations = {}
+    for name, features in datasets.items():
+        locations[name] = os.path.join(directory, '{}.json'.format(name))
+        with open(locations[name], 'w') as fh:
+            json.dump({'type': 'FeatureCollection', 'features': features}, fh)
+
+    path = os.path.join(directory, 'locations.json')
+    with open(path, 'w') as fh:
+        json.dump(locations, fh)
+
+    return path
+
+
+def generate_climate_archive(directory, scale=1):
+    """
+    generate a SQLite stand-in of the climate archive (CCCS_PORTAL) tables
+    used by the climate-archive command
+
+    :param directory: output directory
+    :param scale: size multiplier
+
+    :returns: `str` of path to the database
+    """
+
+    stations = 40 * scale
+    start = datetime(2000, 1, 1)
+    days = 3653
+    db = os.path.join(directory, 'climate_archive.sqlite3')
+    os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(db)
+    conn.executescript('''
+        CREATE TABLE STATION_INFORMATION (STN_ID INTEGER PRIMARY KEY,
+            STATION_NAME TEXT, PROV_STATE_TERR_CODE TEXT,
+            ENG_PROV_NAME TEXT, FRE_PROV_NAME TEXT, COUNTRY TEXT,
+            LATITUDE INTEGER, LONGITUDE INTEGER,
+            LATITUDE_DECIMAL_DEGREES REAL, LONGITUDE_DECIMAL_DEGREES REAL,
+            TIMEZONE TEXT, ELEVATION TEXT, CLIMATE_IDENTIFIER TEXT,
+            FIRST_DATE TEXT, LAST_DATE TEXT);
+        CREATE TABLE VALID_NORMALS_ELEMENTS (NORMAL_ID INTEGER PRIMARY KEY,
+            E_NORMAL_ELEMENT_NAME TEXT, F_NORMAL_ELEMENT_NAME TEXT,
+            PERIOD TEXT);
+        CREATE TABLE NORMAL_PERIODS (NORMAL_PERIOD_ID INTEGER PRIMARY KEY,
+            PERIOD_BEGIN INTEGER, PERIOD_END INTEGER);
+        CREATE TABLE NORMALS_DATA (STN_ID INTEGER, NORMAL_ID INTEGER,
+            MONTH INTEGER, NORMAL_PERIOD_ID INTEGER, VALUE REAL,
+            OCCURRENCE_COUNT INTEGER, PUBLICATION_CODE INTEGER,
+            NORMAL_CODE TEXT, DATE_CALCULATED TEXT,
+            FIRST_OCCURRENCE_DATE TEXT);
+        CREATE TABLE PUBLIC_CLIMATE_SUMMARY (STN_ID INTEGER,
+            CLIMATE_IDENTIFIER TEXT, STATION_NAME TEXT, LATITUDE INTEGER,
+            LONGITUDE INTEGER, LOCAL_YEAR INTEGER, LOCAL_MONTH INTEGER,
+            LOCAL_DATE TEXT, MEAN_TEMPERATURE REAL, TOTAL_PRECIPITATION REAL,
+            LAST_UPDATED TEXT);
+        CREATE TABLE PUBLIC_DAILY_DATA (STN_ID INTEGER,
+            CLIMATE_IDENTIFIER TEXT, STATION_NAME TEXT, SOURCE TEXT,
+            LOCAL_DATE TEXT, LOCAL_YEAR INTEGER, LOCAL_MONTH INTEGER,
+            LOCAL_DAY INTEGER, MAX_TEMPERATURE REAL, MIN_TEMPERATURE REAL,
+            MEAN_TEMPERATURE REAL, MEAN_TEMPERATURE_FLAG TEXT,
+            TOTAL_PRECIPITATION REAL, TOTAL_PRECIPITATION_FLAG TEXT);
+        CREATE INDEX PUBLIC_DAILY_DATA_IDX
+            ON PUBLIC_DAILY_DATA (STN_ID, LOCAL_DATE);
+    ''')
+
+    conn.executemany('INSERT INTO VALID_NORMALS_ELEMENTS VALUES (?, ?, ?, ?)',
+                     [(1, 'Mean daily temperature deg C',
+                       'Température moyenne quotidienne deg C', '1981-2010'),
+                      (56, 'Precipitation mm', 'Précipitation mm',
+                       '1981-2010')])
+    conn.execute('INSERT INTO NORMAL_PERIODS VALUES (?, ?, ?)',
+                 (1, 1981, 2010))
+
+    updated = '2020-01-01 00:00:00'
+    flags = [None, None, None, 'M', 'E']
+    daily_sql = 'INSERT INTO PUBLIC_DAILY_DATA VALUES ({})'.format(
+        ', '.join(['?'] * 14))
+
+    for stn_id in range(1, stations + 1):
+        identifier = '{:07d}'.format(1000000 + stn_id)
+        name = 'STATION {}'.format(stn_id)
+        lon, lat = _random_point()
+        conn.execute('INSERT INTO STATION_INFORMATION VALUES '
+                     '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                     (stn_id, name, 'ON ', 'ONTARIO', 'ONTARIO', 'CAN',
+                      int(lat * 1e7), int(lon * 1e7), lat, lon, 'EST',
+                      '100.0', identifier + ' ', '2000-01-01 00:00:00',
+                      '2009-12-31 00:00:00'))
+
+        for normal_id in [1, 56]:
+            conn.executemany('INSERT INTO NORMALS_DATA VALUES '
+                             '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                             [(stn_id, normal_id, month, 1,
+                               random.uniform(-20, 30), 30, 1, 'A',
+                               updated, None) for month in range(1, 14)])
+
+        conn.executemany('INSERT INTO PUBLIC_CLIMATE_SUMMARY VALUES '
+                         '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         [(stn_id, identifier, name, int(lat * 1e7),
+                           int(lon * 1e7), year, month,
+                           '{}-{:02d}-01 00:00:00'.format(year, month),
+                           random.uniform(-20, 30), random.uniform(0, 100),
+                           updated)
+                          for year in range(2000, 2010)
+                          for month in range(1, 13)])
+
+        rows = []
+        for day in range(days):
+            date = start + timedelta(days=day)
+            rows.append((stn_id, identifier, name, '1',
+                         date.strftime('%Y-%m-%d %H:%M:%S'), date.year,
+                         date.month, date.day, random.uniform(0, 30),
+                         random.uniform(-30, 0), random.uniform(-15, 15),
+                         random.choice(flags), random.uniform(0, 20),
+                         random.choice(flags)))
+        conn.executemany(daily_sql, rows)
+
+    conn.commit()
+    conn.close()
+
+    return db
+
+
+def generate_forecast_polygons(directory, scale=1):
+    """
+    generate a meteocode water geodata package (zip of shapefiles);
+    requires GDAL
+
+    :param directory: output directory
+    :param scale: size multiplier
+
+    :returns: `str` of path to the zip file
+    """
+
+    from osgeo import ogr, osr
+
+    count = 500 * scale
+    package = 'MSC_Geography_Pkg_V6_3_0_Water_Unproj'
+    shp_dir = os.path.join(directory, package)
+    os.makedirs(shp_dir, exist_ok=True)
+
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(4326)
+    driver = ogr.GetDriverByName('ESRI Shapefile')
+
+    fields = ['F_MARSTDZA', 'CLC', 'FEATURE_ID', 'NAME', 'NOM', 'PERIM_KM',
+              'AREA_KM2', 'KIND', 'USAGE', 'DEPICTN', 'PROVINCE_C',
+              'COUNTRY_C', 'WATRBODY_C']
+
+    for detail in ['coarse', 'detail']:
+        filename = os.path.join(
+            shp_dir, 'water_MarStdZone_{}_unproj.shp'.format(detail))
+        ds = driver.CreateDataSource(filename)
+        layer = ds.CreateLayer('zones', srs, ogr.wkbPolygon)
+        for field in fields:
+            layer.CreateField(ogr.FieldDefn(field, ogr.OFTString))
+        for field in ['POLY_ID', 'PRIME_ID']:
+            layer.CreateField(ogr.FieldDefn(field, ogr.OFTInteger))
+        for field in ['LAT_DD', 'LON_DD']:
+            layer.CreateField(ogr.FieldDefn(field, ogr.OFTReal))
+
+        for i in range(count):
+            lon, lat = _random_point()
+            feature = ogr.Feature(layer.GetLayerDefn())
+            for field in fields:
+                feature.SetField(field, '{}_{}'.format(field, i))
+            feature.SetField('FEATURE_ID', str(i))
+            feature.SetField('POLY_ID', i)
+            feature.SetField('PRIME_ID', i)
+            feature.SetField('LAT_DD', lat)
+            feature.SetField('LON_DD', lon)
+            # ~200 vertex ring, typical of coarse zone outlines
+            ring = ogr.Geometry(ogr.wkbLinearRing)
+            for step in range(200):
+                angle = step * 2 * math.pi / 200
+                ring.AddPoint_2D(lon + 0.5 * math.cos(angle),
+                                 lat + 0.5 * math.sin(angle))
+            ring.CloseRings()
+            polygon = ogr.Geometry(ogr.wkbPolygon)
+            polygon.AddGeometry(ring)
+            feature.SetGeometry(polygon)
+            layer.CreateFeature(feature)
+        ds = None
+
+    path = os.path.join(directory, '{}.zip'.format(package))
+    with zipfile.ZipFile(path, 'w') as zf:
+        for filename in os.listdir(shp_dir):
+            zf.write(os.path.join(shp_dir, filename),
+                     os.path.join(package, filename))
+
+    return path
@@ -0,0 +1,82 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+
+"""
+SQLite stand-in of the parts of the cx_Oracle API used by the climate
+archive loader, so that it can be benchmarked without an Oracle database.
+
+Connection strings have the Oracle form user/password@dsn, where dsn is the
+path to a SQLite database of the CCCS_PORTAL tables (e.g. as generated by
+`fixtures.generate_climate_archive`).  `install()` makes this module
+importable as cx_Oracle.
+"""
+
+import sqlite3
+import sys
+
+
+def connect(db):
+    """
+    connect to a SQLite stand-in of the CCCS_PORTAL schema
+
+    :param db: connection string (user/password@path)
+
+    :returns: `sqlite3.Connection`
+    """
+
+    con = sqlite3.connect(':memory:', check_same_thread=False)
+    con.execute('ATTACH DATABASE ? AS CCCS_PORTAL', (db.rsplit('@', 1)[-1],))
+    # dates are stored as 'YYYY-MM-DD HH24:MI:SS' text
+    con.create_function('TO_TIMESTAMP', 2, lambda value, format_: value)
+
+    return con
+
+
+class SessionPool(object):
+    """connections to a SQLite stand-in, with a session pool interface"""
+
+    def __init__(self, user, password, dsn, **kwargs):
+        self.db = '{}/{}@{}'.format(user, password, dsn)
+
+    def acquire(self):
+        return connect(self.db)
+
+    def release(self, con):
+        con.close()
+
+
+def install():
+    """
+    make this module importable as cx_Oracle
+
+    :returns: void
+    """
+
+    sys.modules['cx_Oracle'] = sys.modules[__name__]
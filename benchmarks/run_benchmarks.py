@@ -0,0 +1,324 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+
+"""
+loader benchmark suite
+
+Each benchmark generates a synthetic fixture, then runs the matching loader
+in a fresh interpreter against an in-process stub Elasticsearch endpoint,
+reporting documents/second, peak RSS and peak traced allocations per
+document.  Results are written as JSON so runs can be compared:
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --output after.json \
+        --compare before.json
+"""
+
+from datetime import datetime
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures  # noqa
+from stub_es import StubElasticsearch  # noqa
+
+LOGGER = logging.getLogger(__name__)
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (fixture generator, loader runner, file pattern for realtime loaders)
+BENCHMARKS = {
+    'swob_realtime': ('generate_swob', 'run_realtime', '**/*.xml'),
+    'hydrometric_realtime': ('generate_hydrometric', 'run_realtime',
+                             'hydrometric/**/*.csv'),
+    'citypageweather_realtime': ('generate_citypage', 'run_realtime',
+                                 'citypage_weather/**/*.xml'),
+    'cap_alerts_realtime': ('generate_cap', 'run_realtime', '**/*.cap'),
+    'forecast_polygons': ('generate_forecast_polygons', 'run_realtime',
+                          '*.zip'),
+    'hydat': ('generate_hydat', 'run_hydat', None),
+    'ahccd': ('generate_ahccd', 'run_ahccd', None),
+    'climate_archive': ('generate_climate_archive', 'run_climate_archive',
+                        None)
+}
+
+
+def run_realtime(name, fixture, pattern, es_url):
+    """run a realtime loader over every fixture file"""
+
+    from msc_pygeoapi.plugin import load_plugin, PLUGINS
+
+    loader = load_plugin('loader', PLUGINS['loader'][name])
+    files = sorted(glob.glob(os.path.join(fixture, pattern), recursive=True))
+
+    for filepath in files:
+        loader.load_data(filepath)
+
+
+def run_hydat(name, fixture, pattern, es_url):
+    """run the HYDAT loader against the fixture database"""
+
+    from msc_pygeoapi.loader.hydat import hydat
+
+    hydat.main(['--db', fixture, '--es', es_url, '--username', '',
+                '--password', '', '--dataset', 'all'], standalone_mode=False)
+
+
+def run_ahccd(name, fixture, pattern, es_url):
+    """run the AHCCD loader against the fixture locations file"""
+
+    from msc_pygeoapi.loader.ahccd import ahccd
+
+    ahccd.main(['--path', fixture, '--es', es_url, '--username', '',
+                '--password', '', '--dataset', 'all'], standalone_mode=False)
+
+
+def run_climate_archive(name, fixture, pattern, es_url):
+    """run the climate archive loader against the SQLite stand-in"""
+
+    import oracle_standin
+    oracle_standin.install()
+
+    from msc_pygeoapi.loader.climate_archive import climate_archive
+
+    db = 'benchmark/benchmark@{}'.format(fixture)
+
+    climate_archive.main(['--db', db, '--es', es_url, '--username', '',
+                          '--password', '', '--dataset', 'all'],
+                         standalone_mode=False)
+
+
+def _child(name, fixture, env, trace, queue):
+    """benchmark body, run in a spawned interpreter"""
+
+    import resource
+    import tracemalloc
+
+    os.environ.update(env)
+    sys.path.insert(0, REPO)
+    logging.disable(logging.CRITICAL)
+    # some loaders print progress to stdout
+    sys.stdout = open(os.devnull, 'w')
+
+    generator, runner, pattern = BENCHMARKS[name]
+    result = {}
+
+    try:
+        # import loaders before timing so module setup is not measured
+        from msc_pygeoapi.bulk import close_bulk_sinks
+
+        if trace:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        globals()[runner](name, fixture, pattern, env['MSC_PYGEOAPI_ES_URL'])
+        close_bulk_sinks()
+        result['seconds'] = time.perf_counter() - start
+
+        if trace:
+            result['alloc_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            maxrss /= 1024
+        result['peak_rss_mb'] = round(maxrss / 1024, 1)
+    except Exception as err:
+        result['error'] = '{}: {}'.format(type(err).__name__, err)
+
+    queue.put(result)
+
+
+def run_benchmark(name, fixture, stub, workdir, trace=False):
+    """
+    run a single benchmark in a spawned interpreter
+
+    :param name: benchmark name
+    :param fixture: path to generated fixture
+    :param stub: `StubElasticsearch` instance
+    :param workdir: working directory (MSC_PYGEOAPI_BASEPATH/CACHEDIR)
+    :param trace: whether to trace allocations (slows the run down)
+
+    :returns: `dict` of results
+    """
+
+    env = {
+        'MSC_PYGEOAPI_ES_URL': stub.url,
+        'MSC_PYGEOAPI_BASEPATH': workdir,
+        'MSC_PYGEOAPI_CACHEDIR': os.path.join(workdir, 'cache')
+    }
+
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+
+    stub.reset()
+    process = ctx.Process(target=_child,
+                          args=(name, fixture, env, trace, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+
+    result['docs'] = stub.stats['docs']
+    result['bulk_requests'] = stub.stats['bulk_requests']
+    result['bulk_bytes'] = stub.stats['bytes']
+
+    return result
+
+
+def measure(name, scale, workdir, stub, trace=True):
+    """
+    generate a fixture and measure its loader
+
+    :param name: benchmark name
+    :param scale: fixture size multiplier
+    :param workdir: working directory for fixtures
+    :param stub: `StubElasticsearch` instance
+    :param trace: whether to run a separate allocation tracing pass
+
+    :returns: `dict` of results
+    """
+
+    generator = getattr(fixtures, BENCHMARKS[name][0])
+    fixture_dir = os.path.join(workdir, name)
+
+    try:
+        fixture = generator(fixture_dir, scale)
+    except ImportError as err:
+        return {'skipped': 'missing dependency ({})'.format(err)}
+
+    if not isinstance(fixture, str):
+        fixture = fixture_dir
+
+    result = run_benchmark(name, fixture, stub, fixture_dir)
+    if 'error' in result:
+        return result
+
+    docs = result['docs']
+    result['docs_per_sec'] = round(docs / result['seconds'], 1)
+    result['seconds'] = round(result['seconds'], 3)
+
+    if trace:
+        traced = run_benchmark(name, fixture, stub, fixture_dir, trace=True)
+        if 'alloc_peak_bytes' in traced and docs:
+            result['alloc_peak_bytes_per_doc'] = round(
+                traced['alloc_peak_bytes'] / docs, 1)
+
+    return result
+
+
+def _commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    """print docs/sec and memory deltas against a previous results file"""
+
+    click.echo('{:<26}{:>14}{:>14}{:>9}{:>12}'.format(
+        'benchmark', 'docs/s before', 'docs/s after', 'change', 'RSS MB'))
+
+    for name, result in results['benchmarks'].items():
+        before = previous['benchmarks'].get(name, {})
+        if 'docs_per_sec' not in result or 'docs_per_sec' not in before:
+            continue
+        change = (result['docs_per_sec'] / before['docs_per_sec'] - 1) * 100
+        click.echo('{:<26}{:>14}{:>14}{:>+8.1f}%{:>12}'.format(
+            name, before['docs_per_sec'], result['docs_per_sec'], change,
+            '{} -> {}'.format(before.get('peak_rss_mb'),
+                              result['peak_rss_mb'])))
+
+
+@click.command()
+@click.option('--benchmark', '-b', 'names', multiple=True,
+              type=click.Choice(BENCHMARKS.keys()),
+              help='benchmark(s) to run (default: all)')
+@click.option('--scale', '-s', type=int, default=1,
+              help='fixture size multiplier')
+@click.option('--output', '-o', type=click.Path(dir_okay=False),
+              help='write JSON results to file')
+@click.option('--compare', '-c', 'previous',
+              type=click.File(encoding='utf-8'),
+              help='previous JSON results to compare against')
+@click.option('--workdir', '-w', type=click.Path(file_okay=False),
+              help='directory for generated fixtures (default: temporary)')
+@click.option('--no-trace', is_flag=True, default=False,
+              help='skip the allocation tracing pass')
+def benchmark(names, scale, output, previous, workdir, no_trace):
+    """Benchmark loaders against synthetic fixtures"""
+
+    names = names or list(BENCHMARKS.keys())
+
+    results = {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'scale': scale,
+        'benchmarks': {}
+    }
+
+    stub = StubElasticsearch().start()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in names:
+            click.echo('Running {}'.format(name))
+            result = measure(name, scale, workdir or tmpdir, stub,
+                             trace=not no_trace)
+            results['benchmarks'][name] = result
+            click.echo(json.dumps(result))
+
+    stub.stop()
+
+    if output is not None:
+        with open(output, 'w') as fh:
+            json.dump(results, fh, indent=4)
+
+    if previous is not None:
+        compare(results, json.load(previous))
+
+
+if __name__ == '__main__':
+    benchmark()
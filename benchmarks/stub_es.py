@@ -0,0 +1,182 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+"""in-process stub of the Elasticsearch endpoints used by the loaders"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+
+class StubElasticsearch(object):
+    """stub Elasticsearch server, accepting and counting bulk documents"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        """
+        initializer
+
+        :param host: host to bind to
+        :param port: port to bind to (0 picks a free port)
+
+        :returns: `benchmarks.stub_es.StubElasticsearch`
+        """
+
+        self.stats = {'requests': 0, 'bulk_requests': 0, 'docs': 0,
+                      'bytes': 0}
+        self.lock = threading.Lock()
+
+        handler = type('StubHandler', (StubHandler,), {'stub': self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+
+    @property
+    def url(self):
+        """URL of the stub endpoint"""
+
+        host, port = self.server.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def start(self):
+        """start serving in a background thread"""
+
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """stop serving"""
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        """reset counters"""
+
+        with self.lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def count(self, **kwargs):
+        """increment counters"""
+
+        with self.lock:
+            for key, value in kwargs.items():
+                self.stats[key] += value
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """request handler answering like Elasticsearch 7"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    stub = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        self.stub.count(requests=1, bytes=len(body))
+        return body
+
+    def _reply(self, status=200, body=None):
+        payload = json.dumps(body if body is not None else {}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('X-Elastic-Product', 'Elasticsearch')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(payload)
+
+    def do_HEAD(self):
+        self._read_body()
+        self._reply()
+
+    def do_GET(self):
+        self._read_body()
+        path = self.path.split('?')[0]
+
+        if path == '/':
+            self._reply(body={
+                'version': {'number': '7.10.0',
+                            'build_flavor': 'default'},
+                'tagline': 'You Know, for Search'
+            })
+        elif '/_doc/' in path:
+            self._reply(404, {'found': False})
+        else:
+            self._reply()
+
+    def do_PUT(self):
+        self._read_body()
+        self._reply(body={'acknowledged': True})
+
+    def do_DELETE(self):
+        self._read_body()
+        self._reply(body={'acknowledged': True})
+
+    def do_POST(self):
+        body = self._read_body()
+        path = self.path.split('?')[0]
+
+        if path.endswith('/_bulk'):
+            self._reply(body=self._bulk(body))
+        elif path.endswith(('/_delete_by_query', '/_update_by_query')):
+            self._reply(body={'deleted': 0, 'updated': 0, 'failures': []})
+        else:
+            self._reply(body={'acknowledged': True})
+
+    do_PATCH = do_POST
+
+    def _bulk(self, body):
+        items = []
+        lines = iter(body.splitlines())
+
+        for line in lines:
+            if not line.strip():
+                continue
+
+            op_type, meta = next(iter(json.loads(line).items()))
+            if op_type != 'delete':
+                next(lines, None)
+
+            result = 'deleted' if op_type == 'delete' else 'created'
+            items.append({op_type: {
+                '_index': meta.get('_index'),
+                '_id': meta.get('_id'),
+                'status': 200 if op_type == 'delete' else 201,
+                'result': result
+            }})
+
+        self.stub.count(bulk_requests=1, docs=len(items))
+
+        return {'took': 1, 'errors': False, 'items': items}
@@ -0,0 +1,343 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+import atexit
+import json
+import logging
+import os
+import threading
+from time import perf_counter
+
+from elasticsearch.helpers import expand_action
+
+from msc_pygeoapi.env import (MSC_PYGEOAPI_BULK_MAX_AGE,
+                              MSC_PYGEOAPI_BULK_MAX_BYTES,
+                              MSC_PYGEOAPI_BULK_MAX_DOCS)
+from msc_pygeoapi.metrics import observe
+from msc_pygeoapi.util import json_serial
+
+LOGGER = logging.getLogger(__name__)
+
+# process-lifetime bulk sinks, keyed by (pid, id(es))
+_BULK_SINKS = {}
+_BULK_SINKS_LOCK = threading.Lock()
+
+
+class BulkSink(object):
+    """buffered Elasticsearch bulk sink"""
+
+    def __init__(self, es, max_docs=MSC_PYGEOAPI_BULK_MAX_DOCS,
+                 max_bytes=MSC_PYGEOAPI_BULK_MAX_BYTES,
+                 max_age=MSC_PYGEOAPI_BULK_MAX_AGE, request_timeout=30):
+        """
+        initializer
+
+        :param es: `elasticsearch.Elasticsearch` object
+        :param max_docs: number of buffered documents triggering a flush
+        :param max_bytes: size of buffered request body triggering a flush
+        :param max_age: maximum time (seconds) a document stays buffered
+                        (0 disables time based flushing)
+        :param request_timeout: bulk request timeout (seconds)
+
+        :returns: `msc_pygeoapi.bulk.BulkSink`
+        """
+
+        self.es = es
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.request_timeout = request_timeout
+
+        self._lines = []
+        self._pending = []
+        self._bytes = 0
+        # documents rejected since last taken (see take_rejected)
+        self._rejected = 0
+        # serialization time of buffered actions, keyed by plugin
+        self._serialize = {}
+
+        # _lock guards the buffer, _send_lock keeps bulk requests in order
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self._flusher = None
+        if self.max_age > 0:
+            self._flusher = threading.Thread(target=self._run,
+                                             name='bulk-sink-flusher',
+                                             daemon=True)
+            self._flusher.start()
+
+    def add(self, action, on_error=None, plugin=None):
+        """
+        buffer a bulk API action, flushing if a size threshold is reached
+
+        :param action: `dict` of Elasticsearch bulk API action
+        :param on_error: callable invoked as `on_error(action, response)`
+                         for each document rejected by Elasticsearch
+        :param plugin: plugin name under which stage timings are recorded
+                       (optional)
+
+        :returns: `bool` of flush result if flushed, else `True` (the
+                  action is buffered, not yet indexed)
+        """
+
+        start = perf_counter()
+        meta, source = expand_action(action)
+
+        lines = [json.dumps(meta)]
+        if source is not None:
+            lines.append(json.dumps(source, default=json_serial))
+
+        elapsed = perf_counter() - start
+
+        with self._lock:
+            self._lines.extend(lines)
+            self._pending.append((action, on_error, plugin))
+            self._bytes += sum(len(line) + 1 for line in lines)
+            if plugin is not None:
+                self._serialize[plugin] = (
+                    self._serialize.get(plugin, 0.0) + elapsed)
+
+            # once closed, nothing flushes the buffer later on
+            full = any([len(self._pending) >= self.max_docs,
+                        self._bytes >= self.max_bytes,
+                        self._closed.is_set()])
+
+        if full:
+            return self.flush()
+
+        return True
+
+    def flush(self):
+        """
+        send all buffered actions to Elasticsearch in one bulk request
+
+        :returns: `bool` of whether all documents were accepted
+        """
+
+        with self._send_lock:
+            with self._lock:
+                if not self._pending:
+                    return True
+
+                lines, pending = self._lines, self._pending
+                self._lines, self._pending, self._bytes = [], [], 0
+                serialize, self._serialize = self._serialize, {}
+
+            for plugin, seconds in serialize.items():
+                observe(plugin, 'serialize', seconds)
+
+            return self._send(lines, pending)
+
+    def close(self):
+        """
+        stop time based flushing and flush remaining actions (actions
+        added afterwards are sent right away)
+
+        :returns: `bool` of final flush result
+        """
+
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+
+        return self.flush()
+
+    def _run(self):
+        """flush buffered actions every `max_age` seconds"""
+
+        while not self._closed.wait(self.max_age):
+            try:
+                self.flush()
+            except Exception as err:
+                LOGGER.error('Bulk flush failed: {}'.format(err))
+
+    def _send(self, lines, pending):
+        """
+        perform a bulk request and report rejected documents
+
+        :param lines: `list` of NDJSON lines
+        :param pending: `list` of (action, on_error, plugin) tuples, in line
+                        order
+
+        :returns: `bool` of whether all documents were accepted
+        """
+
+        body = '\n'.join(lines) + '\n'
+        plugins = set(plugin for _, _, plugin in pending
+                      if plugin is not None)
+
+        start = perf_counter()
+        try:
+            response = self.es.bulk(body=body,
+                                    request_timeout=self.request_timeout)
+        except Exception as err:
+            LOGGER.error('Unable to perform bulk request: {}'.format(err))
+            self._count_rejected(len(pending))
+            for action, on_error, _ in pending:
+                self._report(action, on_error, {'error': str(err)})
+            return False
+        finally:
+            elapsed = perf_counter() - start
+            for plugin in plugins:
+                observe(plugin, 'roundtrip', elapsed)
+
+        start = perf_counter()
+        counts = {}
+        fails = 0
+
+        for (action, on_error, _), item in zip(pending, response['items']):
+            result = next(iter(item.values()))
+            if 'error' in result or result.get('status', 200) >= 300:
+                fails += 1
+                self._report(action, on_error, item)
+            else:
+                status = result.get('result')
+                counts[status] = counts.get(status, 0) + 1
+
+        LOGGER.info('Inserted package of {} documents ({} inserts,'
+                    ' {} updates, {} no-ops, {} rejects)'
+                    .format(len(pending), counts.get('created', 0),
+                            counts.get('updated', 0), counts.get('noop', 0),
+                            fails))
+
+        if fails:
+            self._count_rejected(fails)
+
+        elapsed = perf_counter() - start
+        for plugin in plugins:
+            observe(plugin, 'ack', elapsed)
+
+        return fails == 0
+
+    def take_rejected(self):
+        """
+        get (and reset) the number of documents rejected since last called
+
+        :returns: `int` of rejected documents
+        """
+
+        with self._lock:
+            rejected, self._rejected = self._rejected, 0
+
+        return rejected
+
+    def _count_rejected(self, count):
+        """
+        count rejected documents
+
+        :param count: number of rejected documents
+
+        :returns: void
+        """
+
+        with self._lock:
+            self._rejected += count
+
+    @staticmethod
+    def _report(action, on_error, response):
+        """
+        report a rejected document to the loader that produced it
+
+        :param action: `dict` of rejected bulk API action
+        :param on_error: callable provided with the action, or `None`
+        :param response: `dict` of bulk API item response
+
+        :returns: void
+        """
+
+        if on_error is None:
+            LOGGER.warning('Document {} rejected: {}'.format(
+                action.get('_id'), response))
+            return
+
+        try:
+            on_error(action, response)
+        except Exception as err:
+            LOGGER.error('Error reporting rejected document: {}'.format(err))
+
+    def __repr__(self):
+        return '<BulkSink> {} pending'.format(len(self._pending))
+
+
+def get_bulk_sink(es):
+    """
+    helper function to return a process-wide bulk sink for a given
+    Elasticsearch connection, flushed automatically on exit
+
+    :param es: `elasticsearch.Elasticsearch` object
+
+    :returns: `msc_pygeoapi.bulk.BulkSink`
+    """
+
+    key = (os.getpid(), id(es))
+
+    # loaders may be called from several threads
+    with _BULK_SINKS_LOCK:
+        if key not in _BULK_SINKS:
+            LOGGER.debug('Creating bulk sink')
+            _BULK_SINKS[key] = BulkSink(es)
+
+        return _BULK_SINKS[key]
+
+
+def take_bulk_rejections():
+    """
+    get (and reset) the number of documents rejected by Elasticsearch in
+    the bulk sinks of the current process since last called
+
+    :returns: `int` of rejected documents
+    """
+
+    pid = os.getpid()
+
+    with _BULK_SINKS_LOCK:
+        sinks = [sink for key, sink in _BULK_SINKS.items() if key[0] == pid]
+
+    return sum(sink.take_rejected() for sink in sinks)
+
+
+def close_bulk_sinks():
+    """
+    flush and close all bulk sinks of the current process
+
+    :returns: `bool` of whether all final flushes succeeded
+    """
+
+    pid = os.getpid()
+
+    with _BULK_SINKS_LOCK:
+        sinks = [_BULK_SINKS.pop(key) for key in list(_BULK_SINKS)
+                 if key[0] == pid]
+
+    return all([sink.close() for sink in sinks])
+
+
+atexit.register(close_bulk_sinks)
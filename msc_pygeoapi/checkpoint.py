@@ -0,0 +1,273 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+# Long running archive loads record how far Elasticsearch has acknowledged
+# their (ordered) documents, so that an interrupted load can be resumed
+# rather than restarted.
+
+from collections import deque
+import json
+import logging
+import os
+
+LOGGER = logging.getLogger(__name__)
+
+
+def plan_partitions(keys, size):
+    """
+    split sorted keys into contiguous partitions, for a new load
+
+    :param keys: `list` of keys (e.g. station IDs)
+    :param size: number of keys per partition
+
+    :returns: `dict` of partition progress (first and last key, last
+              completed key and whether done) keyed by partition
+    """
+
+    keys = sorted(keys)
+    partitions = {}
+
+    for i in range(0, len(keys), size):
+        first, last = keys[i], keys[min(i + size, len(keys)) - 1]
+        partitions['{}-{}'.format(first, last)] = {
+            'first': first, 'last': last, 'completed': None, 'done': False
+        }
+
+    return partitions
+
+
+def remaining_keys(progress, keys):
+    """
+    list the keys of each partition still to load
+
+    :param progress: `dict` of dataset progress, with `partitions` as
+                     returned by `plan_partitions`
+    :param keys: `list` of keys (e.g. station IDs)
+
+    :returns: `list` of (partition, `list` of keys) tuples
+    """
+
+    keys = sorted(keys)
+    remaining = []
+
+    for partition, state in progress['partitions'].items():
+        if state['done']:
+            continue
+        remaining.append((partition, [
+            key for key in keys if state['first'] <= key <= state['last'] and
+            (state['completed'] is None or key > state['completed'])
+        ]))
+
+    return remaining
+
+
+class Checkpoint(object):
+    """progress of archive loads, per dataset, persisted to a JSON file"""
+
+    def __init__(self, filepath):
+        """
+        initializer
+
+        :param filepath: path to checkpoint file (created on first save)
+
+        :returns: `msc_pygeoapi.checkpoint.Checkpoint`
+        """
+
+        self.filepath = filepath
+        self.state = {}
+
+        if os.path.exists(filepath):
+            with open(filepath) as fh:
+                self.state = json.load(fh)
+
+    def get(self, dataset):
+        """
+        get the progress of a dataset
+
+        :param dataset: dataset name
+
+        :returns: `dict` of dataset progress, or `None` if not recorded
+        """
+
+        return self.state.get(dataset)
+
+    def set(self, dataset, progress):
+        """
+        record (and save) the progress of a dataset
+
+        :param dataset: dataset name
+        :param progress: `dict` of dataset progress (JSON serializable)
+
+        :returns: void
+        """
+
+        self.state[dataset] = progress
+        self.save()
+
+    def clear(self, dataset):
+        """
+        forget the progress of a (completed) dataset
+
+        :param dataset: dataset name
+
+        :returns: void
+        """
+
+        if self.state.pop(dataset, None) is not None:
+            self.save()
+
+    def tracker(self, dataset, progress, ordered=True):
+        """
+        create an acknowledgement tracker recording the progress of a
+        dataset in this checkpoint
+
+        :param dataset: dataset name
+        :param progress: `dict` of dataset progress, with `partitions` as
+                         returned by `plan_partitions`
+        :param ordered: whether actions are sent in key order within a
+                        partition (otherwise only completed partitions
+                        are recorded)
+
+        :returns: `msc_pygeoapi.checkpoint.AckTracker`
+        """
+
+        def on_progress(partition, key, done):
+            if not (ordered or done):
+                return
+            state = progress['partitions'][partition]
+            state['done'] = done
+            if ordered:
+                state['completed'] = key
+            self.set(dataset, progress)
+
+        return AckTracker(on_progress)
+
+    def save(self):
+        """
+        write the checkpoint file atomically
+
+        :returns: void
+        """
+
+        tmp_filepath = '{}.tmp'.format(self.filepath)
+
+        os.makedirs(os.path.dirname(self.filepath) or '.', exist_ok=True)
+        with open(tmp_filepath, 'w') as fh:
+            json.dump(self.state, fh)
+
+        os.replace(tmp_filepath, self.filepath)
+
+
+class AckTracker(object):
+    """
+    follows bulk actions of ordered partitions of a load (e.g. STN_ID
+    ranges) through Elasticsearch acknowledgements, reporting the last key
+    (e.g. STN_ID) of a partition whose actions were all acknowledged
+    """
+
+    def __init__(self, on_progress):
+        """
+        initializer
+
+        :param on_progress: function called with a partition, its last
+                            completed key and whether the partition is
+                            complete, as acknowledgements come in
+
+        :returns: `msc_pygeoapi.checkpoint.AckTracker`
+        """
+
+        self.on_progress = on_progress
+        # (partition, key) of actions sent and not yet acknowledged, and
+        # (partition, None) markers of partitions fully sent
+        self.pending = deque()
+        self.current = {}
+        self.failed = set()
+
+    def add(self, partition, key):
+        """
+        record an action about to be sent (in order)
+
+        :param partition: partition of the action
+        :param key: key of the action, in ascending order per partition
+
+        :returns: void
+        """
+
+        self.pending.append((partition, key))
+
+    def end(self, partition):
+        """
+        record that all actions of a partition were sent
+
+        :param partition: partition
+
+        :returns: void
+        """
+
+        self.pending.append((partition, None))
+        self._flush_markers()
+
+    def on_result(self, ok, response):
+        """
+        handle the result of the oldest pending action (called in order
+        by `msc_pygeoapi.util.submit_elastic_package`)
+
+        :param ok: whether the action succeeded
+        :param response: bulk API item response
+
+        :returns: void
+        """
+
+        partition, key = self.pending.popleft()
+
+        if not ok:
+            if partition not in self.failed:
+                LOGGER.warning('Partition {} failed at {}'.format(
+                    partition, key))
+            self.failed.add(partition)
+        elif partition not in self.failed:
+            previous = self.current.get(partition)
+            if previous is not None and previous != key:
+                self.on_progress(partition, previous, False)
+            self.current[partition] = key
+
+        self._flush_markers()
+
+    def _flush_markers(self):
+        """
+        complete partitions whose actions were all acknowledged
+
+        :returns: void
+        """
+
+        while self.pending and self.pending[0][1] is None:
+            partition = self.pending.popleft()[0]
+            if partition not in self.failed:
+                self.on_progress(partition, self.current.get(partition),
+                                 True)
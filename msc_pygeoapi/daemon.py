@@ -0,0 +1,385 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import json
+import logging
+import os
+import signal
+
+import click
+
+from msc_pygeoapi.env import MSC_PYGEOAPI_CACHEDIR
+
+LOGGER = logging.getLogger(__name__)
+
+# suffixes/prefixes of files still being written by sarracenia or others
+INFLIGHT_SUFFIXES = ('.tmp', '.part')
+INFLIGHT_PREFIXES = ('.',)
+
+# files the loaders keep in MSC_PYGEOAPI_CACHEDIR, never dispatched
+CACHE_FILES = ('hydrometric_StationList.csv', 'swob-xml_station_list.csv',
+               'hydat-checkpoint.json', 'hydat-manifest.sqlite3',
+               'climate_archive-checkpoint.json')
+
+# whether init_worker ran in this (worker) process
+_WORKER_INITIALIZED = False
+
+
+def init_worker():
+    """
+    worker process initialization (on its first file), ensuring buffered
+    bulk requests are flushed and stage timings written when the worker
+    exits
+
+    :returns: void
+    """
+
+    global _WORKER_INITIALIZED
+
+    if _WORKER_INITIALIZED:
+        return
+    _WORKER_INITIALIZED = True
+
+    from multiprocessing.util import Finalize
+    from msc_pygeoapi.bulk import close_bulk_sinks
+    from msc_pygeoapi.metrics import retire_metrics
+
+    Finalize(None, close_bulk_sinks, exitpriority=10)
+    Finalize(None, retire_metrics, exitpriority=5)
+
+
+def handle_file(filepath):
+    """
+    dispatch a file to its loader (run in a worker process)
+
+    :param filepath: path to file
+
+    :returns: `tuple` of dispatch result (`bool`) and number of documents
+              rejected by Elasticsearch since the previous dispatch (bulk
+              requests are buffered across files)
+    """
+
+    from msc_pygeoapi.bulk import take_bulk_rejections
+    from msc_pygeoapi.handler.core import CoreHandler
+
+    # (ProcessPoolExecutor initializers need Python 3.7)
+    init_worker()
+
+    try:
+        result = CoreHandler(filepath).handle()
+    except Exception as err:
+        LOGGER.warning('Cannot handle {}: {}'.format(filepath, err))
+        result = False
+
+    return result, take_bulk_rejections()
+
+
+def scan_directory(directory, exclude=(MSC_PYGEOAPI_CACHEDIR,)):
+    """
+    list files under a directory with their modification times and sizes
+
+    :param directory: path to directory
+    :param exclude: directories whose subtrees are not scanned (default:
+                    the loaders' own MSC_PYGEOAPI_CACHEDIR)
+
+    :returns: `dict` of filepath to (mtime, size) tuple
+    """
+
+    exclude = {os.path.realpath(path) for path in exclude if path}
+    files = {}
+    directories = [directory]
+
+    while directories:
+        try:
+            entries = list(os.scandir(directories.pop()))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+
+        for entry in entries:
+            if any([entry.name.startswith(INFLIGHT_PREFIXES),
+                    entry.name.endswith(INFLIGHT_SUFFIXES),
+                    entry.name.startswith(CACHE_FILES)]):
+                continue
+
+            try:
+                if entry.is_dir():
+                    if os.path.realpath(entry.path) not in exclude:
+                        directories.append(entry.path)
+                    continue
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+
+            files[entry.path] = (stat.st_mtime, stat.st_size)
+
+    return files
+
+
+def parse_notification(line):
+    """
+    extract a filepath from a queue notification
+
+    :param line: `str` of either a JSON object with a `filepath`
+                 (or sarracenia `local_file`) key, or a plain filepath
+
+    :returns: `str` of filepath, or `None` if the line is empty or invalid
+    """
+
+    line = line.strip()
+
+    if not line:
+        return None
+
+    if not line.startswith('{'):
+        return line
+
+    try:
+        notification = json.loads(line)
+    except json.decoder.JSONDecodeError as err:
+        LOGGER.warning('Invalid notification {}: {}'.format(line, err))
+        return None
+
+    return notification.get('filepath', notification.get('local_file'))
+
+
+async def watch_directory(directory, queue, interval):
+    """
+    poll a directory, queueing files created or modified since startup
+    once settled (same modification time and size over two scans), so
+    that files still being written are not dispatched
+
+    :param directory: path to directory
+    :param queue: `asyncio.Queue` of filepaths
+    :param interval: polling interval (seconds)
+
+    :returns: void
+    """
+
+    loop = asyncio.get_event_loop()
+
+    LOGGER.info('Watching {} (polling every {}s)'.format(directory, interval))
+    # (mtime, size) of files as last dispatched (or found at startup)
+    dispatched = await loop.run_in_executor(None, scan_directory, directory)
+    # (mtime, size) of changed files as of the previous scan
+    changed = {}
+
+    while True:
+        await asyncio.sleep(interval)
+        current = await loop.run_in_executor(None, scan_directory, directory)
+
+        settled = [filepath for filepath, stat in current.items()
+                   if dispatched.get(filepath) != stat and
+                   changed.get(filepath) == stat]
+
+        for filepath in sorted(settled, key=current.get):
+            dispatched[filepath] = current[filepath]
+            await queue.put(filepath)
+
+        changed = {filepath: stat for filepath, stat in current.items()
+                   if dispatched.get(filepath) != stat}
+        dispatched = {filepath: stat for filepath, stat in dispatched.items()
+                      if filepath in current}
+
+
+async def follow_queue(queue_file, queue, interval):
+    """
+    follow a line-delimited notification file, queueing each filepath
+
+    :param queue_file: path to notification file (JSONL or plain paths)
+    :param queue: `asyncio.Queue` of filepaths
+    :param interval: polling interval (seconds) once at end of file
+
+    :returns: void
+    """
+
+    LOGGER.info('Following {}'.format(queue_file))
+
+    buffer = ''
+
+    with open(queue_file) as fh:
+        while True:
+            line = fh.readline()
+
+            if not line:
+                await asyncio.sleep(interval)
+                continue
+
+            # keep partially written lines until they are complete
+            buffer += line
+            if not buffer.endswith('\n'):
+                continue
+
+            filepath = parse_notification(buffer)
+            buffer = ''
+
+            if filepath is not None:
+                await queue.put(filepath)
+
+
+async def dispatch_files(queue, executor, stats):
+    """
+    dispatch queued filepaths to the worker pool
+
+    :param queue: `asyncio.Queue` of filepaths
+    :param executor: `dict` holding the `concurrent.futures.Executor`
+                     running `handle_file` (`pool`) and its number of
+                     `workers`, replaced by a new pool if a worker died
+    :param stats: `dict` of dispatch counters
+
+    :returns: void
+    """
+
+    loop = asyncio.get_event_loop()
+
+    while True:
+        filepath = await queue.get()
+        pool = executor['pool']
+        try:
+            result, rejected = await loop.run_in_executor(
+                pool, handle_file, filepath)
+            stats['handled' if result else 'failed'] += 1
+            stats['rejected'] += rejected
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            LOGGER.error('Cannot dispatch {}: {}'.format(filepath, err))
+            stats['failed'] += 1
+            if isinstance(err, BrokenProcessPool) and \
+                    executor['pool'] is pool:
+                LOGGER.warning('Worker died: restarting worker pool')
+                executor['pool'] = ProcessPoolExecutor(
+                    max_workers=executor['workers'])
+                pool.shutdown(wait=False)
+        finally:
+            queue.task_done()
+
+
+async def run_daemon(directory=None, queue_file=None, workers=1,
+                     interval=1.0):
+    """
+    run the ingestion daemon until SIGINT/SIGTERM
+
+    :param directory: path to directory to watch
+    :param queue_file: path to notification file to follow
+    :param workers: number of worker processes
+    :param interval: polling interval (seconds)
+
+    :returns: `dict` of dispatch counters
+    """
+
+    loop = asyncio.get_event_loop()
+    stop = asyncio.Event()
+
+    for signum in [signal.SIGINT, signal.SIGTERM]:
+        loop.add_signal_handler(signum, stop.set)
+
+    stats = {'handled': 0, 'failed': 0, 'rejected': 0}
+
+    # bounded so that sources are throttled by the workers
+    queue = asyncio.Queue(maxsize=workers * 4)
+
+    executor = {
+        'pool': ProcessPoolExecutor(max_workers=workers),
+        'workers': workers
+    }
+
+    if queue_file is not None:
+        source = follow_queue(queue_file, queue, interval)
+    else:
+        source = watch_directory(directory, queue, interval)
+
+    producer = asyncio.ensure_future(source)
+    # twice as many consumers as workers keeps the pool busy
+    consumers = [
+        asyncio.ensure_future(dispatch_files(queue, executor, stats))
+        for i in range(workers * 2)
+    ]
+
+    await asyncio.wait([producer, asyncio.ensure_future(stop.wait())],
+                       return_when=asyncio.FIRST_COMPLETED)
+
+    if producer.done() and producer.exception() is not None:
+        LOGGER.error('Source failed: {}'.format(producer.exception()))
+
+    LOGGER.info('Stopping: draining {} queued files'.format(queue.qsize()))
+    producer.cancel()
+
+    await queue.join()
+
+    for consumer in consumers:
+        consumer.cancel()
+
+    await loop.run_in_executor(None, executor['pool'].shutdown)
+
+    return stats
+
+
+@click.command()
+@click.pass_context
+@click.option('--directory', '-d', 'directory',
+              type=click.Path(exists=True, resolve_path=True,
+                              dir_okay=True, file_okay=False),
+              help='Directory to watch')
+@click.option('--queue', '-q', 'queue_file',
+              type=click.Path(exists=True, resolve_path=True),
+              help='Line-delimited notification file to follow')
+@click.option('--workers', '-w', default=os.cpu_count(), type=int,
+              help='Number of worker processes (default: number of CPUs)')
+@click.option('--interval', '-i', default=1.0, type=float,
+              help='Polling interval in seconds (default=1.0)')
+def serve(ctx, directory, queue_file, workers, interval):
+    """Run ingestion daemon dispatching files to loaders"""
+
+    if all([directory is not None, queue_file is not None]):
+        raise click.ClickException('Use only one of --directory/--queue')
+
+    if directory is None and queue_file is None:
+        raise click.ClickException('Use one of --directory/--queue')
+
+    if directory is not None and os.path.realpath(directory) == \
+            os.path.realpath(MSC_PYGEOAPI_CACHEDIR):
+        raise click.ClickException(
+            'Cannot watch MSC_PYGEOAPI_CACHEDIR, where loaders keep their'
+            ' own files')
+
+    # (asyncio.run needs Python 3.7)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        stats = loop.run_until_complete(
+            run_daemon(directory, queue_file, workers, interval))
+    finally:
+        loop.close()
+
+    click.echo('Files handled: {}, failed: {}, documents rejected: {}'
+               .format(stats['handled'], stats['failed'],
+                       stats['rejected']))
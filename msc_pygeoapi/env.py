@@ -41,6 +41,21 @@ MSC_PYGEOAPI_ES_URL = os.getenv('MSC_PYGEOAPI_ES_URL', None)
 MSC_PYGEOAPI_ES_TIMEOUT = int(os.getenv('MSC_PYGEOAPI_ES_TIMEOUT', 90))
 MSC_PYGEOAPI_CACHEDIR = os.getenv('MSC_PYGEOAPI_CACHEDIR', '/tmp')
 
+MSC_PYGEOAPI_BULK_MAX_DOCS = int(os.getenv('MSC_PYGEOAPI_BULK_MAX_DOCS', 500))
+MSC_PYGEOAPI_BULK_MAX_BYTES = int(
+    os.getenv('MSC_PYGEOAPI_BULK_MAX_BYTES', 5242880))
+MSC_PYGEOAPI_BULK_MAX_AGE = float(
+    os.getenv('MSC_PYGEOAPI_BULK_MAX_AGE', 0.25))
+
+MSC_PYGEOAPI_METRICS_DIR = os.getenv('MSC_PYGEOAPI_METRICS_DIR', None)
+MSC_PYGEOAPI_METRICS_INTERVAL = float(
+    os.getenv('MSC_PYGEOAPI_METRICS_INTERVAL', 15))
+
+MSC_PYGEOAPI_RASTER_DRILL_MAX_OPEN = int(
+    os.getenv('MSC_PYGEOAPI_RASTER_DRILL_MAX_OPEN', 32))
+MSC_PYGEOAPI_RASTER_DRILL_CACHEDIR = os.getenv(
+    'MSC_PYGEOAPI_RASTER_DRILL_CACHEDIR', None)
+
 MSC_PYGEOAPI_ES_USERNAME = os.getenv('MSC_PYGEOAPI_ES_USERNAME', None)
 MSC_PYGEOAPI_ES_PASSWORD = os.getenv('MSC_PYGEOAPI_ES_PASSWORD', None)
 
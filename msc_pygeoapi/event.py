@@ -39,6 +39,13 @@ class Event(object):
         """
         sarracenia dispatcher
 
+        Loaders buffer documents in a bulk sink shared across files, so a
+        message is acknowledged once its documents are buffered, before
+        they are indexed (at most MSC_PYGEOAPI_BULK_MAX_AGE seconds later).
+        Documents still buffered when the process is killed are lost;
+        set MSC_PYGEOAPI_BULK_MAX_DOCS=1 to index each file before its
+        message is acknowledged.
+
         :param parent: `sarra.sr_subscribe.sr_subscribe`
 
         :returns: `bool` of dispatch result
@@ -57,9 +64,27 @@ class Event(object):
             parent.logger.warning(err)
             return False
 
+    def stop(self, parent):
+        """
+        sarracenia shutdown hook, flushing buffered bulk requests
+
+        :param parent: `sarra.sr_subscribe.sr_subscribe`
+
+        :returns: `bool` of flush result
+        """
+
+        try:
+            from msc_pygeoapi.bulk import close_bulk_sinks
+
+            return close_bulk_sinks()
+        except Exception as err:
+            parent.logger.warning(err)
+            return False
+
     def __repr__(self):
         return '<Event>'
 
 
 event = Event(self)  # noqa
-self.on_message = self.on_file = event.dispatch  # noqa
\ No newline at end of file
+self.on_message = self.on_file = event.dispatch  # noqa
+self.on_stop = event.stop  # noqa
\ No newline at end of file
@@ -30,7 +30,7 @@
 import logging
 
 from msc_pygeoapi.handler.base import BaseHandler
-from msc_pygeoapi.plugin import PLUGINS, load_plugin
+from msc_pygeoapi.plugin import get_router
 
 LOGGER = logging.getLogger(__name__)
 
@@ -59,11 +59,7 @@ class CoreHandler(BaseHandler):
         """
 
         LOGGER.debug('Detecting filename pattern')
-        for key in PLUGINS['loader'].keys():
-            if PLUGINS['loader'][key]['filename_pattern'] in self.filepath:
-                plugin_def = PLUGINS['loader'][key]
-                LOGGER.debug('Loading plugin {}'.format(plugin_def))
-                self.plugin = load_plugin('loader', plugin_def)
+        self.plugin = get_router('loader').get_plugin(self.filepath)
 
         if self.plugin is None:
             msg = 'Plugin not found'
@@ -34,6 +34,8 @@ import click
 LOGGER = logging.getLogger(__name__)
 
 try:
+    from msc_pygeoapi.daemon import serve
+    from msc_pygeoapi.metrics import stats
     from msc_pygeoapi.loader.bulletins import bulletins
     from msc_pygeoapi.loader.citypageweather_realtime import citypageweather
     from msc_pygeoapi.loader.hydat import hydat
@@ -55,8 +57,32 @@ def data():
     pass
 
 
+@click.command()
+@click.pass_context
+@click.option('--file', '-f', 'file_', required=True,
+              help='Path to file (as received from the feed)')
+def route(ctx, file_):
+    """Show which loader handles a given file"""
+
+    from msc_pygeoapi.plugin import PLUGINS, get_router
+
+    name = get_router('loader').route(file_)
+
+    if name is None:
+        raise click.ClickException('No loader matches {}'.format(file_))
+
+    plugin_def = PLUGINS['loader'][name]
+    click.echo('Loader: {}'.format(name))
+    click.echo('Filename pattern: {}'.format(plugin_def['filename_pattern']))
+    click.echo('Handler: {}'.format(plugin_def['handler']))
+
+
+data.add_command(route)
+
 # add load commands
 try:
+    data.add_command(serve)
+    data.add_command(stats)
     data.add_command(bulletins)
     data.add_command(citypageweather)
     data.add_command(hydat)
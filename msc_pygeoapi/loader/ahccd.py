@@ -7,9 +7,16 @@
 
 import json
 import logging
+import os
+import queue
+import threading
+import time
 import click
 
 from msc_pygeoapi import util
+from msc_pygeoapi.checkpoint import AckTracker
+from msc_pygeoapi.reindex import (IndexGeneration, publish_generations,
+                                  retarget)
 
 
 LOGGER = logging.getLogger(__name__)
@@ -18,18 +25,29 @@ POST_OK = 201
 HEADERS = {'Content-type': 'application/json'}
 # Needs to be fixed.
 VERIFY = False
+# characters of GeoJSON files read at a time
+CHUNK_SIZE = 1024 * 1024
+# characters a single JSON value (e.g. a feature) may span
+MAX_VALUE_SIZE = 8 * 1024 * 1024
+WHITESPACE = ' \t\n\r\x1e'
+DATASETS = ['stations', 'trends', 'annual', 'seasonal', 'monthly']
+ACTIONS_PER_BATCH = 500
 
 
 def create_index(es, index):
     """
-    Creates the Elasticsearch index at es. If the index already exists,
-    it is deleted and re-created. The mappings for the two types are also
-    created.
+    Creates a new generation of the Elasticsearch index at es, to be
+    published (aliased) once loaded. The mappings for the two types are
+    also created.
 
     :param es: elasticsearch.Elasticsearch object connected to ES cluster.
     :param index: Identifier for the index to be created.
+
+    :returns: list of msc_pygeoapi.reindex.IndexGeneration objects.
     """
 
+    generations = []
+
     if index == 'annual':
         mapping =\
             {
@@ -175,10 +193,8 @@ def create_index(es, index):
             }
 
         index_name = 'ahccd_annual'
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the AHCCD annuals index')
-        es.indices.create(index=index_name, body=mapping)
+        generations.append(
+            IndexGeneration(es, index_name, mapping).create())
 
     if index == 'monthly':
         mapping =\
@@ -329,10 +345,8 @@ def create_index(es, index):
             }
 
         index_name = 'ahccd_monthly'
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the AHCCD monthlies index')
-        es.indices.create(index=index_name, body=mapping)
+        generations.append(
+            IndexGeneration(es, index_name, mapping).create())
 
     if index == 'seasonal':
         mapping =\
@@ -479,10 +493,8 @@ def create_index(es, index):
             }
 
         index_name = 'ahccd_seasonal'
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the AHCCD seasonals index')
-        es.indices.create(index=index_name, body=mapping)
+        generations.append(
+            IndexGeneration(es, index_name, mapping).create())
 
     if index == 'stations':
         mapping =\
@@ -560,10 +572,8 @@ def create_index(es, index):
             }
 
         index_name = 'ahccd_stations'
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the AHCCD stations index')
-        es.indices.create(index=index_name, body=mapping)
+        generations.append(
+            IndexGeneration(es, index_name, mapping).create())
 
     if index == 'trends':
         mapping =\
@@ -641,39 +651,197 @@ def create_index(es, index):
             }
 
         index_name = 'ahccd_trends'
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the AHCCD trends index')
-        es.indices.create(index=index_name, body=mapping)
+        generations.append(
+            IndexGeneration(es, index_name, mapping).create())
+
+    return generations
+
+
+class JSONStream(object):
+    """
+    Reads consecutive JSON values (and structural characters) from a file
+    object, holding no more than the values being decoded in memory.
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE,
+                 max_value_size=MAX_VALUE_SIZE):
+        """
+        Initializes the stream.
+
+        :param f: file object opened in text mode.
+        :param chunk_size: number of characters read from f at a time.
+        :param max_value_size: number of characters a single value may
+                               span before it is rejected as malformed.
+        """
+
+        self.f = f
+        self.chunk_size = chunk_size
+        self.max_value_size = max_value_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def read(self, size=None):
+        """
+        Appends the next chunk of the file to the buffer, dropping the
+        characters already consumed.
+
+        :param size: number of characters to read (default: chunk_size).
+        :returns: bool of whether characters were read.
+        """
+
+        chunk = self.f.read(size or self.chunk_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        self.eof = not chunk
+        return not self.eof
+
+    def peek(self):
+        """
+        Skips whitespace (and GeoJSON text sequence separators).
+
+        :returns: next character, or an empty string at the end of file.
+        """
+
+        while True:
+            while self.position < len(self.buffer):
+                if self.buffer[self.position] not in WHITESPACE:
+                    return self.buffer[self.position]
+                self.position += 1
+            if not self.read():
+                return ''
+
+    def expect(self, char):
+        """
+        Consumes the next (structural) character.
+
+        :param char: expected character.
+        :returns: None
+        """
+
+        if self.peek() != char:
+            raise ValueError('Expecting {!r} but found {!r}'.format(
+                char, self.peek()))
+        self.position += 1
+
+    def decode(self):
+        """
+        Decodes the next JSON value, reading more of the file as needed.
+
+        :returns: decoded value.
+        """
+
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer,
+                                                     self.position)
+            except json.JSONDecodeError as err:
+                if len(self.buffer) - self.position >= self.max_value_size:
+                    raise ValueError('JSON value exceeds {} characters:'
+                                     ' {}'.format(self.max_value_size, err))
+                # the value may continue in the next chunk, read in
+                # doubling sizes so that it is re-parsed a few times only
+                if not self.read(size):
+                    raise
+                size *= 2
+                continue
+            # as may a number ending the buffer
+            if end == len(self.buffer) and self.read():
+                continue
+            self.position = end
+            return value
+
+
+def read_features(f):
+    """
+    Streams the features of a GeoJSON FeatureCollection, or of a
+    line-delimited sequence of GeoJSON features, one at a time.
+
+    :param f: file object opened in text mode.
+    :returns: generator of GeoJSON feature dictionaries.
+    """
+
+    stream = JSONStream(f)
+
+    while stream.peek():
+        stream.expect('{')
+        members = {}
+        first_member = True
+
+        while stream.peek() != '}':
+            if not first_member:
+                stream.expect(',')
+            first_member = False
+
+            key = stream.decode()
+            stream.expect(':')
+
+            if key != 'features':
+                members[key] = stream.decode()
+                continue
+
+            stream.expect('[')
+            first_feature = True
+            while stream.peek() != ']':
+                if not first_feature:
+                    stream.expect(',')
+                first_feature = False
+                yield stream.decode()
+            stream.expect(']')
+
+        stream.expect('}')
+
+        if members.get('type') == 'Feature':
+            yield members
 
 
 def generate_docs(fp, index):
     """
     Reads AHCCD and CMIP5 data from file(s) at fp and reformats them
-    so they can be nserted into Elasticsearch.
+    so they can be nserted into Elasticsearch. Features are streamed from
+    the file (a GeoJSON FeatureCollection or line-delimited GeoJSON
+    features) rather than loaded all at once.
 
     Returns a generator of dictionaries that represent upsert actions
     into Elasticsearch's bulk API.
 
+    Raises (rather than generating nothing) if the file cannot be read,
+    so that the new generation of the index is not published.
+
     :param fp: the location of the raw data file(s) to load.
     :param index: name of index to load.
     :returns: generator of bulk API upsert actions.
     """
 
     if index not in ['stations', 'monthly', 'annual', 'seasonal', 'trends']:
-        LOGGER.error('Unrecognized AHCCD data type {}'.format(index))
-        return
+        raise ValueError('Unrecognized AHCCD data type {}'.format(index))
 
     try:
-        with open(fp, 'r') as f:
-            json_source = f.read()
-            contents = json.loads(json_source)
+        f = open(fp, 'r')
     except Exception as err:
         LOGGER.error('Could not open JSON file due to: {}.'
                      .format(str(err)))
-        return
+        raise
+
+    with f:
+        for action in generate_actions(read_features(f), index):
+            yield action
+
+
+def generate_actions(records, index):
+    """
+    Reformats AHCCD and CMIP5 features so they can be inserted into
+    Elasticsearch.
+
+    :param records: iterable of GeoJSON feature dictionaries.
+    :param index: name of index to load.
+    :returns: generator of bulk API upsert actions.
+    """
 
-    for record in contents['features']:
+    for record in records:
         if index == 'annual':
             index_name = 'ahccd_annual'
         elif index == 'seasonal':
@@ -706,6 +874,145 @@ def generate_docs(fp, index):
         yield action
 
 
+def export_datasets(path_dict, datasets, items):
+    """
+    Worker thread: reads the datasets read from the datasets queue and
+    sends their documents to the bulk writer in batches.
+
+    :param path_dict: mapping of dataset names to GeoJSON files.
+    :param datasets: queue.Queue of dataset names, ended by None.
+    :param items: queue.Queue of (dataset, bulk API actions) batches,
+                  (dataset, None) once a dataset is read, (dataset,
+                  exception) if it could not be, and None once the
+                  worker is done.
+    :returns: None
+    """
+
+    for dataset in iter(datasets.get, None):
+        LOGGER.info('Populating {}...'.format(dataset))
+        try:
+            batch = []
+            for action in generate_docs(path_dict[dataset], dataset):
+                batch.append(action)
+                if len(batch) == ACTIONS_PER_BATCH:
+                    items.put((dataset, batch))
+                    batch = []
+            if batch:
+                items.put((dataset, batch))
+        except Exception as err:
+            LOGGER.error('Could not populate {} due to: {}.'.format(
+                dataset, err))
+            items.put((dataset, err))
+        else:
+            items.put((dataset, None))
+
+    items.put(None)
+
+
+def merge_datasets(items, workers, tracker, summary):
+    """
+    Merges the documents of worker threads into a single stream for the
+    bulk writer, recording them (in order) in an acknowledgement tracker.
+
+    :param items: queue.Queue written to by export_datasets.
+    :param workers: number of worker threads.
+    :param tracker: msc_pygeoapi.checkpoint.AckTracker object, with
+                    datasets as partitions.
+    :param summary: dict of per-dataset progress, updated as documents
+                    are sent.
+    :returns: generator of bulk API upsert actions.
+    """
+
+    running = workers
+    while running:
+        item = items.get()
+        if item is None:
+            running -= 1
+            continue
+
+        dataset, batch = item
+        if isinstance(batch, Exception):
+            tracker.failed.add(dataset)
+        elif batch is None:
+            tracker.end(dataset)
+        else:
+            summary[dataset]['documents'] += len(batch)
+            for action in batch:
+                tracker.add(dataset, action['_id'])
+                yield action
+
+
+def load_datasets(es, path_dict, datasets, workers):
+    """
+    Loads datasets concurrently into new generations of their indexes:
+    worker threads read the GeoJSON files (largest first) into a single
+    bulk writer, and each dataset is published once all its documents
+    were acknowledged.
+
+    :param es: elasticsearch.Elasticsearch client.
+    :param path_dict: mapping of dataset names to GeoJSON files.
+    :param datasets: list of dataset names to load.
+    :param workers: number of worker threads reading datasets.
+    :returns: dict of per-dataset progress (documents, seconds, status).
+    """
+
+    start = time.time()
+    summary = {}
+    generations = {}
+
+    for dataset in datasets:
+        summary[dataset] = {'documents': 0, 'seconds': None,
+                            'status': 'failed'}
+        try:
+            generations[dataset] = create_index(es, dataset)
+        except Exception as err:
+            LOGGER.error('Could not create {} index due to: {}.'.format(
+                dataset, err))
+
+    def by_size(dataset):
+        try:
+            return os.path.getsize(path_dict[dataset])
+        except (KeyError, OSError):
+            return 0
+
+    def on_progress(dataset, key, done):
+        if done:
+            summary[dataset]['seconds'] = time.time() - start
+            LOGGER.info('{} loaded.'.format(dataset))
+
+    tracker = AckTracker(on_progress)
+    queue_ = queue.Queue()
+    items = queue.Queue(maxsize=workers * 4)
+
+    for dataset in sorted(generations, key=by_size, reverse=True):
+        queue_.put(dataset)
+    for _ in range(workers):
+        queue_.put(None)
+
+    for _ in range(workers):
+        threading.Thread(target=export_datasets,
+                         args=(path_dict, queue_, items),
+                         daemon=True).start()
+
+    all_generations = [generation for generations_ in generations.values()
+                       for generation in generations_]
+    try:
+        util.submit_elastic_package(
+            es, retarget(merge_datasets(items, workers, tracker, summary),
+                         all_generations),
+            plugin='ahccd', on_result=tracker.on_result)
+    except Exception as err:
+        LOGGER.error('Could not load AHCCD datasets due to: {}.'.format(err))
+
+    for dataset, generations_ in generations.items():
+        ok = summary[dataset]['seconds'] is not None
+        if publish_generations(generations_, ok):
+            summary[dataset]['status'] = 'published'
+            LOGGER.info('{} populated.'.format(dataset))
+
+    return summary
+
+
 @click.command()
 @click.pass_context
 @click.option('--path', type=click.Path(exists=True, resolve_path=True),
@@ -715,7 +1022,9 @@ def generate_docs(fp, index):
 @click.option('--password', help='Password to connect to HTTPS')
 @click.option('--dataset', help='ES dataset to load, or all\
                                  if loading everything')
-def ahccd(ctx, path, es, username, password, dataset):
+@click.option('--workers', type=click.IntRange(min=1), default=1,
+              help='Number of datasets read concurrently')
+def ahccd(ctx, path, es, username, password, dataset, workers):
     """
     Loads AHCCD and CMIP5 data into Elasticsearch
 
@@ -735,6 +1044,8 @@ def ahccd(ctx, path, es, username, password, dataset):
     :param username: username for HTTP authentication.
     :param password: password for HTTP authentication.
     :param dataset: name of dataset to load, or all for all datasets.
+    :param workers: number of datasets read concurrently (into a single
+                    bulk writer).
     """
 
     auth = (username, password)
@@ -746,124 +1057,27 @@ def ahccd(ctx, path, es, username, password, dataset):
     except Exception as err:
         LOGGER.error('Could not open JSON location file due to: {}.'
                      .format(str(err)))
+        return None
 
     if dataset == 'all':
-        try:
-            LOGGER.info('Populating stations...')
-            create_index(es_client, 'stations')
-            stations = generate_docs(path_dict['stations'], 'stations')
-
-            util.submit_elastic_package(es_client, stations)
-            LOGGER.info('Stations populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate stations due to: {}.'
-                         .format(str(err)))
-
-        try:
-            LOGGER.info('Populating trends...')
-            create_index(es_client, 'trends')
-            trends = generate_docs(path_dict['trends'], 'trends')
-
-            util.submit_elastic_package(es_client, trends)
-            LOGGER.info('Trends populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate trends due to: {}.'
-                         .format(str(err)))
-
-        try:
-            LOGGER.info('Populating annual...')
-            create_index(es_client, 'annual')
-            annuals = generate_docs(path_dict['annual'], 'annual')
-
-            util.submit_elastic_package(es_client, annuals)
-            LOGGER.info('Annual populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate annual due to: {}.'
-                         .format(str(err)))
-
-        try:
-            LOGGER.info('Populating seasonal...')
-            create_index(es_client, 'seasonal')
-            seasonals = generate_docs(path_dict['seasonal'], 'seasonal')
-
-            util.submit_elastic_package(es_client, seasonals)
-            LOGGER.info('Seasonal populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate seasonal due to: {}.'
-                         .format(str(err)))
-
-        try:
-            LOGGER.info('Populating monthly...')
-            create_index(es_client, 'monthly')
-            monthlies = generate_docs(path_dict['monthly'], 'monthly')
-
-            util.submit_elastic_package(es_client, monthlies)
-            LOGGER.info('Monthly populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate monthly due to: {}.'
-                         .format(str(err)))
-
-    elif dataset == 'stations':
-        try:
-            LOGGER.info('Populating stations...')
-            create_index(es_client, 'stations')
-            stations = generate_docs(path_dict['stations'], 'stations')
-
-            util.submit_elastic_package(es_client, stations)
-            LOGGER.info('Stations populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate stations due to: {}.'
-                         .format(str(err)))
-
-    elif dataset == 'trends':
-        try:
-            LOGGER.info('Populating trends...')
-            create_index(es_client, 'trends')
-            trends = generate_docs(path_dict['trends'], 'trends')
-
-            util.submit_elastic_package(es_client, trends)
-            LOGGER.info('Trends populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate trends due to: {}.'
-                         .format(str(err)))
-
-    elif dataset == 'annual':
-        try:
-            LOGGER.info('Populating annual...')
-            create_index(es_client, 'annual')
-            annuals = generate_docs(path_dict['annual'], 'annual')
-
-            util.submit_elastic_package(es_client, annuals)
-            LOGGER.info('Annual populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate annual due to: {}.'
-                         .format(str(err)))
-
-    elif dataset == 'seasonal':
-        try:
-            LOGGER.info('Populating seasonal...')
-            create_index(es_client, 'seasonal')
-            seasonals = generate_docs(path_dict['seasonal'], 'seasonal')
-
-            util.submit_elastic_package(es_client, seasonals)
-            LOGGER.info('Seasonal populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate seasonal due to: {}.'
-                         .format(str(err)))
-
-    elif dataset == 'monthly':
-        try:
-            LOGGER.info('Populating monthly...')
-            create_index(es_client, 'monthly')
-            monthlies = generate_docs(path_dict['monthly'], 'monthly')
-
-            util.submit_elastic_package(es_client, monthlies)
-            LOGGER.info('Monthly populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate monthly due to: {}.'
-                         .format(str(err)))
-
+        datasets = DATASETS
+    elif dataset in DATASETS:
+        datasets = [dataset]
     else:
         LOGGER.critical('Unknown dataset parameter {}, skipping index population.'.format(dataset)) # noqa
+        return None
+
+    summary = load_datasets(es_client, path_dict, datasets,
+                            min(workers, len(datasets)))
+
+    click.echo('{:<12}{:>12}{:>12}  {}'.format(
+        'dataset', 'documents', 'seconds', 'status'))
+    for dataset_ in datasets:
+        progress = summary[dataset_]
+        seconds = progress['seconds']
+        click.echo('{:<12}{:>12}{:>12}  {}'.format(
+            dataset_, progress['documents'],
+            '-' if seconds is None else '{:.1f}'.format(seconds),
+            progress['status']))
 
     LOGGER.info('Finished populating indices.')
@@ -29,12 +29,30 @@
 
 import logging
 
+from msc_pygeoapi.bulk import get_bulk_sink
+
 LOGGER = logging.getLogger(__name__)
 
 
 class BaseLoader(object):
     def __init__(self):
-        pass
+        # documents rejected by buffered bulk requests
+        self.bulk_errors = 0
+
+    @property
+    def name(self):
+        """loader name (its module name), labelling its stage timings"""
+
+        return self.__module__.rsplit('.', 1)[-1]
+
+    @property
+    def sink(self):
+        """
+        process-wide bulk sink of the loader's Elasticsearch connection
+        (fetched on each use, as sinks are closed on shutdown)
+        """
+
+        return get_bulk_sink(self.ES)
 
     def load_data(self, filepath):
         """
@@ -47,6 +65,20 @@ class BaseLoader(object):
 
         raise NotImplementedError()
 
+    def on_bulk_error(self, action, response):
+        """
+        handles a document rejected by a buffered bulk request
+
+        :param action: `dict` of Elasticsearch bulk API action
+        :param response: `dict` of bulk API item response
+
+        :returns: void
+        """
+
+        self.bulk_errors += 1
+        LOGGER.warning('Document {} rejected: {}'.format(
+            action.get('_id'), response))
+
 
 class LoaderError(Exception):
     """setup error"""
@@ -34,7 +34,8 @@ import logging
 from msc_pygeoapi.env import (MSC_PYGEOAPI_ES_TIMEOUT, MSC_PYGEOAPI_ES_URL,
                               MSC_PYGEOAPI_ES_AUTH)
 from msc_pygeoapi.loader.base import BaseLoader
-from msc_pygeoapi.util import click_abort_if_false, get_es
+from msc_pygeoapi.metrics import Stopwatch
+from msc_pygeoapi.util import click_abort_if_false, get_es, get_shared_es
 
 
 LOGGER = logging.getLogger(__name__)
@@ -77,7 +78,8 @@ class BulletinsRealtimeLoader(BaseLoader):
         BaseLoader.__init__(self)
 
         self.DD_URL = 'https://dd.weather.gc.ca/bulletins/alphanumeric'
-        self.ES = get_es(MSC_PYGEOAPI_ES_URL, MSC_PYGEOAPI_ES_AUTH)
+        self.ES = get_shared_es(MSC_PYGEOAPI_ES_URL,
+                                MSC_PYGEOAPI_ES_AUTH)
 
         if not self.ES.indices.exists(INDEX_NAME):
             self.ES.indices.create(index=INDEX_NAME, body=SETTINGS,
@@ -94,12 +96,19 @@ class BulletinsRealtimeLoader(BaseLoader):
 
         LOGGER.debug(filepath)
 
+        stopwatch = Stopwatch(self.name)
         data = self.bulletin2dict(filepath)
+        stopwatch.lap('transform')
+
+        action = {
+            '_id': data['ID'],
+            '_index': INDEX_NAME,
+            '_op_type': 'index',
+            '_source': data
+        }
 
         try:
-            r = self.ES.index(index=INDEX_NAME, id=data['ID'], body=data)
-            LOGGER.debug('Result: {}'.format(r))
-            return True
+            return self.sink.add(action, self.on_bulk_error, self.name)
         except Exception as err:
             LOGGER.warning('Error indexing: {}'.format(err))
             return False
@@ -38,7 +38,9 @@ import re
 from msc_pygeoapi.env import (MSC_PYGEOAPI_ES_TIMEOUT, MSC_PYGEOAPI_ES_URL,
                               MSC_PYGEOAPI_ES_AUTH)
 from msc_pygeoapi.loader.base import BaseLoader
+from msc_pygeoapi.metrics import Stopwatch, timer
 from msc_pygeoapi.util import (click_abort_if_false, get_es,
+                               get_shared_es,
                                json_pretty_print, _get_date_format,
                                _get_element)
 
@@ -180,7 +182,8 @@ class CapAlertsRealtimeLoader(BaseLoader):
 
         BaseLoader.__init__(self)
 
-        self.ES = get_es(MSC_PYGEOAPI_ES_URL, MSC_PYGEOAPI_ES_AUTH)
+        self.ES = get_shared_es(MSC_PYGEOAPI_ES_URL,
+                                MSC_PYGEOAPI_ES_AUTH)
 
         if not self.ES.indices.exists(INDEX_NAME,
                                       request_timeout=MSC_PYGEOAPI_ES_TIMEOUT):
@@ -210,7 +213,8 @@ class CapAlertsRealtimeLoader(BaseLoader):
                 op_dict['index']['_id'] = doc['properties']['identifier']
                 self.bulk_data.append(op_dict)
                 self.bulk_data.append(doc)
-            r = self.ES.bulk(index=INDEX_NAME, body=self.bulk_data)
+            with timer(self.name, 'roundtrip'):
+                r = self.ES.bulk(index=INDEX_NAME, body=self.bulk_data)
 
             LOGGER.debug('Result: {}'.format(r))
 
@@ -233,8 +237,6 @@ class CapAlertsRealtimeLoader(BaseLoader):
 
         if self.references_arr and len(self.references_arr) != 0:
 
-            es = get_es(MSC_PYGEOAPI_ES_URL, MSC_PYGEOAPI_ES_AUTH)
-
             click.echo('Deleting old alerts')
 
             query = {
@@ -245,7 +247,7 @@ class CapAlertsRealtimeLoader(BaseLoader):
                 }
             }
 
-            es.delete_by_query(index=INDEX_NAME, body=query)
+            self.ES.delete_by_query(index=INDEX_NAME, body=query)
 
             return True
 
@@ -277,8 +279,14 @@ class CapAlertsRealtimeLoader(BaseLoader):
 
         LOGGER.debug('Processing {}'.format(filepath))
         # with the lxml library we parse the xml file
+        stopwatch = Stopwatch(self.name)
+
         try:
-            tree = etree.parse(filepath)
+            with open(filepath, 'rb') as fh:
+                xml = fh.read()
+            stopwatch.lap('read')
+            tree = etree.fromstring(xml).getroottree()
+            stopwatch.lap('parse')
         except Exception as err:
             LOGGER.warning('Cannot parse {}: {}'.format(filepath, err))
 
@@ -449,6 +457,8 @@ class CapAlertsRealtimeLoader(BaseLoader):
 
                 data.append(AlertLocation)
 
+        stopwatch.lap('transform')
+
         return data
 
 
@@ -483,12 +493,13 @@ def add(ctx, file_, directory):
                 files_to_process.append(os.path.join(root, f))
         files_to_process.sort(key=os.path.getmtime)
 
+    plugin_def = {
+        'filename_pattern': 'alerts/cap',
+        'handler': 'msc_pygeoapi.loader.cap_alerts.CapAlertsRealtimeLoader'  # noqa
+    }
+    loader = CapAlertsRealtimeLoader(plugin_def)
+
     for file_to_process in files_to_process:
-        plugin_def = {
-            'filename_pattern': 'alerts/cap',
-            'handler': 'msc_pygeoapi.loader.cap_alerts.CapAlertsRealtimeLoader'  # noqa
-        }
-        loader = CapAlertsRealtimeLoader(plugin_def)
         result = loader.load_data(file_to_process)
         if result:
             click.echo('GeoJSON features generated: {}'.format(
@@ -38,7 +38,8 @@ import os
 from msc_pygeoapi.env import (MSC_PYGEOAPI_ES_TIMEOUT, MSC_PYGEOAPI_ES_URL,
                               MSC_PYGEOAPI_ES_AUTH, MSC_PYGEOAPI_BASEPATH)
 from msc_pygeoapi.loader.base import BaseLoader
-from msc_pygeoapi.util import click_abort_if_false, get_es
+from msc_pygeoapi.metrics import Stopwatch
+from msc_pygeoapi.util import click_abort_if_false, get_es, get_shared_es
 
 LOGGER = logging.getLogger(__name__)
 
@@ -240,7 +241,8 @@ class CitypageweatherRealtimeLoader(BaseLoader):
 
         BaseLoader.__init__(self)
 
-        self.ES = get_es(MSC_PYGEOAPI_ES_URL, MSC_PYGEOAPI_ES_AUTH)
+        self.ES = get_shared_es(MSC_PYGEOAPI_ES_URL,
+                                MSC_PYGEOAPI_ES_AUTH)
 
         if not self.ES.indices.exists(INDEX_NAME):
             self.ES.indices.create(index=INDEX_NAME, body=SETTINGS,
@@ -262,12 +264,15 @@ class CitypageweatherRealtimeLoader(BaseLoader):
 
         data = self.xml2json_cpw(wxo_lookup, filepath)
 
+        action = {
+            '_id': data['properties']['identifier'],
+            '_index': INDEX_NAME,
+            '_op_type': 'index',
+            '_source': data
+        }
+
         try:
-            r = self.ES.index(index=INDEX_NAME,
-                              id=data['properties']['identifier'],
-                              body=data)
-            LOGGER.debug('Result: {}'.format(r))
-            return True
+            return self.sink.add(action, self.on_bulk_error, self.name)
         except Exception as err:
             LOGGER.warning('Error indexing: {}'.format(err))
             return False
@@ -324,8 +329,14 @@ class CitypageweatherRealtimeLoader(BaseLoader):
         LOGGER.debug('Processing XML: {}'.format(xml))
         LOGGER.debug('Fetching English elements')
 
+        stopwatch = Stopwatch(self.name)
+
         try:
-            root = etree.parse(xml).getroot()
+            with open(xml, 'rb') as fh:
+                data = fh.read()
+            stopwatch.lap('read')
+            root = etree.fromstring(data)
+            stopwatch.lap('parse')
         except Exception as err:
             LOGGER.error('ERROR: cannot process data: {}'.format(err))
 
@@ -483,6 +494,7 @@ class CitypageweatherRealtimeLoader(BaseLoader):
                 }
 
             conditions['properties'] = {key:val for key, val in conditions['properties'].items() if val != 'null'} # noqa
+            stopwatch.lap('transform')
             return conditions
 
 
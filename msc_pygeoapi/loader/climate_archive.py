@@ -13,11 +13,19 @@
 
 
 import logging
+import os
+import queue
+import threading
 import cx_Oracle
 import click
 import collections
 
 from msc_pygeoapi import util
+from msc_pygeoapi.checkpoint import (Checkpoint, plan_partitions,
+                                     remaining_keys)
+from msc_pygeoapi.env import MSC_PYGEOAPI_CACHEDIR
+from msc_pygeoapi.reindex import (IndexGeneration, publish_generations,
+                                  retarget)
 
 
 logging.basicConfig()
@@ -28,19 +36,31 @@ HEADERS = {'Content-type': 'application/json'}
 # Needs to be fixed.
 VERIFY = False
 
+# rows fetched per database round trip
+FETCH_SIZE = 5000
+# STN_ID partitions of a parallel daily load, per worker
+PARTITIONS_PER_WORKER = 4
+# documents sent from a worker to the bulk writer at a time
+ACTIONS_PER_BATCH = 500
 
-def create_index(es, index):
+
+def create_index(es, index, version=None):
     """
-    Creates the Elasticsearch index at path. If the index already exists,
-    it is deleted and re-created. The mappings for the two types are also
-    created.
+    Creates a new generation of the Elasticsearch index at path, to be
+    published (aliased) once loaded. The mappings for the two types are
+    also created.
 
     :param path: the path to Elasticsearch.
     :param index: the index to be created.
     :param AUTH: tuple of username and password used to authorize the
                  HTTP request.
+    :param version: version of a generation to resume loading into.
+
+    :returns: list of msc_pygeoapi.reindex.IndexGeneration objects.
     """
 
+    generations = []
+
     if index == 'stations':
         mapping =\
             {
@@ -205,11 +225,9 @@ def create_index(es, index):
             }
 
         index_name = 'climate_station_information'
-
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the stations index')
-        es.indices.create(index=index_name, body=mapping)
+        generation = IndexGeneration(es, index_name, mapping, version)
+        generations.append(
+            generation.resume() if version else generation.create())
 
     if index == 'normals':
         mapping =\
@@ -358,11 +376,9 @@ def create_index(es, index):
             }
 
         index_name = 'climate_normals_data'
-
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the climate normals index')
-        es.indices.create(index=index_name, body=mapping)
+        generation = IndexGeneration(es, index_name, mapping, version)
+        generations.append(
+            generation.resume() if version else generation.create())
 
     if index == 'monthly_summary':
         mapping =\
@@ -505,11 +521,9 @@ def create_index(es, index):
             }
 
         index_name = 'climate_public_climate_summary'
-
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the climate monthly summaries index')
-        es.indices.create(index=index_name, body=mapping)
+        generation = IndexGeneration(es, index_name, mapping, version)
+        generations.append(
+            generation.resume() if version else generation.create())
 
     if index == 'daily_summary':
         mapping =\
@@ -702,11 +716,116 @@ def create_index(es, index):
             }
 
         index_name = 'climate_public_daily_data'
+        generation = IndexGeneration(es, index_name, mapping, version)
+        generations.append(
+            generation.resume() if version else generation.create())
+
+    return generations
+
+
+def connect(db):
+    """
+    Connects to the climate archive database.
+
+    :param db: Oracle database connection string.
+
+    :returns: DB-API connection object.
+    """
+
+    return cx_Oracle.connect(db)
+
+
+def parse_connect_string(db):
+    """
+    Parses an Oracle connection string into session pool credentials,
+    splitting it the way cx_Oracle.connect does (user/password@dsn, the
+    password running up to the first @).
+
+    :param db: Oracle database connection string.
+
+    :returns: tuple of (user, password, dsn).
+    """
+
+    user, slash, password = db.partition('/')
+    if slash:
+        password, _, dsn = password.partition('@')
+    else:
+        user, _, dsn = db.partition('@')
+
+    if not all([user, password, dsn]):
+        raise ValueError('Parallel daily loads need a user/password@dsn'
+                         ' connection string')
+
+    return user, password, dsn
 
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the climate daily summaries index')
-        es.indices.create(index=index_name, body=mapping)
+
+class SingleConnectionPool(object):
+    """a single connection, with a session pool interface"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def acquire(self):
+        return connect(self.db)
+
+    def release(self, con):
+        con.close()
+
+
+def get_pool(db, size):
+    """
+    Creates a pool of database connections.
+
+    :param db: Oracle database connection string (user/password@dsn if
+               size is more than 1).
+    :param size: number of connections.
+
+    :returns: cx_Oracle.SessionPool (or SingleConnectionPool) object.
+    """
+
+    if size == 1:
+        return SingleConnectionPool(db)
+
+    user, password, dsn = parse_connect_string(db)
+
+    return cx_Oracle.SessionPool(user=user, password=password, dsn=dsn,
+                                 min=size, max=size, increment=0,
+                                 threaded=True)
+
+
+def get_cursor(con, fetch_size=FETCH_SIZE):
+    """
+    Creates a cursor fetching fetch_size rows per database round trip.
+
+    :param con: DB-API connection object returned by connect.
+    :param fetch_size: number of rows fetched per round trip.
+
+    :returns: DB-API cursor object.
+    """
+
+    cur = con.cursor()
+    cur.arraysize = fetch_size
+    if hasattr(cur, 'prefetchrows'):
+        # rows returned along with the execute round trip (cx_Oracle 8+)
+        cur.prefetchrows = fetch_size + 1
+
+    return cur
+
+
+def fetch_records(cur):
+    """
+    Fetches the rows of the query last executed on a cursor, a batch of
+    cursor.arraysize rows at a time.
+
+    :param cur: DB-API cursor object returned by get_cursor.
+
+    :returns: generator of dicts keyed by column name.
+    """
+
+    columns = [x[0] for x in cur.description]
+
+    for rows in iter(cur.fetchmany, []):
+        yield from [dict(zip(columns, row)) for row in rows]
 
 
 def generate_stations(cur):
@@ -726,8 +845,7 @@ def generate_stations(cur):
     except Exception as err:
         LOGGER.error('Could not fetch records from oracle due to: {}.'.format(str(err))) # noqa
 
-    for row in cur:
-        insert_dict = dict(zip([x[0] for x in cur.description], row))
+    for insert_dict in fetch_records(cur):
         for key in insert_dict:
             # This is a quick fix for trailing spaces and should not be here.
             # Data should be fixed on db side.
@@ -782,8 +900,7 @@ def generate_normals(cur, stn_dict, normals_dict, periods_dict):
     except Exception as err:
         LOGGER.error('Could not fetch records from oracle due to: {}.'.format(str(err))) # noqa
 
-    for row in cur:
-        insert_dict = dict(zip([x[0] for x in cur.description], row))
+    for insert_dict in fetch_records(cur):
 
         for key in insert_dict:
             # Transform Date fields from datetime to string.
@@ -843,8 +960,7 @@ def generate_monthly_data(cur, stn_dict, date=None):
         except Exception as err:
             LOGGER.error('Could not fetch records from oracle due to: {}.'.format(str(err))) # noqa
 
-    for row in cur:
-        insert_dict = dict(zip([x[0] for x in cur.description], row))
+    for insert_dict in fetch_records(cur):
         # Transform Date fields from datetime to string.
         insert_dict['LAST_UPDATED'] = str(insert_dict['LAST_UPDATED']) if insert_dict['LAST_UPDATED'] is not None else insert_dict['LAST_UPDATED'] # noqa
 
@@ -868,7 +984,7 @@ def generate_monthly_data(cur, stn_dict, date=None):
             LOGGER.error('Bad STN ID: {}, skipping records for this station'.format(insert_dict['STN_ID'])) # noqa
 
 
-def generate_daily_data(cur, stn_dict, date=None):
+def generate_daily_data(cur, stn_dict, date=None, stations_per_scan=None):
     """
     Queries daily data from the db, and reformats
     data so it can be inserted into Elasticsearch.
@@ -879,23 +995,51 @@ def generate_daily_data(cur, stn_dict, date=None):
     :param cur: oracle cursor to perform queries against.
     :param stn_dict: mapping of station IDs to station information.
     :param date: date to start fetching data from.
+    :param stations_per_scan: number of stations whose data is fetched by
+                              each range scan of the daily data ordered by
+                              STN_ID (0 for a single scan), or None to
+                              query each station separately.
     :returns: generator of bulk API upsert actions.
     """
 
-    for station in stn_dict:
-        if not date:
-            try:
-                cur.execute('select * from CCCS_PORTAL.PUBLIC_DAILY_DATA where STN_ID={}'.format(station)) # noqa
-            except Exception as err:
-                LOGGER.error('Could not fetch records from oracle due to: {}.'.format(str(err))) # noqa
-        else:
-            try:
-                cur.execute("select * from CCCS_PORTAL.PUBLIC_DAILY_DATA where STN_ID={} and LOCAL_DATE > TO_TIMESTAMP('{} 00:00:00', 'YYYY-MM-DD HH24:MI:SS')".format(station, date)) # noqa
-            except Exception as err:
-                LOGGER.error('Could not fetch records from oracle due to: {}.'.format(str(err))) # noqa
+    if stations_per_scan is None:
+        where = 'STN_ID = :stn_id'
+        binds = [{'stn_id': station} for station in stn_dict]
+    else:
+        where = 'STN_ID between :first_stn_id and :last_stn_id'
+        stations = sorted(stn_dict)
+        size = stations_per_scan or len(stations) or 1
+        binds = [{'first_stn_id': stations[i],
+                  'last_stn_id': stations[min(i + size, len(stations)) - 1]}
+                 for i in range(0, len(stations), size)]
+
+    if date:
+        where += " and LOCAL_DATE > TO_TIMESTAMP(:since, 'YYYY-MM-DD HH24:MI:SS')" # noqa
+        for bind in binds:
+            bind['since'] = '{} 00:00:00'.format(date)
+
+    # bind variables keep the statement (and its plan) identical across
+    # stations/ranges
+    sql = 'select * from CCCS_PORTAL.PUBLIC_DAILY_DATA where {}'.format(where)
+    if stations_per_scan is not None:
+        sql += ' order by STN_ID'
+
+    bad_stations = set()
+
+    for bind in binds:
+        try:
+            cur.execute(sql, bind)
+        except Exception as err:
+            LOGGER.error('Could not fetch records from oracle due to: {}.'.format(str(err))) # noqa
+
+        for insert_dict in fetch_records(cur):
+            if insert_dict['STN_ID'] not in stn_dict:
+                # range scans also cover stations without station information
+                if insert_dict['STN_ID'] not in bad_stations:
+                    LOGGER.error('Bad STN ID: {}, skipping records for this station'.format(insert_dict['STN_ID'])) # noqa
+                    bad_stations.add(insert_dict['STN_ID'])
+                continue
 
-        for row in cur:
-            insert_dict = dict(zip([x[0] for x in cur.description], row))
             # Transform Date fields from datetime to string.
             insert_dict['LOCAL_DATE'] = str(insert_dict['LOCAL_DATE']) if insert_dict['LOCAL_DATE'] is not None else insert_dict['LOCAL_DATE'] # noqa
 
@@ -904,23 +1048,20 @@ def generate_daily_data(cur, stn_dict, date=None):
                 insert_dict['LOCAL_YEAR'],
                 insert_dict['LOCAL_MONTH'], # noqa
                 insert_dict['LOCAL_DAY'])
-            if insert_dict['STN_ID'] in stn_dict:
-                coords = stn_dict[insert_dict['STN_ID']]['coordinates']
-                insert_dict['PROVINCE_CODE'] = stn_dict[insert_dict['STN_ID']]['PROVINCE_CODE'] # noqa
-                insert_dict['STATION_NAME'] = stn_dict[insert_dict['STN_ID']]['STATION_NAME'] # noqa
-                wrapper = {'type': 'Feature', 'properties': insert_dict,
-                           'geometry': {'type': 'Point',
-                                        'coordinates': coords}}
-                action = {
-                    '_id': insert_dict['ID'],
-                    '_index': 'climate_public_daily_data',
-                    '_op_type': 'update',
-                    'doc': wrapper,
-                    'doc_as_upsert': True
-                }
-                yield action
-            else:
-                LOGGER.error('Bad STN ID: {}, skipping records for this station'.format(insert_dict['STN_ID'])) # noqa
+            coords = stn_dict[insert_dict['STN_ID']]['coordinates']
+            insert_dict['PROVINCE_CODE'] = stn_dict[insert_dict['STN_ID']]['PROVINCE_CODE'] # noqa
+            insert_dict['STATION_NAME'] = stn_dict[insert_dict['STN_ID']]['STATION_NAME'] # noqa
+            wrapper = {'type': 'Feature', 'properties': insert_dict,
+                       'geometry': {'type': 'Point',
+                                    'coordinates': coords}}
+            action = {
+                '_id': insert_dict['ID'],
+                '_index': 'climate_public_daily_data',
+                '_op_type': 'update',
+                'doc': wrapper,
+                'doc_as_upsert': True
+            }
+            yield action
 
 
 def get_station_data(cur, station, starting_from):
@@ -1024,6 +1165,171 @@ def get_normals_periods(cur):
     return period_dict
 
 
+def export_daily_data(pool, stn_dict, date, fetch_size, stations_per_scan,
+                      partitions, items):
+    """
+    Worker thread: fetches the daily data of the partitions read from
+    the partitions queue over a pooled connection, and sends the
+    documents to the bulk writer in batches.
+
+    :param pool: pool of database connections returned by get_pool.
+    :param stn_dict: mapping of station IDs to station information.
+    :param date: date to start fetching data from.
+    :param fetch_size: number of rows fetched per database round trip.
+    :param stations_per_scan: number of stations per range scan of daily
+                              data (0 for a single scan of the partition),
+                              or None for one query per station.
+    :param partitions: queue.Queue of (partition, station IDs) tuples,
+                       ended by None.
+    :param items: queue.Queue of (partition, [(STN_ID, action)]) batches,
+                  (partition, None) once a partition is exported and None
+                  once the worker is done (or an exception on failure).
+    :returns: None
+    """
+
+    con = None
+    try:
+        con = pool.acquire()
+        cur = get_cursor(con, fetch_size)
+
+        for partition, stations in iter(partitions.get, None):
+            partition_dict = {station: stn_dict[station]
+                              for station in stations}
+            batch = []
+            for action in generate_daily_data(cur, partition_dict, date,
+                                              stations_per_scan):
+                batch.append((action['doc']['properties']['STN_ID'], action))
+                if len(batch) == ACTIONS_PER_BATCH:
+                    items.put((partition, batch))
+                    batch = []
+            if batch:
+                items.put((partition, batch))
+            items.put((partition, None))
+    except Exception as err:
+        LOGGER.error('Could not export daily data due to: {}.'.format(err))
+        items.put(err)
+    else:
+        items.put(None)
+    finally:
+        if con is not None:
+            pool.release(con)
+
+
+def merge_daily_data(items, workers, tracker):
+    """
+    Merges the documents of worker threads into a single stream for the
+    bulk writer, recording them (in order) in an acknowledgement tracker.
+
+    :param items: queue.Queue written to by export_daily_data.
+    :param workers: number of worker threads.
+    :param tracker: msc_pygeoapi.checkpoint.AckTracker object.
+    :returns: generator of bulk API upsert actions.
+    """
+
+    running = workers
+    while running:
+        item = items.get()
+        if item is None:
+            running -= 1
+        elif isinstance(item, Exception):
+            raise item
+        else:
+            partition, batch = item
+            if batch is None:
+                tracker.end(partition)
+                continue
+            for stn_id, action in batch:
+                tracker.add(partition, stn_id)
+                yield action
+
+
+def load_daily_data(es, db, stn_dict, date, workers, fetch_size,
+                    stations_per_scan, new_generation, resume=False):
+    """
+    Loads daily data with worker threads, each fetching STN_ID partitions
+    over its own pooled connection, into a single bulk writer.
+
+    The last STN_ID of each partition acknowledged by Elasticsearch is
+    checkpointed, so that an interrupted load can be resumed.
+
+    :param es: elasticsearch.Elasticsearch client.
+    :param db: database connection string.
+    :param stn_dict: mapping of station IDs to station information.
+    :param date: date to start fetching data from.
+    :param workers: number of worker threads (and connections).
+    :param fetch_size: number of rows fetched per database round trip.
+    :param stations_per_scan: number of stations per range scan of daily
+                              data (0 for a single scan of a partition),
+                              or None for one query per station.
+    :param new_generation: whether to load into a new index generation.
+    :param resume: whether to resume the checkpointed load.
+    :returns: bool of whether the load was successful.
+    """
+
+    checkpoint = Checkpoint(os.path.join(MSC_PYGEOAPI_CACHEDIR,
+                                         'climate_archive-checkpoint.json'))
+    progress = checkpoint.get('daily') if resume else None
+
+    if progress is not None and progress['date'] != date:
+        LOGGER.warning('Checkpointed daily load has a different --date:'
+                       ' not resuming')
+        progress = None
+
+    if progress is None:
+        generations = []
+        if new_generation:
+            generations = create_index(es, 'daily_summary')
+        size = -(-len(stn_dict) // (workers * PARTITIONS_PER_WORKER)) or 1
+        progress = {
+            'date': date,
+            'versions': [generation.version for generation in generations],
+            'partitions': plan_partitions(stn_dict, size)
+        }
+        checkpoint.set('daily', progress)
+    else:
+        LOGGER.info('Resuming daily load from checkpoint {}'.format(
+            checkpoint.filepath))
+        generations = []
+        for version in progress['versions']:
+            generations.extend(create_index(es, 'daily_summary', version))
+
+    tracker = checkpoint.tracker('daily', progress)
+    partitions = queue.Queue()
+    items = queue.Queue(maxsize=workers * 4)
+
+    for partition in remaining_keys(progress, stn_dict):
+        partitions.put(partition)
+    for _ in range(workers):
+        partitions.put(None)
+
+    pool = get_pool(db, workers)
+    for _ in range(workers):
+        threading.Thread(target=export_daily_data,
+                         args=(pool, stn_dict, date, fetch_size,
+                               stations_per_scan, partitions, items),
+                         daemon=True).start()
+
+    try:
+        ok = util.submit_elastic_package(
+            es, retarget(merge_daily_data(items, workers, tracker),
+                         generations),
+            plugin='climate_archive', on_result=tracker.on_result)
+    except Exception as err:
+        LOGGER.error('Could not load daily data due to: {}.'.format(err))
+        ok = False
+
+    if ok:
+        publish_generations(generations)
+        checkpoint.clear('daily')
+    else:
+        # keep the generation being built for a resumed load
+        publish_generations(generations, False, discard=False)
+        LOGGER.error('Daily load failed: rerun with --resume to continue'
+                     ' from checkpoint {}'.format(checkpoint.filepath))
+
+    return ok
+
+
 @click.command()
 @click.pass_context
 @click.option('--db', help='Oracle database connection string.')
@@ -1038,8 +1344,20 @@ def get_normals_periods(cur):
               help=' Load all stations starting from specified station',
               required=False)
 @click.option('--date', help='Start date to fetch updates', required=False)
+@click.option('--fetch-size', type=click.IntRange(min=1), default=FETCH_SIZE,
+              help='Rows fetched per database round trip')
+@click.option('--stations-per-scan', type=click.IntRange(min=0),
+              help='Fetch daily data by range scans ordered by STN_ID, of'
+                   ' this many stations each (0: a single scan) rather than'
+                   ' one query per station')
+@click.option('--workers', type=click.IntRange(min=1), default=1,
+              help='Number of connections fetching daily data in parallel'
+                   ' (STN_ID partitions)')
+@click.option('--resume', is_flag=True, default=False,
+              help='Resume an interrupted daily load from its checkpoint')
 def climate_archive(ctx, db, es, username, password, dataset, station=None,
-                    starting_from=False, date=None):
+                    starting_from=False, date=None, fetch_size=FETCH_SIZE,
+                    stations_per_scan=None, workers=1, resume=False):
     """
     Loads MSC Climate Archive data into Elasticsearch
 
@@ -1053,19 +1371,34 @@ def climate_archive(ctx, db, es, username, password, dataset, station=None,
     :param station: STN_ID of station to index for daily.
     :param starting_from: load all stations after specified station
     :param date: date to start fetching daily and monthly data from.
+    :param fetch_size: number of rows fetched per database round trip.
+    :param stations_per_scan: number of stations per range scan of daily
+                              data (0 for a single scan), or None for one
+                              query per station.
+    :param workers: number of connections fetching daily data in parallel.
+    :param resume: whether to resume an interrupted daily load.
     """
 
     auth = (username, password)
     es_client = util.get_es(es, auth)
 
+    if workers > 1 and dataset in ['all', 'daily']:
+        try:
+            parse_connect_string(db)
+        except ValueError as err:
+            raise click.ClickException(str(err))
+
     try:
-        con = cx_Oracle.connect(db)
+        con = connect(db)
     except Exception as err:
         msg = 'Could not connect to Oracle: {}'.format(err)
         LOGGER.critical(msg)
         raise click.ClickException(msg)
 
-    cur = con.cursor()
+    cur = get_cursor(con, fetch_size)
+
+    # partial updates are loaded into the published index(es)
+    new_generation = not (date or station or starting_from)
 
     if dataset == 'all':
         stn_dict = get_station_data(cur, station, starting_from)
@@ -1074,43 +1407,51 @@ def climate_archive(ctx, db, es, username, password, dataset, station=None,
 
         try:
             LOGGER.info('Populating stations...')
-            create_index(es_client, 'stations')
+            generations = create_index(es_client, 'stations')
             stations = generate_stations(cur)
 
-            util.submit_elastic_package(es_client, stations)
+            ok = util.submit_elastic_package(
+                es_client, retarget(stations, generations),
+                plugin='climate_archive')
+            publish_generations(generations, ok)
             LOGGER.info('Stations populated.')
         except Exception as err:
             LOGGER.error('Could not populate stations due to: {}.'.format(str(err))) # noqa
 
         try:
             LOGGER.info('Populating normals...')
-            create_index(es_client, 'normals')
+            generations = create_index(es_client, 'normals')
             normals = generate_normals(cur, stn_dict, normals_dict,
                                        periods_dict)
 
-            util.submit_elastic_package(es_client, normals)
+            ok = util.submit_elastic_package(
+                es_client, retarget(normals, generations),
+                plugin='climate_archive')
+            publish_generations(generations, ok)
             LOGGER.info('Normals populated.')
         except Exception as err:
             LOGGER.error('Could not populate normals due to: {}.'.format(str(err))) # noqa    
 
         try:
             LOGGER.info('Populating monthly summary...')
-            if not date:
-                create_index(es_client, 'monthly_summary')
+            generations = []
+            if new_generation:
+                generations = create_index(es_client, 'monthly_summary')
             monthlies = generate_monthly_data(cur, stn_dict, date)
 
-            util.submit_elastic_package(es_client, monthlies)
+            ok = util.submit_elastic_package(
+                es_client, retarget(monthlies, generations),
+                plugin='climate_archive')
+            publish_generations(generations, ok)
             LOGGER.info('Monthly Summary populated.')
         except Exception as err:
             LOGGER.error('Could not populate monthly summary due to: {}.'.format(str(err))) # noqa
 
         try:
             LOGGER.info('Populating daily summary...')
-            if not date:
-                create_index(es_client, 'daily_summary')
-            dailies = generate_daily_data(cur, stn_dict, date)
-
-            util.submit_elastic_package(es_client, dailies)
+            load_daily_data(es_client, db, stn_dict, date, workers,
+                            fetch_size, stations_per_scan, new_generation,
+                            resume)
             LOGGER.info('Daily Summary populated.')
         except Exception as err:
             LOGGER.error('Could not populate daily summary due to: {}.'.format(str(err))) # noqa
@@ -1118,10 +1459,13 @@ def climate_archive(ctx, db, es, username, password, dataset, station=None,
     elif dataset == 'stations':
         try:
             LOGGER.info('Populating stations...')
-            create_index(es_client, 'stations')
+            generations = create_index(es_client, 'stations')
             stations = generate_stations(cur)
 
-            util.submit_elastic_package(es_client, stations)
+            ok = util.submit_elastic_package(
+                es_client, retarget(stations, generations),
+                plugin='climate_archive')
+            publish_generations(generations, ok)
             LOGGER.info('Stations populated.')
         except Exception as err:
             LOGGER.error('Could not populate stations due to: {}.'.format(str(err))) # noqa
@@ -1132,11 +1476,14 @@ def climate_archive(ctx, db, es, username, password, dataset, station=None,
             stn_dict = get_station_data(cur, station, starting_from)
             normals_dict = get_normals_data(cur)
             periods_dict = get_normals_periods(cur)
-            create_index(es_client, 'normals')
+            generations = create_index(es_client, 'normals')
             normals = generate_normals(cur, stn_dict, normals_dict,
                                        periods_dict)
 
-            util.submit_elastic_package(es_client, normals)
+            ok = util.submit_elastic_package(
+                es_client, retarget(normals, generations),
+                plugin='climate_archive')
+            publish_generations(generations, ok)
             LOGGER.info('Normals populated.')
         except Exception as err:
             LOGGER.error('Could not populate normals due to: {}.'.format(str(err))) # noqa
@@ -1145,11 +1492,15 @@ def climate_archive(ctx, db, es, username, password, dataset, station=None,
         try:
             LOGGER.info('Populating monthly summary...')
             stn_dict = get_station_data(cur, station, starting_from)
-            if not (date or station or starting_from):
-                create_index(es_client, 'monthly_summary')
+            generations = []
+            if new_generation:
+                generations = create_index(es_client, 'monthly_summary')
             monthlies = generate_monthly_data(cur, stn_dict, date)
 
-            util.submit_elastic_package(es_client, monthlies)
+            ok = util.submit_elastic_package(
+                es_client, retarget(monthlies, generations),
+                plugin='climate_archive')
+            publish_generations(generations, ok)
             LOGGER.info('Monthly Summary populated.')
         except Exception as err:
             LOGGER.error('Could not populate monthly summary due to: {}.'.format(str(err))) # noqa
@@ -1158,11 +1509,9 @@ def climate_archive(ctx, db, es, username, password, dataset, station=None,
         try:
             LOGGER.info('Populating daily summary...')
             stn_dict = get_station_data(cur, station, starting_from)
-            if not (date or station or starting_from):
-                create_index(es_client, 'daily_summary')
-            dailies = generate_daily_data(cur, stn_dict, date)
-
-            util.submit_elastic_package(es_client, dailies)
+            load_daily_data(es_client, db, stn_dict, date, workers,
+                            fetch_size, stations_per_scan, new_generation,
+                            resume)
             LOGGER.info('Daily Summary populated.')
         except Exception as err:
             LOGGER.error('Could not populate daily summary due to: {}.'.format(str(err))) # noqa
@@ -40,7 +40,7 @@ from msc_pygeoapi.env import (
     MSC_PYGEOAPI_ES_TIMEOUT, MSC_PYGEOAPI_ES_URL,
     MSC_PYGEOAPI_ES_AUTH)
 from msc_pygeoapi.loader.base import BaseLoader
-from msc_pygeoapi.util import get_es, json_pretty_print
+from msc_pygeoapi.util import get_es, get_shared_es, json_pretty_print
 
 LOGGER = logging.getLogger(__name__)
 elastic_logger.setLevel(logging.WARNING)
@@ -307,7 +307,8 @@ class ForecastPolygonsLoader(BaseLoader):
 
         BaseLoader.__init__(self)
 
-        self.ES = get_es(MSC_PYGEOAPI_ES_URL, MSC_PYGEOAPI_ES_AUTH)
+        self.ES = get_shared_es(MSC_PYGEOAPI_ES_URL,
+                                MSC_PYGEOAPI_ES_AUTH)
         self.filepath = None
         self.version = None
         self.zone = None
@@ -385,6 +386,8 @@ class ForecastPolygonsLoader(BaseLoader):
         """
 
         self.filepath = Path(filepath)
+        # reset per-file state as loader instances are reused
+        self.items = []
 
         # set class variables from filename
         self.parse_filename()
@@ -454,12 +457,13 @@ def add(ctx, file_, directory):
                 files_to_process.append(os.path.join(root, f))
         files_to_process.sort(key=os.path.getmtime)
 
+    plugin_def = {
+        'filename_pattern': 'meteocode/geodata/',
+        'handler': 'msc_pygeoapi.loader.forecast_polygons.ForecastPolygonsLoader'  # noqa
+    }
+    loader = ForecastPolygonsLoader(plugin_def)
+
     for file_to_process in files_to_process:
-        plugin_def = {
-            'filename_pattern': 'meteocode/geodata/',
-            'handler': 'msc_pygeoapi.loader.forecast_polygons.ForecastPolygonsLoader'  # noqa
-        }
-        loader = ForecastPolygonsLoader(plugin_def)
         result = loader.load_data(file_to_process)
         if result:
             click.echo('GeoJSON features generated: {}'.format(
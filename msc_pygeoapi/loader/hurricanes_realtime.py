@@ -42,7 +42,8 @@ from gdal import ogr
 from msc_pygeoapi.env import (MSC_PYGEOAPI_ES_TIMEOUT, MSC_PYGEOAPI_ES_URL,
                               MSC_PYGEOAPI_ES_AUTH)
 from msc_pygeoapi.loader.base import BaseLoader
-from msc_pygeoapi.util import get_es, json_pretty_print, strftime_rfc3339
+from msc_pygeoapi.util import (get_es, get_shared_es, json_pretty_print,
+                               strftime_rfc3339)
 
 LOGGER = logging.getLogger(__name__)
 elastic_logger.setLevel(logging.WARNING)
@@ -292,7 +293,8 @@ class HurricanesRealtimeLoader(BaseLoader):
 
         BaseLoader.__init__(self)
 
-        self.ES = get_es(MSC_PYGEOAPI_ES_URL, MSC_PYGEOAPI_ES_AUTH)
+        self.ES = get_shared_es(MSC_PYGEOAPI_ES_URL,
+                                MSC_PYGEOAPI_ES_AUTH)
         self.filepath = None
         self.date_ = None
         self.fh = None
@@ -446,6 +448,8 @@ class HurricanesRealtimeLoader(BaseLoader):
         """
 
         self.filepath = Path(filepath)
+        # reset per-file state as loader instances are reused
+        self.items = []
 
         # set class variables from filename
         self.parse_filename()
@@ -524,12 +528,13 @@ def add(ctx, file_, directory):
                 files_to_process.append(os.path.join(root, f))
         files_to_process.sort(key=os.path.getmtime)
 
+    plugin_def = {
+        'filename_pattern': 'trajectoires/hurricane',
+        'handler': 'msc_pygeoapi.loader.hurricanes_realtime.HurricanesRealtimeLoader'  # noqa
+    }
+    loader = HurricanesRealtimeLoader(plugin_def)
+
     for file_to_process in files_to_process:
-        plugin_def = {
-            'filename_pattern': 'trajectoires/hurricane',
-            'handler': 'msc_pygeoapi.loader.hurricanes_realtime.HurricanesRealtimeLoader'  # noqa
-        }
-        loader = HurricanesRealtimeLoader(plugin_def)
         result = loader.load_data(file_to_process)
         if result:
             click.echo('GeoJSON features generated: {}'.format(
@@ -8,15 +8,27 @@ annual-statistics
 annual-peaks
 '''
 
+from functools import partial
+from itertools import islice
 import logging
+import multiprocessing
+import os
+import queue
 import click
-from collections import defaultdict
-from sqlalchemy import create_engine
+import numpy as np
+from sqlalchemy import create_engine, or_
 from sqlalchemy.sql import distinct
 from sqlalchemy.schema import MetaData
 from sqlalchemy.orm import sessionmaker
 
 from msc_pygeoapi import util
+from msc_pygeoapi.checkpoint import (Checkpoint, plan_partitions,
+                                     remaining_keys)
+from msc_pygeoapi.env import MSC_PYGEOAPI_CACHEDIR
+from msc_pygeoapi.manifest import (combine, diff, fingerprint_lookups,
+                                   fingerprint_table, Manifest)
+from msc_pygeoapi.reindex import (IndexGeneration, publish_generations,
+                                  retarget)
 
 
 LOGGER = logging.getLogger(__name__)
@@ -27,6 +39,56 @@ HEADERS = {'Content-type': 'application/json'}
 # Needs to be fixed.
 VERIFY = False
 
+DAYS = range(1, 32)
+DAY_NUMBERS = np.arange(1, 32)
+DAY_SUFFIXES = {day: '-{:02d}'.format(day) for day in DAYS}
+MONTHS = {month: '{:02d}'.format(month) for month in range(1, 13)}
+# (value, symbol_en, symbol_fr) of a day missing from a daily table
+NO_VALUE = (None, None, None)
+# (days, monthly mean) of a month missing from a daily table
+NO_MONTH = ([], None)
+NO_SYMBOL = (None, None)
+# daily table rows fetched per database round trip
+ROWS_PER_FETCH = 5000
+# (contiguous) station numbers handed to an export worker at a time, at most
+STATIONS_PER_TASK = 25
+# station numbers per IN clause when filtering scattered stations
+STATIONS_PER_CLAUSE = 500
+# documents sent from an export worker to the bulk writer at a time
+ACTIONS_PER_BATCH = 500
+# seconds to wait for a batch before checking that export workers are alive
+WORKER_POLL_TIMEOUT = 5
+
+# index(es) of each dataset, and the tables (fingerprinted per station) and
+# lookup tables (fingerprinted as a whole) documents are generated from
+DATASETS = {
+    'stations': {
+        'index': 'stations',
+        'aliases': ['hydrometric_stations'],
+        'tables': ['STATIONS'],
+        'lookups': ['AGENCY_LIST', 'DATUM_LIST', 'STN_STATUS_CODES']
+    },
+    'observations': {
+        'index': 'observations',
+        'aliases': ['hydrometric_daily_mean', 'hydrometric_monthly_mean'],
+        'tables': ['DLY_FLOWS', 'DLY_LEVELS'],
+        'lookups': ['DATA_SYMBOLS']
+    },
+    'annual-statistics': {
+        'index': 'annual_statistics',
+        'aliases': ['hydrometric_annual_statistics'],
+        'tables': ['ANNUAL_STATISTICS'],
+        'lookups': ['DATA_TYPES', 'DATA_SYMBOLS']
+    },
+    'annual-peaks': {
+        'index': 'annual_peaks',
+        'aliases': ['hydrometric_annual_peaks'],
+        'tables': ['ANNUAL_INSTANT_PEAKS'],
+        'lookups': ['DATA_TYPES', 'DATA_SYMBOLS', 'PRECISION_CODES',
+                    'PEAK_CODES']
+    }
+}
+
 
 def zero_pad(val):
     """
@@ -44,15 +106,38 @@ def zero_pad(val):
         return str(val)
 
 
-def create_index(es, index):
+def get_generation(es, index_name, mapping, version=None):
+    """
+    Creates a new generation of an Elasticsearch index, or resumes loading
+    into an existing (unpublished) one.
+
+    :param es: elasticsearch.Elasticsearch client.
+    :param index_name: name of the index (alias).
+    :param mapping: index settings and mappings.
+    :param version: version of a generation to resume loading into.
+
+    :returns: msc_pygeoapi.reindex.IndexGeneration object.
+    """
+    generation = IndexGeneration(es, index_name, mapping, version)
+    return generation.resume() if version else generation.create()
+
+
+def create_index(es, index, versions=None):
     """
-    Creates the Elasticsearch index named <index>. If the index already
-    exists, it is deleted and re-created. The mappings for the two types
+    Creates a new generation of the Elasticsearch index(es) named <index>,
+    to be published (aliased) once loaded. The mappings for the two types
     are also created.
 
     :param es: elasticsearch.Elasticsearch client.
     :param index: name for the index(es) to be created.
+    :param versions: list of versions of the generations to resume
+                     loading into, in the order they were created.
+
+    :returns: list of msc_pygeoapi.reindex.IndexGeneration objects.
     """
+    generations = []
+    versions = iter(versions or [])
+
     if index == 'observations':
         mapping =\
             {
@@ -136,10 +221,8 @@ def create_index(es, index):
             }
 
         index_name = 'hydrometric_daily_mean'
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the daily observations index')
-        es.indices.create(index=index_name, body=mapping)
+        generations.append(
+            get_generation(es, index_name, mapping, next(versions, None)))
 
         mapping =\
             {
@@ -199,10 +282,8 @@ def create_index(es, index):
             }
 
         index_name = 'hydrometric_monthly_mean'
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the monthly observations index')
-        es.indices.create(index=index_name, body=mapping)
+        generations.append(
+            get_generation(es, index_name, mapping, next(versions, None)))
 
     if index == 'annual_statistics':
         mapping =\
@@ -303,10 +384,8 @@ def create_index(es, index):
             }
 
         index_name = 'hydrometric_annual_statistics'
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the annual statistics index')
-        es.indices.create(index=index_name, body=mapping)
+        generations.append(
+            get_generation(es, index_name, mapping, next(versions, None)))
 
     if index == 'stations':
         mapping =\
@@ -387,10 +466,8 @@ def create_index(es, index):
             }
 
         index_name = 'hydrometric_stations'
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the stations index')
-        es.indices.create(index=index_name, body=mapping)
+        generations.append(
+            get_generation(es, index_name, mapping, next(versions, None)))
 
     if index == 'annual_peaks':
         mapping =\
@@ -502,10 +579,10 @@ def create_index(es, index):
             }
 
         index_name = 'hydrometric_annual_peaks'
-        if es.indices.exists(index_name):
-            es.indices.delete(index_name)
-            LOGGER.info('Deleted the annual peaks index')
-        es.indices.create(index=index_name, body=mapping)
+        generations.append(
+            get_generation(es, index_name, mapping, next(versions, None)))
+
+    return generations
 
 
 def connect_db(db_string):
@@ -545,88 +622,305 @@ def get_table_var(metadata, table_name):
             return t
 
 
-def generate_obs(session, station, var, symbol_table, discharge=True):
+class StationRange(frozenset):
+    """
+    Set of station numbers that are contiguous in the sorted stations of a
+    dataset (e.g. a shard of a full load).
+    """
+
+    @property
+    def first(self):
+        return min(self)
+
+    @property
+    def last(self):
+        return max(self)
+
+
+def filter_stations(query, table, station_numbers):
+    """
+    Restricts a query to a set of station numbers. Contiguous shards of
+    stations are read as a range of the primary key index; other sets
+    (e.g. the scattered stations of an incremental load) as lists of
+    station numbers, in chunks of STATIONS_PER_CLAUSE.
+
+    :param query: SQLAlchemy query object.
+    :param table: table object queried, with a STATION_NUMBER column.
+    :param station_numbers: set of station numbers, or None for all.
+
+    :returns: the query, filtered if station_numbers is not empty.
+    """
+    if not station_numbers:
+        return query
+
+    column = table.c['STATION_NUMBER']
+
+    if isinstance(station_numbers, StationRange):
+        return query.filter(column.between(station_numbers.first,
+                                           station_numbers.last))
+
+    stations = sorted(station_numbers)
+    return query.filter(or_(*[
+        column.in_(stations[i:i + STATIONS_PER_CLAUSE])
+        for i in range(0, len(stations), STATIONS_PER_CLAUSE)]))
+
+
+def get_day_columns(var, word_in):
     """
-    Generates a list of discharge or level obs for station.
-    Each observation in the list is of the form:
-    {'Station_number' : 'foo', 'Date' : yyyy-MM-dd, 'Discharge'/'Level' : 'X'}.
+    Gets the positions of the columns of a wide daily table
+    (DLY_FLOWS or DLY_LEVELS) needed to unpivot its rows.
+
+    :param var: table object of the daily table.
+    :param word_in: column prefix of daily values ('FLOW' or 'LEVEL').
+
+    :returns: `dict` of column positions; 'VALUES' and 'SYMBOLS' are
+              lists of the positions for days 1 to 31.
+    """
+    keys = var.columns.keys()
+
+    columns = {key: keys.index(key) for key in
+               ['STATION_NUMBER', 'YEAR', 'MONTH', 'NO_DAYS', 'MONTHLY_MEAN']}
+    columns['VALUES'] = [keys.index('{}{}'.format(word_in, day))
+                         for day in DAYS]
+    columns['SYMBOLS'] = [keys.index('{}_SYMBOL{}'.format(word_in, day))
+                          for day in DAYS]
+
+    return columns
+
+
+def load_symbols(session, symbol_table):
+    """
+    Preloads the data symbols table.
 
     :param session: SQLAlchemy session object.
-    :param station: the station to generate_obs for.
-    :param var: table object to query discharge or level data from.
     :param symbol_table: table object to query symbol data from.
-    :param discharge: boolean to determine whether discharge or level
-                      data is returned.
 
-    :returns: tuple of lists of dictionaries containing daily obs
-              and monthly means for the station passed in as <station>.
+    :returns: `dict` of (SYMBOL_EN, SYMBOL_FR) tuples keyed by SYMBOL_ID.
     """
-    keys = var.columns.keys()
-    symbol_keys = symbol_table.columns.keys()
-    args = {'STATION_NUMBER': station}
-    # get all obs for station
-    obs = session.query(var).filter_by(**args).all()
-    lst = []
-    mean_lst = []
-    if discharge:
-        word_in = 'FLOW'
-        word_out = 'DISCHARGE'
-    else:
-        word_in = 'LEVEL'
-        word_out = 'LEVEL'
-    for row in obs:
-        if discharge:
-            no_days = row[4]
+    query = session.query(symbol_table.c['SYMBOL_ID'],
+                          symbol_table.c['SYMBOL_EN'],
+                          symbol_table.c['SYMBOL_FR'])
+
+    return {symbol_id: (symbol_en, symbol_fr)
+            for symbol_id, symbol_en, symbol_fr in query}
+
+
+def load_stations(session, station_table):
+    """
+    Preloads the station metadata needed by observation documents.
+
+    :param session: SQLAlchemy session object.
+    :param station_table: table object to query station data from.
+
+    :returns: `dict` of (STATION_NAME, PROV_TERR_STATE_LOC, [lon, lat])
+              tuples keyed by STATION_NUMBER.
+    """
+    query = session.query(station_table.c['STATION_NUMBER'],
+                          station_table.c['STATION_NAME'],
+                          station_table.c['PROV_TERR_STATE_LOC'],
+                          station_table.c['LONGITUDE'],
+                          station_table.c['LATITUDE'])
+
+    return {station: (name, province, [float(lon), float(lat)])
+            for station, name, province, lon, lat in query}
+
+
+class LookupRecord(object):
+    """bilingual label of a HYDAT reference table code"""
+
+    __slots__ = ('en', 'fr')
+
+    def __init__(self, en, fr):
+        self.en = en
+        self.fr = fr
+
+
+class StationRecord(object):
+    """metadata of a HYDAT station"""
+
+    __slots__ = ('name', 'province', 'status', 'longitude', 'latitude',
+                 'contributor_id', 'datum_id')
+
+    def __init__(self, name, province, status, longitude, latitude,
+                 contributor_id, datum_id):
+        self.name = name
+        self.province = province
+        self.status = status
+        self.longitude = longitude
+        self.latitude = latitude
+        self.contributor_id = contributor_id
+        self.datum_id = datum_id
+
+    @property
+    def coordinates(self):
+        return [float(self.longitude), float(self.latitude)]
+
+
+class HydatLookupCache(object):
+    """HYDAT station and reference tables, each loaded once"""
+
+    __slots__ = ('stations', 'agencies', 'datums', 'statuses', 'data_types',
+                 'symbols', 'precisions', 'peaks')
+
+    # attribute: (table, code column, english column, french column)
+    LOOKUPS = {
+        'agencies': ('AGENCY_LIST', 'AGENCY_ID', 'AGENCY_EN', 'AGENCY_FR'),
+        'datums': ('DATUM_LIST', 'DATUM_ID', 'DATUM_EN', 'DATUM_FR'),
+        'statuses': ('STN_STATUS_CODES', 'STATUS_CODE', 'STATUS_EN',
+                     'STATUS_FR'),
+        'data_types': ('DATA_TYPES', 'DATA_TYPE', 'DATA_TYPE_EN',
+                       'DATA_TYPE_FR'),
+        'symbols': ('DATA_SYMBOLS', 'SYMBOL_ID', 'SYMBOL_EN', 'SYMBOL_FR'),
+        'precisions': ('PRECISION_CODES', 'PRECISION_CODE', 'PRECISION_EN',
+                       'PRECISION_FR'),
+        'peaks': ('PEAK_CODES', 'PEAK_CODE', 'PEAK_EN', 'PEAK_FR')
+    }
+
+    def __init__(self, session, metadata):
+        """
+        Loads the stations and reference tables into dicts keyed by
+        primary key.
+
+        :param session: SQLAlchemy session object.
+        :param metadata: db metadata returned by connect_db.
+        """
+        station_table = get_table_var(metadata, 'STATIONS')
+        query = session.query(*[station_table.c[column] for column in (
+            'STATION_NUMBER', 'STATION_NAME', 'PROV_TERR_STATE_LOC',
+            'HYD_STATUS', 'LONGITUDE', 'LATITUDE', 'CONTRIBUTOR_ID',
+            'DATUM_ID')])
+        self.stations = {row[0]: StationRecord(*row[1:]) for row in query}
+
+        for attribute, columns in self.LOOKUPS.items():
+            table_name, code, en, fr = columns
+            table = get_table_var(metadata, table_name)
+            query = session.query(table.c[code], table.c[en], table.c[fr])
+            setattr(self, attribute, {
+                key: LookupRecord(label_en, label_fr)
+                for key, label_en, label_fr in query
+            })
+
+        LOGGER.debug('Loaded {} stations and reference tables'.format(
+            len(self.stations)))
+
+
+def stream_months(session, var, columns, symbols, station_numbers=None):
+    """
+    Streams the rows of a wide daily table ordered by station, year and
+    month (i.e. its primary key), unpivoting them chunk by chunk with
+    melt_months.
+
+    :param session: SQLAlchemy session object.
+    :param var: table object of the daily table.
+    :param columns: column positions returned by get_day_columns.
+    :param symbols: `dict` of symbols returned by load_symbols.
+    :param station_numbers: set of station numbers whose range of rows
+                            to stream, or None for all rows.
+
+    :returns: generator of ((station, year, month), (days, mean)) tuples,
+              as returned by melt_months.
+    """
+    query = session.query(var).order_by(var.c['STATION_NUMBER'],
+                                        var.c['YEAR'],
+                                        var.c['MONTH'])
+    query = filter_stations(query, var, station_numbers)
+    rows = iter(query.yield_per(ROWS_PER_FETCH))
+
+    while True:
+        chunk = [tuple(row) for row in islice(rows, ROWS_PER_FETCH)]
+        if not chunk:
+            break
+
+        keys = [(row[columns['STATION_NUMBER']], row[columns['YEAR']],
+                 row[columns['MONTH']]) for row in chunk]
+
+        yield from zip(keys, melt_months(chunk, columns, symbols))
+
+
+def melt_months(rows, columns, symbols):
+    """
+    Unpivots the valid days (1 to NO_DAYS) of a chunk of wide monthly
+    rows, melting the 31 value and symbol columns in one vectorized step.
+
+    :param rows: `list` of rows (tuples) of a daily table.
+    :param columns: column positions returned by get_day_columns.
+    :param symbols: `dict` of symbols returned by load_symbols.
+
+    :returns: `list` of (days, monthly mean) tuples, one per row, where
+              days is a list of (value, symbol_en, symbol_fr) tuples,
+              one per valid day.
+    """
+    block = np.array(rows, dtype=object)
+
+    # None becomes NaN
+    values = np.array(block[:, columns['VALUES']].tolist(), dtype=float)
+    no_days = np.array(block[:, columns['NO_DAYS']].tolist(), dtype=float)
+    means = np.array(block[:, columns['MONTHLY_MEAN']].tolist(), dtype=float)
+
+    mask = DAY_NUMBERS <= np.nan_to_num(no_days)[:, None]
+    counts = mask.sum(axis=1)
+    offsets = np.concatenate(([0], np.cumsum(counts))).tolist()
+
+    # melt: one entry per valid (row, day), in row then day order
+    melted = values[mask]
+    day_values = melted.astype(object)
+    day_values[np.isnan(melted)] = None
+
+    # translate each distinct symbol once
+    day_symbols = block[:, columns['SYMBOLS']][mask]
+    day_symbols[np.equal(day_symbols, None)] = ''
+    codes, inverse = np.unique(day_symbols.astype(str), return_inverse=True)
+    translations = [symbols.get(code, NO_SYMBOL) if code.strip()
+                    else NO_SYMBOL for code in codes]
+    symbols_en = np.array([en for en, _ in translations],
+                          dtype=object)[inverse].tolist()
+    symbols_fr = np.array([fr for _, fr in translations],
+                          dtype=object)[inverse].tolist()
+    day_values = day_values.tolist()
+
+    # a zero monthly mean is reported as null, as it always has been
+    means = [float(mean) if mean else None
+             for mean in np.where(np.isnan(means), 0, means).tolist()]
+
+    return [(list(zip(day_values[start:end], symbols_en[start:end],
+                      symbols_fr[start:end])), mean)
+            for start, end, mean in zip(offsets, offsets[1:], means)]
+
+
+def merge_months(discharge_months, level_months):
+    """
+    Merge-joins two (key, month) streams ordered by key (full outer join).
+
+    :param discharge_months: ordered generator of (key, month) tuples.
+    :param level_months: ordered generator of (key, month) tuples.
+
+    :returns: generator of (key, discharge month, level month) tuples,
+              with (`[]`, `None`) in place of a missing month.
+    """
+    discharge = next(discharge_months, None)
+    level = next(level_months, None)
+
+    while discharge is not None or level is not None:
+        if level is None or (discharge is not None and
+                             discharge[0] < level[0]):
+            yield discharge[0], discharge[1], NO_MONTH
+            discharge = next(discharge_months, None)
+        elif discharge is None or level[0] < discharge[0]:
+            yield level[0], NO_MONTH, level[1]
+            level = next(level_months, None)
         else:
-            no_days = row[5]
-        # get a month's worth of obs for station
-        for i in range(1, no_days + 1):
-            insert_dict = {'STATION_NUMBER': row[0], 'DATE': '', word_out: '',
-                           'IDENTIFIER': ''}
-            date = '{}-{}-{}'.format(str(row[1]),
-                                     zero_pad(row[2]),
-                                     zero_pad(i))
-            insert_dict['DATE'] = date
-            insert_dict['IDENTIFIER'] = '{}.{}'.format(row[0], date)
-            value = row[keys.index(word_in.upper() + str(i))]
-            symbol = row[keys.index(word_in.upper() + '_SYMBOL' + str(i))]
-            if symbol is not None and symbol.strip():
-                args = {'SYMBOL_ID': symbol}
-                symbol_data = list(session.query(symbol_table).filter_by(**args).all()[0]) # noqa
-                symbol_en = symbol_data[symbol_keys.index('SYMBOL_EN')]
-                symbol_fr = symbol_data[symbol_keys.index('SYMBOL_FR')]
-                insert_dict[word_out + '_SYMBOL_EN'] = symbol_en
-                insert_dict[word_out + '_SYMBOL_FR'] = symbol_fr
-            else:
-                insert_dict[word_out + '_SYMBOL_EN'] = None
-                insert_dict[word_out + '_SYMBOL_FR'] = None
-            if value is None:
-                insert_dict[word_out] = None
-            else:
-                insert_dict[word_out] = float(value)
-            lst.append(insert_dict)
-            LOGGER.debug('Generated a daily mean value for date {} and station {}'.format(insert_dict['DATE'], insert_dict['STATION_NUMBER'])) # noqa
-
-            mean_dict = {}
-            date = '{}-{}'.format(str(row[1]),
-                                  zero_pad(row[2]))
-            mean_dict['DATE'] = date
-            mean_dict['IDENTIFIER'] = '{}.{}'.format(row[0], date)
-
-            if row[keys.index('MONTHLY_MEAN')]:
-                mean_dict['MONTHLY_MEAN_' + word_out] = float(row[keys.index('MONTHLY_MEAN')]) # noqa
-            else:
-                mean_dict['MONTHLY_MEAN_' + word_out] = None
-            mean_lst.append(mean_dict)
-            LOGGER.debug('Generated a monthly mean value for date {} and station {}'.format(mean_dict['DATE'], insert_dict['STATION_NUMBER'])) # noqa
-    return (lst, mean_lst)
+            yield discharge[0], discharge[1], level[1]
+            discharge = next(discharge_months, None)
+            level = next(level_months, None)
 
 
 def generate_means(session, discharge_var, level_var,
-                   station_table, symbol_table):
+                   station_table, symbol_table, station_numbers=None,
+                   symbols=None, stations=None):
     """
-    Unpivots db observations one station at a time, and reformats
-    observations so they can be bulk inserted to Elasticsearch.
+    Unpivots db observations in a single ordered pass over the daily
+    discharge and level tables, and reformats observations so they can
+    be bulk inserted to Elasticsearch.
 
     Returns a generator of dictionaries that represent upsert actions
     into Elasticsearch's bulk API.
@@ -638,86 +932,120 @@ def generate_means(session, discharge_var, level_var,
     :param level_var: table object to query level data from.
     :param station_table: table object to query station data from.
     :param symbol_table: table object to query symbol data from.
+    :param station_numbers: set of station numbers to generate documents
+                            for, or None for all stations.
+    :param symbols: dict returned by load_symbols (loaded if None).
+    :param stations: dict returned by load_stations (loaded if None).
     :returns: generator of bulk API upsert actions.
     """
-    discharge_station_codes = [x[0] for x in session.query(distinct(discharge_var.c['STATION_NUMBER'])).all()] # noqa
-    level_station_codes = [x[0] for x in session.query(distinct(level_var.c['STATION_NUMBER'])).all()] # noqa
-    station_codes = list(set(discharge_station_codes).union(level_station_codes)) # noqa
-    for station in station_codes:
-        LOGGER.debug('Generating discharge and level values for station {}'.format(station)) # noqa
-        discharge_lst, discharge_means = \
-            generate_obs(session, station, discharge_var, symbol_table, True)
-        level_lst, level_means = generate_obs(session, station, level_var,
-                                              symbol_table, False)
-        station_keys = station_table.columns.keys()
-        args = {'STATION_NUMBER': station}
-        # Gather station metadata from the stations table.
-        station_metadata = list(session.query(station_table).filter_by(**args).all()[0]) # noqa
-        station_name = station_metadata[station_keys.index('STATION_NAME')]
-        province = station_metadata[station_keys.index('PROV_TERR_STATE_LOC')]
-        station_coords = [float(station_metadata[station_keys.index('LONGITUDE')]), # noqa
-                          float(station_metadata[station_keys.index('LATITUDE')])] # noqa
-        # combine dictionaries with dates in common
-        d = defaultdict(dict)
-        for el in (discharge_lst, level_lst):
-            for elem in el:
-                d[elem['DATE']].update(elem)
-        comb_list = d.values()
-        # add missing discharge/level key to any dicts that were
-        # not combined (i.e. full outer join)
-        for item in comb_list:
-            if 'LEVEL' not in item:
-                item['LEVEL'] = None
-                item['LEVEL_SYMBOL_EN'] = None
-                item['LEVEL_SYMBOL_FR'] = None
-            if 'DISCHARGE' not in item:
-                item['DISCHARGE'] = None
-                item['DISCHARGE_SYMBOL_EN'] = None
-                item['DISCHARGE_SYMBOL_FR'] = None
-            wrapper = {'type': 'Feature', 'properties': item,
-                       'geometry': {'type': 'Point'}}
-            wrapper['properties']['STATION_NAME'] = station_name
-            wrapper['properties']['PROV_TERR_STATE_LOC'] = province
-            wrapper['geometry']['coordinates'] = station_coords
-            action = {
-                '_id': item['IDENTIFIER'],
+    if symbols is None:
+        symbols = load_symbols(session, symbol_table)
+    if stations is None:
+        stations = load_stations(session, station_table)
+
+    discharge_columns = get_day_columns(discharge_var, 'FLOW')
+    level_columns = get_day_columns(level_var, 'LEVEL')
+
+    months = merge_months(
+        stream_months(session, discharge_var, discharge_columns, symbols,
+                      station_numbers),
+        stream_months(session, level_var, level_columns, symbols,
+                      station_numbers))
+
+    missing_stations = set()
+
+    for (station, year, month), discharge_month, level_month in months:
+        if station_numbers is not None and station not in station_numbers:
+            continue
+
+        if station not in stations:
+            if station not in missing_stations:
+                LOGGER.error('Station {} not found in stations table'
+                             ' (skipping)'.format(station))
+                missing_stations.add(station)
+            continue
+
+        station_name, province, station_coords = stations[station]
+
+        discharges, discharge_mean = discharge_month
+        levels, level_mean = level_month
+
+        if not discharges and not levels:
+            continue
+
+        month = '{}-{}'.format(year, MONTHS[month])
+
+        # days present in only one table get null values for the other
+        # (i.e. full outer join)
+        for day in range(1, max(len(discharges), len(levels)) + 1):
+            discharge, discharge_symbol_en, discharge_symbol_fr = \
+                discharges[day - 1] if day <= len(discharges) else NO_VALUE
+            level, level_symbol_en, level_symbol_fr = \
+                levels[day - 1] if day <= len(levels) else NO_VALUE
+
+            date = month + DAY_SUFFIXES[day]
+            identifier = '{}.{}'.format(station, date)
+
+            wrapper = {
+                'type': 'Feature',
+                'properties': {
+                    'STATION_NUMBER': station,
+                    'DATE': date,
+                    'IDENTIFIER': identifier,
+                    'DISCHARGE': discharge,
+                    'DISCHARGE_SYMBOL_EN': discharge_symbol_en,
+                    'DISCHARGE_SYMBOL_FR': discharge_symbol_fr,
+                    'LEVEL': level,
+                    'LEVEL_SYMBOL_EN': level_symbol_en,
+                    'LEVEL_SYMBOL_FR': level_symbol_fr,
+                    'STATION_NAME': station_name,
+                    'PROV_TERR_STATE_LOC': province
+                },
+                'geometry': {
+                    'type': 'Point',
+                    'coordinates': station_coords
+                }
+            }
+            yield {
+                '_id': identifier,
                 '_index': 'hydrometric_daily_mean',
                 '_op_type': 'update',
                 'doc': wrapper,
                 'doc_as_upsert': True
             }
-            yield action
 
-        # Insert all monthly means for this station
-        d = defaultdict(dict)
-        for el in (discharge_means, level_means):
-            for elem in el:
-                d[elem['DATE']].update(elem)
-        comb_list = d.values()
-        # add missing mean discharge/level key to any dicts that were
-        # not combined (i.e. full outer join)
-        for item in comb_list:
-            if 'MONTHLY_MEAN_LEVEL' not in item:
-                item['MONTHLY_MEAN_LEVEL'] = None
-            if 'MONTHLY_MEAN_DISCHARGE' not in item:
-                item['MONTHLY_MEAN_DISCHARGE'] = None
-            wrapper = {'type': 'Feature', 'properties': item,
-                       'geometry': {'type': 'Point'}}
-            wrapper['properties']['STATION_NAME'] = station_name
-            wrapper['properties']['STATION_NUMBER'] = station
-            wrapper['properties']['PROV_TERR_STATE_LOC'] = province
-            wrapper['geometry']['coordinates'] = station_coords
-            action = {
-                '_id': item['IDENTIFIER'],
-                '_index': 'hydrometric_monthly_mean',
-                '_op_type': 'update',
-                'doc': wrapper,
-                'doc_as_upsert': True
+        # a monthly mean is only reported for tables with valid days
+        date = month
+        identifier = '{}.{}'.format(station, date)
+
+        wrapper = {
+            'type': 'Feature',
+            'properties': {
+                'DATE': date,
+                'IDENTIFIER': identifier,
+                'MONTHLY_MEAN_DISCHARGE':
+                    discharge_mean if discharges else None,
+                'MONTHLY_MEAN_LEVEL': level_mean if levels else None,
+                'STATION_NAME': station_name,
+                'STATION_NUMBER': station,
+                'PROV_TERR_STATE_LOC': province
+            },
+            'geometry': {
+                'type': 'Point',
+                'coordinates': station_coords
             }
-            yield action
+        }
+        yield {
+            '_id': identifier,
+            '_index': 'hydrometric_monthly_mean',
+            '_op_type': 'update',
+            'doc': wrapper,
+            'doc_as_upsert': True
+        }
 
 
-def generate_stations(session, metadata, path, station_table):
+def generate_stations(session, metadata, path, station_table,
+                      station_numbers=None, lookups=None):
     """
     Queries station data from the db, and reformats
     data so it can be inserted into Elasticsearch.
@@ -729,50 +1057,47 @@ def generate_stations(session, metadata, path, station_table):
     :param metadata: db metadata returned by connect_db.
     :param path: URL to Elasticsearch.
     :param station_table: table object to query station data from.
+    :param station_numbers: set of station numbers to generate documents
+                            for, or None for all stations.
+    :param lookups: HydatLookupCache object (loaded if None).
     :returns: generator of bulk API upsert actions.
     """
 
     url = 'https://api.geo.weather.gc.ca'
 
-    station_codes = [x[0] for x in session.query(distinct(station_table.c['STATION_NUMBER'])).all()] # noqa
+    if lookups is None:
+        lookups = HydatLookupCache(session, metadata)
+
+    if station_numbers is None:
+        station_codes = [x[0] for x in session.query(distinct(station_table.c['STATION_NUMBER'])).all()] # noqa
+    else:
+        station_codes = sorted(station for station in station_numbers
+                               if station in lookups.stations)
     for station in station_codes:
-        station_keys = station_table.columns.keys()
-        args = {'STATION_NUMBER': station}
         # Gather station metadata from the stations table.
-        station_metadata = list(session.query(station_table).filter_by(**args).all()[0]) # noqa
-        station_name = station_metadata[station_keys.index('STATION_NAME')]
-        station_loc = station_metadata[station_keys.index('PROV_TERR_STATE_LOC')] # noqa
-        station_status = station_metadata[station_keys.index('HYD_STATUS')]
-        station_coords = [float(station_metadata[station_keys.index('LONGITUDE')]), # noqa
-                          float(station_metadata[station_keys.index('LATITUDE')])] # noqa
-        agency_id = station_metadata[station_keys.index('CONTRIBUTOR_ID')]
-        datum_id = station_metadata[station_keys.index('DATUM_ID')]
+        station_metadata = lookups.stations[station]
+        station_name = station_metadata.name
+        station_loc = station_metadata.province
+        station_status = station_metadata.status
+        station_coords = station_metadata.coordinates
+        agency_id = station_metadata.contributor_id
+        datum_id = station_metadata.datum_id
         if agency_id is not None:
-            agency_args = {'AGENCY_ID': agency_id}
-            agency_table = get_table_var(metadata, 'AGENCY_LIST')
-            agency_keys = agency_table.columns.keys()
-            agency_metadata = list(session.query(agency_table).filter_by(**agency_args).all()[0]) # noqa
-            agency_en = agency_metadata[agency_keys.index('AGENCY_EN')]
-            agency_fr = agency_metadata[agency_keys.index('AGENCY_FR')]
+            agency = lookups.agencies[agency_id]
+            agency_en = agency.en
+            agency_fr = agency.fr
         else:
             agency_en = agency_fr = ''
             LOGGER.warning('Could not find agency information for station {}'.format(station)) # noqa
         if datum_id is not None:
-            datum_args = {'DATUM_ID': datum_id}
-            datum_table = get_table_var(metadata, 'DATUM_LIST')
-            datum_keys = datum_table.columns.keys()
-            datum_metadata = list(session.query(datum_table).filter_by(**datum_args).all()[0]) # noqa
-            datum_en = datum_metadata[datum_keys.index('DATUM_EN')]
+            datum_en = lookups.datums[datum_id].en
         else:
             datum_en = ''
             LOGGER.warning('Could not find datum information for station {}'.format(station)) # noqa
         if station_status is not None:
-            status_args = {'STATUS_CODE': station_status}
-            status_table = get_table_var(metadata, 'STN_STATUS_CODES')
-            status_keys = status_table.columns.keys()
-            status_metadata = list(session.query(status_table).filter_by(**status_args).all()[0]) # noqa
-            status_en = status_metadata[status_keys.index('STATUS_EN')]
-            status_fr = status_metadata[status_keys.index('STATUS_FR')]
+            status = lookups.statuses[station_status]
+            status_en = status.en
+            status_fr = status.fr
         else:
             status_en = status_fr = ''
             LOGGER.warning('Could not find status information for station {}'.format(station)) # noqa
@@ -850,7 +1175,8 @@ def generate_stations(session, metadata, path, station_table):
 
 
 def generate_annual_stats(session, annual_stats_table, data_types_table,
-                          station_table, symbol_table):
+                          station_table, symbol_table, station_numbers=None,
+                          lookups=None):
     """
     Queries annual statistics data from the db, and reformats
     data so it can be inserted into Elasticsearch.
@@ -863,15 +1189,23 @@ def generate_annual_stats(session, annual_stats_table, data_types_table,
     :param data_types_table: table object to query data types data from.
     :param station_table: table object to query station data from.
     :param symbol_table: table object to query symbol data from.
+    :param station_numbers: set of station numbers to generate documents
+                            for, or None for all stations.
+    :param lookups: HydatLookupCache object (loaded if None).
     :returns: generator of bulk API upsert actions.
     """
-    results = session.query(annual_stats_table).group_by(annual_stats_table.c['STATION_NUMBER'], annual_stats_table.c['DATA_TYPE'], annual_stats_table.c['YEAR']).all() # noqa
+    if lookups is None:
+        lookups = HydatLookupCache(session, station_table.metadata)
+    results = session.query(annual_stats_table).group_by(annual_stats_table.c['STATION_NUMBER'], annual_stats_table.c['DATA_TYPE'], annual_stats_table.c['YEAR']) # noqa
+    results = filter_stations(results, annual_stats_table,
+                              station_numbers).all()
     results = [list(x) for x in results]
     annual_stats_keys = annual_stats_table.columns.keys()
-    station_keys = station_table.columns.keys()
-    data_types_keys = data_types_table.columns.keys()
     for result in results:
         station_number = result[annual_stats_keys.index('STATION_NUMBER')]
+        if station_numbers is not None and \
+                station_number not in station_numbers:
+            continue
         data_type = result[annual_stats_keys.index('DATA_TYPE')]
         year = result[annual_stats_keys.index('YEAR')]
         min_month = result[annual_stats_keys.index('MIN_MONTH')]
@@ -882,16 +1216,13 @@ def generate_annual_stats(session, annual_stats_table, data_types_table,
         max_day = result[annual_stats_keys.index('MAX_DAY')]
         max_value = result[annual_stats_keys.index('MAX')]
         max_symbol = result[annual_stats_keys.index('MAX_SYMBOL')]
-        args = {'STATION_NUMBER': station_number}
-        station_metadata = list(session.query(station_table).filter_by(**args).all()[0]) # noqa
-        args = {'DATA_TYPE': data_type}
-        data_type_metadata = list(session.query(data_types_table).filter_by(**args).all()[0]) # noqa
-        station_name = station_metadata[station_keys.index('STATION_NAME')]
-        province = station_metadata[station_keys.index('PROV_TERR_STATE_LOC')]
-        station_coords = [float(station_metadata[station_keys.index('LONGITUDE')]), # noqa
-                          float(station_metadata[station_keys.index('LATITUDE')])] # noqa
-        data_type_en = data_type_metadata[data_types_keys.index('DATA_TYPE_EN')] # noqa
-        data_type_fr = data_type_metadata[data_types_keys.index('DATA_TYPE_FR')] # noqa
+        station_metadata = lookups.stations[station_number]
+        data_type_metadata = lookups.data_types[data_type]
+        station_name = station_metadata.name
+        province = station_metadata.province
+        station_coords = station_metadata.coordinates
+        data_type_en = data_type_metadata.en
+        data_type_fr = data_type_metadata.fr
         if data_type_en == 'Flow':
             data_type_en = 'Discharge'
         if min_month is None or min_day is None:
@@ -906,20 +1237,17 @@ def generate_annual_stats(session, annual_stats_table, data_types_table,
         else:
             max_date = '{}-{}-{}'.format(year, zero_pad(max_month),
                                          zero_pad(max_day))
-        symbol_keys = symbol_table.columns.keys()
         if min_symbol is not None and min_symbol.strip():
-            args = {'SYMBOL_ID': min_symbol}
-            symbol_data = list(session.query(symbol_table).filter_by(**args).all()[0]) # noqa
-            min_symbol_en = symbol_data[symbol_keys.index('SYMBOL_EN')]
-            min_symbol_fr = symbol_data[symbol_keys.index('SYMBOL_FR')]
+            symbol_data = lookups.symbols[min_symbol]
+            min_symbol_en = symbol_data.en
+            min_symbol_fr = symbol_data.fr
         else:
             min_symbol_en = min_symbol_fr = ''
             LOGGER.warning('Could not find min symbol for station {}'.format(station_number)) # noqa
         if max_symbol is not None and max_symbol.strip():
-            args = {'SYMBOL_ID': max_symbol}
-            symbol_data = list(session.query(symbol_table).filter_by(**args).all()[0]) # noqa
-            max_symbol_en = symbol_data[symbol_keys.index('SYMBOL_EN')]
-            max_symbol_fr = symbol_data[symbol_keys.index('SYMBOL_FR')]
+            symbol_data = lookups.symbols[max_symbol]
+            max_symbol_en = symbol_data.en
+            max_symbol_fr = symbol_data.fr
         else:
             max_symbol_en = max_symbol_fr = ''
             LOGGER.warning('Could not find max symbol for station {}'.format(station_number)) # noqa
@@ -967,7 +1295,8 @@ def generate_annual_stats(session, annual_stats_table, data_types_table,
 
 
 def generate_annual_peaks(session, metadata, annual_peaks_table,
-                          data_types_table, symbol_table, station_table):
+                          data_types_table, symbol_table, station_table,
+                          station_numbers=None, lookups=None):
     """
     Queries annual peaks data from the db, and reformats
     data so it can be inserted into Elasticsearch.
@@ -981,18 +1310,26 @@ def generate_annual_peaks(session, metadata, annual_peaks_table,
     :param data_types_table: table object to query data types data from.
     :param symbol_table: table object to query symbol data from.
     :param station_table: table object to query station data from.
+    :param station_numbers: set of station numbers to generate documents
+                            for, or None for all stations.
+    :param lookups: HydatLookupCache object (loaded if None).
     :returns: generator of bulk API upsert actions.
     """
+    if lookups is None:
+        lookups = HydatLookupCache(session, metadata)
     tz_map = {None: None, '*': None, '0': None, 'AKST': '-9', 'AST': '-4',
               'CST': '-6', 'EST': '-5', 'MDT': '-6', 'MST': '-7',
               'NST': '-3.5', 'PST': '-8', 'YST': '-9'}
     annual_peaks_keys = annual_peaks_table.columns.keys()
-    station_keys = station_table.columns.keys()
-    data_types_keys = data_types_table.columns.keys()
-    results = session.query(annual_peaks_table).group_by(annual_peaks_table.c['STATION_NUMBER'], annual_peaks_table.c['DATA_TYPE'], annual_peaks_table.c['YEAR'], annual_peaks_table.c['PEAK_CODE']).all() # noqa
+    results = session.query(annual_peaks_table).group_by(annual_peaks_table.c['STATION_NUMBER'], annual_peaks_table.c['DATA_TYPE'], annual_peaks_table.c['YEAR'], annual_peaks_table.c['PEAK_CODE']) # noqa
+    results = filter_stations(results, annual_peaks_table,
+                              station_numbers).all()
     results = [list(x) for x in results]
     for result in results:
         station_number = result[annual_peaks_keys.index('STATION_NUMBER')]
+        if station_numbers is not None and \
+                station_number not in station_numbers:
+            continue
         data_type = result[annual_peaks_keys.index('DATA_TYPE')]
         year = result[annual_peaks_keys.index('YEAR')]
         peak_id = result[annual_peaks_keys.index('PEAK_CODE')]
@@ -1013,51 +1350,39 @@ def generate_annual_peaks(session, metadata, annual_peaks_table,
             date = '{}-{}-{}T{}:{}'.format(year, zero_pad(month),
                                            zero_pad(day), zero_pad(hour),
                                            zero_pad(minute))
-        args = {'STATION_NUMBER': station_number}
         try:
-            station_metadata = list(session.query(station_table).filter_by(**args).all()[0]) # noqa
-            station_name = station_metadata[station_keys.index('STATION_NAME')]
-            province = station_metadata[station_keys.index(
-                'PROV_TERR_STATE_LOC')]
-            station_coords = [float(station_metadata[station_keys.index('LONGITUDE')]), # noqa
-                          float(station_metadata[station_keys.index('LATITUDE')])] # noqa
+            station_metadata = lookups.stations[station_number]
+            station_name = station_metadata.name
+            province = station_metadata.province
+            station_coords = station_metadata.coordinates
         except Exception:
             station_name = None
             province = None
             station_coords = [None, None]
             LOGGER.warning('Could not find station information for station {}'.format(station_number)) # noqa
-        args = {'DATA_TYPE': data_type}
-        data_type_metadata = list(session.query(data_types_table).filter_by(**args).all()[0]) # noqa
-        data_type_en = data_type_metadata[data_types_keys.index('DATA_TYPE_EN')] # noqa
-        data_type_fr = data_type_metadata[data_types_keys.index('DATA_TYPE_FR')] # noqa
+        data_type_metadata = lookups.data_types[data_type]
+        data_type_en = data_type_metadata.en
+        data_type_fr = data_type_metadata.fr
         if data_type_en == 'Flow':
             data_type_en = 'Discharge'
         if unit_id:
-            unit_codes = get_table_var(metadata, 'PRECISION_CODES')
-            unit_keys = unit_codes.columns.keys()
-            args = {'PRECISION_CODE': unit_id}
-            unit_data = list(session.query(unit_codes).filter_by(**args).all()[0]) # noqa
-            unit_en = unit_data[unit_keys.index('PRECISION_EN')]
-            unit_fr = unit_data[unit_keys.index('PRECISION_FR')]
+            unit_data = lookups.precisions[unit_id]
+            unit_en = unit_data.en
+            unit_fr = unit_data.fr
         else:
             unit_en = unit_fr = None
             LOGGER.warning('Could not find units for station {}'.format(station_number)) # noqa
         if peak_id:
-            peak_codes = get_table_var(metadata, 'PEAK_CODES')
-            peak_keys = peak_codes.columns.keys()
-            args = {'PEAK_CODE': peak_id}
-            peak_data = list(session.query(peak_codes).filter_by(**args).all()[0]) # noqa
-            peak_en = peak_data[peak_keys.index('PEAK_EN')]
-            peak_fr = peak_data[peak_keys.index('PEAK_FR')]
+            peak_data = lookups.peaks[peak_id]
+            peak_en = peak_data.en
+            peak_fr = peak_data.fr
         else:
             peak_en = peak_fr = None
             LOGGER.warning('Could not find peaks for station {}'.format(station_number)) # noqa
         if symbol_id and symbol_id.strip():
-            symbol_keys = symbol_table.columns.keys()
-            args = {'SYMBOL_ID': symbol_id}
-            symbol_data = list(session.query(symbol_table).filter_by(**args).all()[0]) # noqa
-            symbol_en = symbol_data[symbol_keys.index('SYMBOL_EN')]
-            symbol_fr = symbol_data[symbol_keys.index('SYMBOL_FR')]
+            symbol_data = lookups.symbols[symbol_id]
+            symbol_en = symbol_data.en
+            symbol_fr = symbol_data.fr
         else:
             symbol_en = symbol_fr = None
             LOGGER.warning('Could not find symbol for station {}'.format(station_number)) # noqa
@@ -1114,6 +1439,412 @@ def generate_annual_peaks(session, metadata, annual_peaks_table,
         yield action
 
 
+def get_generator(session, metadata, dataset, path=None):
+    """
+    Gets the document generator of a dataset.
+
+    :param session: SQLAlchemy session object.
+    :param metadata: db metadata returned by connect_db.
+    :param dataset: name of dataset (key of DATASETS).
+    :param path: URL to Elasticsearch.
+    :returns: function returning a generator of bulk API actions for a
+              set of station numbers (None for all stations).
+    """
+    station_table = get_table_var(metadata, 'STATIONS')
+    symbol_table = get_table_var(metadata, 'DATA_SYMBOLS')
+    data_types_table = get_table_var(metadata, 'DATA_TYPES')
+
+    # lookups are shared by all calls (e.g. shards of an export worker)
+    if dataset == 'observations':
+        return partial(generate_means, session,
+                       get_table_var(metadata, 'DLY_FLOWS'),
+                       get_table_var(metadata, 'DLY_LEVELS'),
+                       station_table, symbol_table,
+                       symbols=load_symbols(session, symbol_table),
+                       stations=load_stations(session, station_table))
+
+    lookups = HydatLookupCache(session, metadata)
+
+    if dataset == 'stations':
+        return partial(generate_stations, session, metadata, path,
+                       station_table, lookups=lookups)
+    elif dataset == 'annual-statistics':
+        return partial(generate_annual_stats, session,
+                       get_table_var(metadata, 'ANNUAL_STATISTICS'),
+                       data_types_table, station_table, symbol_table,
+                       lookups=lookups)
+    elif dataset == 'annual-peaks':
+        return partial(generate_annual_peaks, session, metadata,
+                       get_table_var(metadata, 'ANNUAL_INSTANT_PEAKS'),
+                       data_types_table, symbol_table, station_table,
+                       lookups=lookups)
+
+    raise ValueError('Unknown dataset {}'.format(dataset))
+
+
+def list_stations(session, metadata, dataset):
+    """
+    Lists the stations with rows in the tables of a dataset.
+
+    :param session: SQLAlchemy session object.
+    :param metadata: db metadata returned by connect_db.
+    :param dataset: name of dataset (key of DATASETS).
+    :returns: sorted list of station numbers.
+    """
+    stations = set()
+    for table_name in DATASETS[dataset]['tables']:
+        table = get_table_var(metadata, table_name)
+        query = session.query(table.c['STATION_NUMBER']).distinct()
+        stations.update(row[0] for row in query)
+    return sorted(stations)
+
+
+def station_number(action):
+    """
+    Gets the station number of a bulk API action.
+
+    :param action: bulk API upsert action.
+    :returns: station number of the document.
+    """
+    return action['doc']['properties']['STATION_NUMBER']
+
+
+def generate_serial(generate, station_numbers=None, shards=None,
+                    tracker=None):
+    """
+    Generates the documents of a dataset in this process, either for a
+    set of stations or shard by shard (recording the actions of each
+    shard in an acknowledgement tracker).
+
+    :param generate: function returned by get_generator.
+    :param station_numbers: set of station numbers to generate documents
+                            for, or None for all stations.
+    :param shards: list of (shard, set of station numbers) tuples, or
+                   None.
+    :param tracker: msc_pygeoapi.checkpoint.AckTracker object (optional).
+    :returns: generator of bulk API upsert actions.
+    """
+    if shards is None:
+        yield from generate(station_numbers)
+        return
+
+    for shard, stations in shards:
+        for action in generate(stations):
+            if tracker is not None:
+                tracker.add(shard, station_number(action))
+            yield action
+        if tracker is not None:
+            tracker.end(shard)
+
+
+def export_stations(db, dataset, path, tasks, batches):
+    """
+    Export worker process: generates the documents of the shards of
+    stations read from the tasks queue over its own read-only database
+    connection, and sends them in batches to the bulk writer.
+
+    :param db: path to Hydat sqlite database.
+    :param dataset: name of dataset (key of DATASETS).
+    :param path: URL to Elasticsearch.
+    :param tasks: multiprocessing.Queue of (shard, set of station
+                  numbers) tuples, ended by None.
+    :param batches: multiprocessing.Queue of (shard, bulk API actions)
+                    tuples, (shard, None) once a shard is exported and
+                    None once the worker is done (or an exception on
+                    failure).
+    :returns: None
+    """
+    try:
+        engine, session, metadata = connect_db(
+            'sqlite:///file:{}?mode=ro&uri=true'.format(db))
+        generate = get_generator(session, metadata, dataset, path)
+
+        for shard, station_numbers in iter(tasks.get, None):
+            batch = []
+            for action in generate(station_numbers):
+                batch.append(action)
+                if len(batch) == ACTIONS_PER_BATCH:
+                    batches.put((shard, batch))
+                    batch = []
+            if batch:
+                batches.put((shard, batch))
+            batches.put((shard, None))
+    except Exception as err:
+        LOGGER.error('Could not export {} due to: {}.'.format(dataset, err))
+        batches.put(RuntimeError('{} export worker failed: {}'.format(
+            dataset, err)))
+    else:
+        batches.put(None)
+
+
+def generate_parallel(db, session, metadata, dataset, workers, path=None,
+                      station_numbers=None, shards=None, tracker=None):
+    """
+    Generates the documents of a dataset in worker processes, each
+    exporting contiguous shards of stations, and merges them into a
+    single stream for the bulk writer.
+
+    :param db: path to Hydat sqlite database.
+    :param session: SQLAlchemy session object.
+    :param metadata: db metadata returned by connect_db.
+    :param dataset: name of dataset (key of DATASETS).
+    :param workers: number of worker processes.
+    :param path: URL to Elasticsearch.
+    :param station_numbers: set of station numbers to generate documents
+                            for, or None for all stations.
+    :param shards: list of (shard, set of station numbers) tuples to
+                   export, or None to shard the stations.
+    :param tracker: msc_pygeoapi.checkpoint.AckTracker object (optional).
+    :returns: generator of bulk API upsert actions.
+    """
+    if shards is None:
+        stations = list_stations(session, metadata, dataset)
+        shard_type = StationRange
+        if station_numbers is not None:
+            stations = [station for station in stations
+                        if station in station_numbers]
+            shard_type = set
+
+        # small enough shards for all workers to share the load
+        size = min(STATIONS_PER_TASK,
+                   -(-len(stations) // (workers * 4))) or 1
+        shards = [(i, shard_type(stations[i:i + size]))
+                  for i in range(0, len(stations), size)]
+
+    tasks = multiprocessing.Queue()
+    batches = multiprocessing.Queue(maxsize=workers * 4)
+
+    for shard in shards:
+        tasks.put(shard)
+    for _ in range(workers):
+        tasks.put(None)
+
+    LOGGER.info('Exporting {} shards of {} with {} workers'.format(
+        len(shards), dataset, workers))
+
+    processes = [
+        multiprocessing.Process(target=export_stations,
+                                args=(db, dataset, path, tasks, batches),
+                                daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    running = workers
+    try:
+        while running:
+            try:
+                item = batches.get(timeout=WORKER_POLL_TIMEOUT)
+            except queue.Empty:
+                # a killed worker (e.g. out of memory) never reports back
+                for process in processes:
+                    if process.exitcode not in (None, 0):
+                        raise RuntimeError(
+                            '{} export worker {} died with exit code'
+                            ' {}'.format(dataset, process.pid,
+                                         process.exitcode))
+                continue
+
+            if item is None:
+                running -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                shard, batch = item
+                if batch is None:
+                    if tracker is not None:
+                        tracker.end(shard)
+                    continue
+                for action in batch:
+                    if tracker is not None:
+                        tracker.add(shard, station_number(action))
+                    yield action
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+
+def fingerprint_dataset(session, metadata, dataset, cache):
+    """
+    Fingerprints the source rows a dataset is generated from, per station.
+
+    :param session: SQLAlchemy session object.
+    :param metadata: db metadata returned by connect_db.
+    :param dataset: name of dataset (key of DATASETS).
+    :param cache: dict of table name to per station fingerprints, shared
+                  between datasets so that each table is scanned once.
+    :returns: dict of station number to hex digest.
+    """
+
+    def table_fingerprints(table_name):
+        if table_name not in cache:
+            LOGGER.info('Fingerprinting {} table...'.format(table_name))
+            cache[table_name] = fingerprint_table(
+                session, get_table_var(metadata, table_name))
+        return cache[table_name]
+
+    tables = DATASETS[dataset]['tables']
+    fingerprints = [table_fingerprints(name) for name in tables]
+
+    # documents are only generated for stations with rows in the
+    # dataset's own tables, but embed metadata from the stations table
+    stations = set()
+    for table in fingerprints:
+        stations.update(table)
+    if 'STATIONS' not in tables:
+        fingerprints.append(table_fingerprints('STATIONS'))
+
+    lookups = fingerprint_lookups(
+        session, [get_table_var(metadata, name)
+                  for name in DATASETS[dataset]['lookups']])
+
+    return combine(fingerprints, lookups, stations)
+
+
+def load_checkpointed(es, session, metadata, dataset, generate, checkpoint,
+                      resume=False):
+    """
+    Loads all documents of a dataset into a new generation of its
+    index(es), or resumes an interrupted load, checkpointing the shards
+    of stations whose documents were all acknowledged.
+
+    :param es: elasticsearch.Elasticsearch client.
+    :param session: SQLAlchemy session object.
+    :param metadata: db metadata returned by connect_db.
+    :param dataset: name of dataset (key of DATASETS).
+    :param generate: generate_serial or generate_parallel function, bound
+                     to the dataset.
+    :param checkpoint: msc_pygeoapi.checkpoint.Checkpoint object.
+    :param resume: whether to resume the checkpointed load.
+    :returns: bool of whether the load was successful.
+    """
+    index = DATASETS[dataset]['index']
+    stations = list_stations(session, metadata, dataset)
+    progress = checkpoint.get(dataset) if resume else None
+
+    if progress is None:
+        generations = create_index(es, index)
+        progress = {
+            'versions': [generation.version for generation in generations],
+            'partitions': plan_partitions(stations, STATIONS_PER_TASK)
+        }
+        checkpoint.set(dataset, progress)
+    else:
+        LOGGER.info('Resuming {} load from checkpoint {}'.format(
+            dataset, checkpoint.filepath))
+        generations = create_index(es, index, progress['versions'])
+
+    # documents of a shard are not (all) ordered by station
+    tracker = checkpoint.tracker(dataset, progress, ordered=False)
+    shards = [(shard, StationRange(keys))
+              for shard, keys in remaining_keys(progress, stations)]
+
+    try:
+        ok = util.submit_elastic_package(
+            es, retarget(generate(None, shards, tracker), generations),
+            plugin='hydat', on_result=tracker.on_result)
+    except Exception as err:
+        LOGGER.error('Could not load {} due to: {}.'.format(dataset, err))
+        ok = False
+
+    if ok:
+        publish_generations(generations)
+        checkpoint.clear(dataset)
+    else:
+        # keep the generations being built for a resumed load
+        publish_generations(generations, False, discard=False)
+        LOGGER.error('{} load failed: rerun with --resume to continue from'
+                     ' checkpoint {}'.format(dataset, checkpoint.filepath))
+
+    return ok
+
+
+def load_dataset(es, session, metadata, dataset, generate, manifest=None,
+                 cache=None, checkpoint=None, resume=False):
+    """
+    Loads a dataset into Elasticsearch.
+
+    Without a manifest, or when the manifest has no previous load of the
+    dataset, all documents are loaded into a new generation of the
+    dataset's index(es). Otherwise the documents of stations whose rows
+    changed since the previous load, or which were removed from HYDAT,
+    are deleted, and those of new or changed stations are upserted
+    (through the aliases).
+
+    Full loads are checkpointed shard by shard of stations as
+    Elasticsearch acknowledges them, so that an interrupted load can be
+    resumed into the same generation.
+
+    :param es: elasticsearch.Elasticsearch client.
+    :param session: SQLAlchemy session object.
+    :param metadata: db metadata returned by connect_db.
+    :param dataset: name of dataset (key of DATASETS).
+    :param generate: generate_serial or generate_parallel function, bound
+                     to the dataset.
+    :param manifest: msc_pygeoapi.manifest.Manifest object (optional).
+    :param cache: dict of table fingerprints shared between datasets.
+    :param checkpoint: msc_pygeoapi.checkpoint.Checkpoint object of full
+                       loads (optional).
+    :param resume: whether to resume the checkpointed load.
+    :returns: bool of whether the load was successful.
+    """
+
+    aliases = DATASETS[dataset]['aliases']
+    fingerprints = changed = removed = None
+
+    if manifest is not None:
+        fingerprints = fingerprint_dataset(
+            session, metadata, dataset, {} if cache is None else cache)
+        previous = manifest.load(dataset)
+
+        if not previous:
+            LOGGER.info('No previous load of {} in manifest: loading all'
+                        ' stations'.format(dataset))
+        elif not all(es.indices.exists(index=alias) for alias in aliases):
+            LOGGER.warning('Index(es) of {} missing: loading all'
+                           ' stations'.format(dataset))
+        else:
+            changed, removed = diff(previous, fingerprints)
+
+    if changed is None and checkpoint is not None:
+        ok = load_checkpointed(es, session, metadata, dataset, generate,
+                               checkpoint, resume)
+    elif changed is None:
+        generations = create_index(es, DATASETS[dataset]['index'])
+        ok = util.submit_elastic_package(
+            es, retarget(generate(None), generations), plugin='hydat')
+        publish_generations(generations, ok)
+    else:
+        LOGGER.info('{}: {} stations changed, {} removed since previous'
+                    ' load'.format(dataset, len(changed), len(removed)))
+        # documents of changed stations are regenerated from scratch, so
+        # that those no longer generated (e.g. a removed year) go away too
+        stale = sorted(set(removed).union(
+            station for station in changed if station in previous))
+        ok = True
+        if stale:
+            LOGGER.info('Deleting documents of stations {}'.format(stale))
+            response = es.delete_by_query(
+                index=','.join(aliases), conflicts='proceed',
+                body={'query': {'terms': {
+                    'properties.STATION_NUMBER.raw': stale}}})
+            if response.get('failures'):
+                LOGGER.error('Could not delete documents of {}: {}'.format(
+                    dataset, response['failures']))
+                ok = False
+        if ok and changed:
+            ok = util.submit_elastic_package(
+                es, generate(set(changed)), plugin='hydat')
+
+    if ok and fingerprints is not None:
+        manifest.save(dataset, fingerprints)
+
+    return ok
+
+
 @click.command()
 @click.pass_context
 @click.option('--db', type=click.Path(exists=True, resolve_path=True),
@@ -1123,7 +1854,18 @@ def generate_annual_peaks(session, metadata, annual_peaks_table,
 @click.option('--password', help='Password to connect to HTTPS')
 @click.option('--dataset', help='ES dataset to load, or all\
                                  if loading everything')
-def hydat(ctx, db, es, username, password, dataset):
+@click.option('--incremental', is_flag=True, default=False,
+              help='Only load stations changed since the previous load')
+@click.option('--manifest', type=click.Path(dir_okay=False,
+                                            resolve_path=True),
+              help='Path to change detection manifest (default: '
+                   '$MSC_PYGEOAPI_CACHEDIR/hydat-manifest.sqlite3)')
+@click.option('--workers', type=click.IntRange(min=1), default=1,
+              help='Number of processes generating documents')
+@click.option('--resume', is_flag=True, default=False,
+              help='Resume interrupted loads from their checkpoint')
+def hydat(ctx, db, es, username, password, dataset, incremental, manifest,
+          workers, resume):
     """
     Loads HYDAT data into Elasticsearch
 
@@ -1134,6 +1876,13 @@ def hydat(ctx, db, es, username, password, dataset):
     :param username: username for HTTP authentication.
     :param password: password for HTTP authentication.
     :param dataset: name of dataset to load, or all for all datasets.
+    :param incremental: whether to only load stations changed since the
+                        load recorded in the manifest.
+    :param manifest: path to change detection manifest.
+    :param workers: number of processes generating documents, each over
+                    its own read-only database connection.
+    :param resume: whether to resume interrupted loads from their
+                   checkpoint.
     """
     auth = (username, password)
     es_client = util.get_es(es, auth)
@@ -1142,104 +1891,59 @@ def hydat(ctx, db, es, username, password, dataset):
     except Exception as err:
         LOGGER.critical('Could not connect to database due to: {}. Exiting.').format(str(err)) # noqa
         return None
+
+    if dataset == 'all':
+        datasets = list(DATASETS)
+    elif dataset in DATASETS:
+        datasets = [dataset]
+    else:
+        LOGGER.critical('Unknown dataset parameter {}, skipping index population.'.format(dataset)) # noqa
+        return None
+
     try:
         LOGGER.info('Accessing SQLite tables...')
-        discharge_var = level_var = station_table = None
-        level_var = get_table_var(metadata, 'DLY_LEVELS')
-        discharge_var = get_table_var(metadata, 'DLY_FLOWS')
-        station_table = get_table_var(metadata, 'STATIONS')
-        data_types_table = get_table_var(metadata, 'DATA_TYPES')
-        annual_stats_table = get_table_var(metadata, 'ANNUAL_STATISTICS')
-        symbol_table = get_table_var(metadata, 'DATA_SYMBOLS')
-        annual_peaks_table = get_table_var(metadata, 'ANNUAL_INSTANT_PEAKS')
+        if workers > 1:
+            generators = {
+                dataset_: partial(generate_parallel, db, session, metadata,
+                                  dataset_, workers, es)
+                for dataset_ in datasets
+            }
+        else:
+            generators = {
+                dataset_: partial(generate_serial, get_generator(
+                    session, metadata, dataset_, es))
+                for dataset_ in datasets
+            }
         LOGGER.info('Success. Created table variables.')
     except Exception as err:
         LOGGER.critical('Could not create table variables due to: {}. Exiting.').format(str(err)) # noqa
         return None
 
-    if dataset == 'all':
-        try:
-            LOGGER.info('Populating stations index...')
-            create_index(es_client, 'stations')
-            stations = generate_stations(session, metadata, es, station_table)
-
-            util.submit_elastic_package(es_client, stations)
-            LOGGER.info('Stations index populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate stations due to: {}.'.format(str(err))) # noqa
-        try:
-            LOGGER.info('Populating observations indexes...')
-            create_index(es_client, 'observations')
-            means = generate_means(session, discharge_var, level_var, station_table, symbol_table) # noqa
-
-            util.submit_elastic_package(es_client, means)
-            LOGGER.info('Observations populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate observations due to: {}.'.format(str(err))) # noqa
-        try:
-            LOGGER.info('Populating annual statistics index...')
-            create_index(es_client, 'annual_statistics')
-            stats = generate_annual_stats(session, annual_stats_table, data_types_table, station_table, symbol_table) # noqa
-
-            util.submit_elastic_package(es_client, stats)
-            LOGGER.info('Annual stastistics index populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate annual statistics due to: {}.'.format(str(err))) # noqa
-        try:
-            LOGGER.info('Populating annual peaks index...')
-            create_index(es_client, 'annual_peaks')
-            peaks = generate_annual_peaks(session, metadata, annual_peaks_table, data_types_table, symbol_table, station_table) # noqa
-
-            util.submit_elastic_package(es_client, peaks)
-            LOGGER.info('Annual peaks index populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate annual peaks due to: {}.'.format(str(err))) # noqa
-        LOGGER.info('Finished populating all indices.')
-
-    elif dataset == 'stations':
-        try:
-            LOGGER.info('Populating stations index...')
-            create_index(es_client, 'stations')
-            stations = generate_stations(session, metadata, es, station_table)
-
-            util.submit_elastic_package(es_client, stations)
-            LOGGER.info('Stations index populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate stations due to: {}.'.format(str(err))) # noqa
+    manifest_ = None
+    if incremental:
+        if manifest is None:
+            manifest = os.path.join(MSC_PYGEOAPI_CACHEDIR,
+                                    'hydat-manifest.sqlite3')
+        manifest_ = Manifest(manifest)
 
-    elif dataset == 'observations':
-        try:
-            LOGGER.info('Populating observations indexes...')
-            create_index(es_client, 'observations')
-            means = generate_means(session, discharge_var, level_var, station_table, symbol_table) # noqa
+    checkpoint = Checkpoint(os.path.join(MSC_PYGEOAPI_CACHEDIR,
+                                         'hydat-checkpoint.json'))
 
-            util.submit_elastic_package(es_client, means)
-            LOGGER.info('Observations populated.')
-        except Exception as err:
-            raise
-            LOGGER.error('Could not populate observations due to: {}.'.format(str(err))) # noqa
-
-    elif dataset == 'annual-statistics':
-        try:
-            LOGGER.info('Populating annual statistics index...')
-            create_index(es_client, 'annual_statistics')
-            stats = generate_annual_stats(session, annual_stats_table, data_types_table, station_table, symbol_table) # noqa
-
-            util.submit_elastic_package(es_client, stats)
-            LOGGER.info('Annual stastistics index populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate annual statistics due to: {}.'.format(str(err))) # noqa
-
-    elif dataset == 'annual-peaks':
-        try:
-            LOGGER.info('Populating annual peaks index...')
-            create_index(es_client, 'annual_peaks')
-            peaks = generate_annual_peaks(session, metadata, annual_peaks_table, data_types_table, symbol_table, station_table) # noqa
-
-            util.submit_elastic_package(es_client, peaks)
-            LOGGER.info('Annual peaks index populated.')
-        except Exception as err:
-            LOGGER.error('Could not populate annual peaks due to: {}.'.format(str(err))) # noqa
+    cache = {}
+    try:
+        for dataset_ in datasets:
+            try:
+                LOGGER.info('Populating {} index...'.format(dataset_))
+                load_dataset(es_client, session, metadata, dataset_,
+                             generators[dataset_], manifest_, cache,
+                             checkpoint, resume)
+                LOGGER.info('{} index populated.'.format(dataset_))
+            except Exception as err:
+                LOGGER.error('Could not populate {} due to: {}.'.format(
+                    dataset_, str(err)))
+    finally:
+        if manifest_ is not None:
+            manifest_.close()
 
-    else:
-        LOGGER.critical('Unknown dataset parameter {}, skipping index population.'.format(dataset)) # noqa
+    if dataset == 'all':
+        LOGGER.info('Finished populating all indices.')
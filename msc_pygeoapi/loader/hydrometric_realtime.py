@@ -33,12 +33,13 @@ from datetime import datetime, timedelta
 import logging
 import os
 import urllib.request
-from elasticsearch import helpers, logger as elastic_logger
+from elasticsearch import logger as elastic_logger
 
 from msc_pygeoapi.env import (MSC_PYGEOAPI_CACHEDIR, MSC_PYGEOAPI_ES_TIMEOUT,
                               MSC_PYGEOAPI_ES_URL, MSC_PYGEOAPI_ES_AUTH)
 from msc_pygeoapi.loader.base import BaseLoader
-from msc_pygeoapi.util import click_abort_if_false, get_es
+from msc_pygeoapi.metrics import timed
+from msc_pygeoapi.util import click_abort_if_false, get_es, get_shared_es
 
 
 LOGGER = logging.getLogger(__name__)
@@ -166,7 +167,8 @@ class HydrometricRealtimeLoader(BaseLoader):
 
         BaseLoader.__init__(self)
 
-        self.ES = get_es(MSC_PYGEOAPI_ES_URL, MSC_PYGEOAPI_ES_AUTH)
+        self.ES = get_shared_es(MSC_PYGEOAPI_ES_URL,
+                                MSC_PYGEOAPI_ES_AUTH)
 
         if not self.ES.indices.exists(INDEX_NAME):
             self.ES.indices.create(index=INDEX_NAME, body=SETTINGS,
@@ -377,33 +379,16 @@ class HydrometricRealtimeLoader(BaseLoader):
         if filepath.endswith('hydrometric_StationList.csv'):
             return True
 
-        inserts = 0
-        updates = 0
-        noops = 0
-        fails = 0
-
         LOGGER.debug('Received file {}'.format(filepath))
-        chunk_size = 80000
-
-        package = self.generate_observations(filepath)
-        for ok, response in helpers.streaming_bulk(self.ES, package,
-                                                   chunk_size=chunk_size,
-                                                   request_timeout=30):
-            status = response['update']['result']
-
-            if status == 'created':
-                inserts += 1
-            elif status == 'updated':
-                updates += 1
-            elif status == 'noop':
-                noops += 1
-            else:
-                LOGGER.warning('Unhandled status code {}'.format(status))
-
-        total = inserts + updates + noops + fails
-        LOGGER.info('Inserted package of {} observations ({} inserts,'
-                    ' {} updates, {} no-ops, {} rejects)'
-                    .format(total, inserts, updates, noops, fails))
+
+        # rows are read, parsed and transformed in one streaming pass,
+        # timed as a whole (excluding buffering into the bulk sink)
+        actions = timed(self.generate_observations(filepath), self.name,
+                        'transform')
+
+        for action in actions:
+            self.sink.add(action, self.on_bulk_error, self.name)
+
         return True
 
 
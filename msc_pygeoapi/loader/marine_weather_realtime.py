@@ -45,7 +45,8 @@ from msc_pygeoapi.env import (
     MSC_PYGEOAPI_ES_AUTH,
 )
 from msc_pygeoapi.loader.base import BaseLoader
-from msc_pygeoapi.util import get_es, json_pretty_print, strftime_rfc3339
+from msc_pygeoapi.util import (get_es, get_shared_es, json_pretty_print,
+                               strftime_rfc3339)
 
 LOGGER = logging.getLogger(__name__)
 elastic_logger.setLevel(logging.WARNING)
@@ -327,7 +328,8 @@ class MarineWeatherRealtimeLoader(BaseLoader):
 
         BaseLoader.__init__(self)
 
-        self.ES = get_es(MSC_PYGEOAPI_ES_URL, MSC_PYGEOAPI_ES_AUTH)
+        self.ES = get_shared_es(MSC_PYGEOAPI_ES_URL,
+                                MSC_PYGEOAPI_ES_AUTH)
         self.filepath = None
         self.region_name_code = None
         self.language = None
@@ -705,6 +707,9 @@ class MarineWeatherRealtimeLoader(BaseLoader):
         """
 
         self.filepath = Path(filepath)
+        # reset per-file state as loader instances are reused
+        self.items = []
+        self.area = {}
         self.parse_filename()
 
         inserts = 0
@@ -793,12 +798,13 @@ def add(ctx, file_, directory):
                 files_to_process.append(os.path.join(root, f))
         files_to_process.sort(key=os.path.getmtime)
 
+    plugin_def = {
+        'filename_pattern': 'marine_weather/xml',
+        'handler': 'msc_pygeoapi.loader.marine_weather_realtime.MarineWeatherRealtimeLoader',  # noqa
+    }
+    loader = MarineWeatherRealtimeLoader(plugin_def)
+
     for file_to_process in files_to_process:
-        plugin_def = {
-            'filename_pattern': 'marine_weather/xml',
-            'handler': 'msc_pygeoapi.loader.marine_weather_realtime.MarineWeatherRealtimeLoader',  # noqa
-        }
-        loader = MarineWeatherRealtimeLoader(plugin_def)
         result = loader.load_data(file_to_process)
         if result:
             click.echo(
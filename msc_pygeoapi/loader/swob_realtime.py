@@ -32,17 +32,22 @@
 # =================================================================
 
 import click
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from itertools import islice
 import logging
 import os
 
-from elasticsearch import helpers, logger as elastic_logger
+from elasticsearch import logger as elastic_logger
 from lxml import etree
 
 from msc_pygeoapi.env import (MSC_PYGEOAPI_CACHEDIR, MSC_PYGEOAPI_ES_TIMEOUT,
                               MSC_PYGEOAPI_ES_URL, MSC_PYGEOAPI_ES_AUTH)
 from msc_pygeoapi.loader.base import BaseLoader
-from msc_pygeoapi.util import click_abort_if_false, get_es, json_pretty_print
+from msc_pygeoapi.metrics import timer
+from msc_pygeoapi.util import (click_abort_if_false, get_es, get_shared_es,
+                               json_pretty_print)
 
 
 LOGGER = logging.getLogger(__name__)
@@ -57,6 +62,17 @@ STATIONS_CACHE = os.path.join(MSC_PYGEOAPI_CACHEDIR, STATIONS_LIST_NAME)
 # cleanup settings
 DAYS_TO_KEEP = 30
 
+# number of files handed to a parse worker at a time
+PARSE_CHUNK_SIZE = 64
+
+NAMESPACES = {
+    'gml': 'http://www.opengis.net/gml',
+    'om': 'http://www.opengis.net/om/1.0',
+    'xlink': 'http://www.w3.org/1999/xlink',
+    'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+    'dset': 'http://dms.ec.gc.ca/schema/point-observation/2.0'
+}
+
 # index settings
 INDEX_NAME = 'swob_realtime'
 
@@ -90,151 +106,214 @@ SETTINGS = {
 def parse_swob(swob_file):
     """
     Read swob at swob_path and return object
+
+    Each section of interest is located once with a precompiled XPath
+    expression and walked once.
     :param swob_path: file path to SWOB XML
     :returns: dictionary of SWOB
     """
 
-    namespaces = {'gml': 'http://www.opengis.net/gml',
-                  'om': 'http://www.opengis.net/om/1.0',
-                  'xlink': 'http://www.w3.org/1999/xlink',
-                  'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
-                  'dset': 'http://dms.ec.gc.ca/schema/point-observation/2.0'}
-
-    swob_values = {}
-    elevation = ''
-    latitude = ''
-    longitude = ''
+    sections = {}
 
     # extract the swob xml source name
     swob_name = os.path.basename(swob_file)
 
     # make sure the xml is parse-able
     try:
-        xml_tree = etree.parse(swob_file)
+        with timer('swob_realtime', 'read'):
+            with open(swob_file, 'rb') as fh:
+                data = fh.read()
+        with timer('swob_realtime', 'parse'):
+            xml_tree = etree.fromstring(data)
     except (FileNotFoundError, etree.ParseError):
         msg = 'Error: file {} cannot be parsed as xml'.format(swob_file)
         LOGGER.debug(msg)
         raise RuntimeError(msg)
 
-    gen_path = './/om:Observation/om:metadata/dset:set/dset:general'
-    general_info_tree = (xml_tree.findall(gen_path, namespaces))
-    general_info_elements = list(general_info_tree[0].iter())
-    properties = {}
+    with timer('swob_realtime', 'transform'):
+        for section, xpath in SECTION_XPATHS.items():
+            elements = xpath(xml_tree)
+            if not elements:
+                msg = 'Error: file {} lacks SWOB {} section'.format(
+                    swob_file, section)
+                LOGGER.debug(msg)
+                raise RuntimeError(msg)
 
-    # extract swob dataset
-    for element in general_info_elements:
-        if 'name' in element.attrib:
-            if element.tag.split('}')[1] == 'dataset':
-                properties[element.tag.split('}')[1]] = (
-                    element.attrib['name'].replace('/', '-'))
+            sections[section] = SECTION_PARSERS[section](elements[0])
+
+    properties = sections['general']
 
     # add swob source name to properties
-    properties["id"] = swob_name
+    properties['id'] = swob_name
+
+    # set up cords and ID related properties
+    coordinates, identification = sections['identification']
+    properties.update(identification)
+
+    # set up time stamps
+    properties['obs_date_tm'] = sections['sampling_time']
+    properties['processed_date_tm'] = sections['result_time']
+
+    # add the result data from the swob
+    properties.update(sections['result'])
+
+    for k, v in properties.items():
+        if v == 'MSNG':
+            properties[k] = None
+
+    return {
+        'coordinates': coordinates,
+        'properties': properties
+    }
+
+
+def _parse_general(element):
+    """
+    Extract the dataset name from the general section
+    :param element: `lxml.etree.Element` of dset:general
+    :returns: `dict` of properties
+    """
+
+    properties = {}
+
+    for dataset in element.iter('{*}dataset'):
+        if 'name' in dataset.attrib:
+            properties['dataset'] = dataset.attrib['name'].replace('/', '-')
 
-    # extract ID related properties
-    id_path = ('.//om:Observation/om:metadata/' +
-               'dset:set/dset:identification-elements')
-    identification_tree = xml_tree.findall(id_path, namespaces)
-    identification_elements = list(identification_tree[0].iter())
+    return properties
+
+
+def _parse_identification(element):
+    """
+    Extract coordinates and ID related properties from the
+    identification-elements section
+    :param element: `lxml.etree.Element` of dset:identification-elements
+    :returns: `tuple` of coordinates `list` and properties `dict`
+    """
+
+    properties = {}
+    elevation = ''
+    latitude = ''
+    longitude = ''
+
+    for id_elem in element.iter():
+        attrib = id_elem.attrib
+        if 'name' not in attrib:
+            continue
 
-    for element in identification_elements:
         element_name = ''
-        if 'name' in element.attrib:
-            for key in element.attrib:
-                if key == 'name':
-                    if element.attrib[key] == 'stn_elev':
-                        elevation = float(element.attrib['value'])
-                        break
-                    elif element.attrib[key] == 'lat':
-                        latitude = float(element.attrib['value'])
-                        break
-                    elif element.attrib[key] == 'long':
-                        longitude = float(element.attrib['value'])
-                        break
-                    else:
-                        element_name = element.attrib[key]
+        for key in attrib:
+            if key == 'name':
+                if attrib[key] == 'stn_elev':
+                    elevation = float(attrib['value'])
+                    break
+                elif attrib[key] == 'lat':
+                    latitude = float(attrib['value'])
+                    break
+                elif attrib[key] == 'long':
+                    longitude = float(attrib['value'])
+                    break
                 else:
-                    properties["{}-{}".format(element_name, key)] = (
-                            element.attrib[key])
+                    element_name = attrib[key]
+            else:
+                properties['{}-{}'.format(element_name, key)] = attrib[key]
 
-    # set up cords and time stamps
-    swob_values['coordinates'] = [longitude, latitude, elevation]
+    return [longitude, latitude, elevation], properties
 
-    s_time = ('.//om:Observation/om:samplingTime/' +
-              'gml:TimeInstant/gml:timePosition')
-    time_sample = list(xml_tree.findall(s_time, namespaces)[0].iter())[0]
-    properties['obs_date_tm'] = time_sample.text
 
-    r_time = ('.//om:Observation/om:resultTime/' +
-              'gml:TimeInstant/gml:timePosition')
-    time_result = list(xml_tree.findall(r_time, namespaces)[0].iter())[0]
-    properties['processed_date_tm'] = time_result.text
+def _parse_time(element):
+    """
+    Extract a time stamp
+    :param element: `lxml.etree.Element` of gml:timePosition
+    :returns: `str` of time stamp
+    """
+
+    return element.text
+
 
-    # extract the result data from the swob
-    res_path = './/om:Observation/om:result/dset:elements'
-    result_tree = xml_tree.findall(res_path, namespaces)
-    result_elements = list(result_tree[0].iter())
+def _parse_result(element):
+    """
+    Extract the result data from the elements section
+    :param element: `lxml.etree.Element` of dset:elements
+    :returns: `dict` of properties
+    """
 
+    properties = {}
     last_element = ''
-    for element in result_elements:
-        nested = element.iter()
-        for nest_elem in nested:
+
+    for nest_elem in element.iter():
+        name = nest_elem.get('name')
+        if name is None:
+            continue
+
+        value = nest_elem.get('value')
+        uom = nest_elem.get('uom', 'unitless')
+
+        if value is None:
             value = ''
+        else:
+            # Checks to see if value string can be casted to float/int
+            try:
+                if '.' in value:
+                    value = float(value)
+                else:
+                    value = int(value)
+            except ValueError:
+                msg = (
+                    f'Warning the value: "{value}" could not be '
+                    f'converted to a number, this can be because '
+                    f'of an improperly formatted number value or '
+                    f'because of an intentional string value'
+                )
+
+                LOGGER.debug(msg)
+
+        if uom == 'unitless':
             uom = ''
-            if 'name' in nest_elem.attrib:
-                name = nest_elem.attrib['name']
-                if 'value' in nest_elem.attrib:
-                    value = nest_elem.attrib['value']
-
-                    # Checks to see if value string can be casted to float/int
-                    try:
-                        if '.' in value:
-                            value = float(value)
-                        else:
-                            value = int(value)
-                    except ValueError:
-                        msg = (
-                            f'Warning the value: "{value}" could not be '
-                            f'converted to a number, this can be because '
-                            f'of an improperly formatted number value or '
-                            f'because of an intentional string value'
-                        )
-
-                        LOGGER.debug(msg)
-                        pass
-
-                if 'uom' in nest_elem.attrib:
-                    if nest_elem.attrib['uom'] != 'unitless':
-                        uom = nest_elem.attrib['uom'].replace('\u00c2', '')
-
-                # element can be 1 of 3 things:
-                #   1. a data piece
-                #   2. a qa summary
-                #   3. a data flag
-                if all([name != 'qa_summary', name != 'data_flag']):
-                    properties[name] = value
-                    if uom:
-                        properties["{}-{}".format(name, 'uom')] = uom
-                    last_element = name
-                elif name == 'qa_summary':
-                    properties["{}-{}".format(last_element, 'qa')] = value
-                elif name == 'data_flag':
-                    properties["{}-{}-{}".format(last_element, 'data_flag',
-                                                 'uom')] = uom
-                    properties["{}-{}-{}".format(last_element, 'data_flag',
-                                                 'code_src')] = (
-                        nest_elem.attrib['code-src'])
-                    properties["{}-{}-{}".format(last_element, 'data_flag',
-                                                 'value')] = (
-                            value)
-
-        swob_values['properties'] = properties
-
-        for k, v in swob_values['properties'].items():
-            if v == 'MSNG':
-                swob_values['properties'][k] = None
-
-        return swob_values
+        else:
+            uom = uom.replace('\u00c2', '')
+
+        # element can be 1 of 3 things:
+        #   1. a data piece
+        #   2. a qa summary
+        #   3. a data flag
+        if name == 'qa_summary':
+            properties[last_element + '-qa'] = value
+        elif name == 'data_flag':
+            properties[last_element + '-data_flag-uom'] = uom
+            properties[last_element + '-data_flag-code_src'] = (
+                nest_elem.attrib['code-src'])
+            properties[last_element + '-data_flag-value'] = value
+        else:
+            properties[name] = value
+            if uom:
+                properties[name + '-uom'] = uom
+            last_element = name
+
+    return properties
+
+
+SECTION_XPATHS = {
+    section: etree.XPath('(/*//{})[1]'.format(path), namespaces=NAMESPACES)
+    for section, path in {
+        'general': 'om:Observation/om:metadata/dset:set/dset:general',
+        'identification': ('om:Observation/om:metadata/dset:set/'
+                           'dset:identification-elements'),
+        'sampling_time': ('om:Observation/om:samplingTime/'
+                          'gml:TimeInstant/gml:timePosition'),
+        'result_time': ('om:Observation/om:resultTime/'
+                        'gml:TimeInstant/gml:timePosition'),
+        'result': 'om:Observation/om:result/dset:elements'
+    }.items()
+}
+
+SECTION_PARSERS = {
+    'general': _parse_general,
+    'identification': _parse_identification,
+    'sampling_time': _parse_time,
+    'result_time': _parse_time,
+    'result': _parse_result
+}
 
 
 def swob2geojson(swob_file):
@@ -272,6 +351,62 @@ def swob2geojson(swob_file):
         raise RuntimeError(msg)
 
 
+def swob2geojson_or_none(swob_file):
+    """
+    Produce GeoJSON from a SWOB file, logging instead of raising on
+    failure (used as a process pool task)
+    :param swob_file: file path to SWOB XML
+    :returns: geojson, or `None` if the file cannot be converted
+    """
+
+    try:
+        return swob2geojson(swob_file)
+    except Exception as err:
+        LOGGER.warning('Cannot convert {}: {}'.format(swob_file, err))
+        return None
+
+
+def swob2geojson_chunk(swob_files):
+    """
+    Produce GeoJSON from a chunk of SWOB files (used as a process pool
+    task)
+    :param swob_files: list of file paths to SWOB XML
+    :returns: list of geojson, or `None` for files that cannot be
+              converted
+    """
+
+    return [swob2geojson_or_none(swob_file) for swob_file in swob_files]
+
+
+def parse_parallel(pool, swob_files, workers):
+    """
+    Produce GeoJSON from SWOB files in a process pool, in order, with a
+    bounded number of chunks submitted at a time
+    :param pool: `concurrent.futures.ProcessPoolExecutor`
+    :param swob_files: iterable of file paths to SWOB XML
+    :param workers: number of processes of the pool
+    :returns: generator of geojson, or `None` for files that cannot be
+              converted
+    """
+
+    swob_files = iter(swob_files)
+    futures = deque()
+
+    while True:
+        # keep every worker busy with a chunk queued behind it
+        while len(futures) < workers * 2:
+            chunk = list(islice(swob_files, PARSE_CHUNK_SIZE))
+            if not chunk:
+                break
+            futures.append(pool.submit(swob2geojson_chunk, chunk))
+
+        if not futures:
+            return
+
+        for observation in futures.popleft().result():
+            yield observation
+
+
 class SWOBRealtimeLoader(BaseLoader):
     """SWOB Real-time loader"""
 
@@ -280,7 +415,9 @@ class SWOBRealtimeLoader(BaseLoader):
 
         BaseLoader.__init__(self)
 
-        self.ES = get_es(MSC_PYGEOAPI_ES_URL, MSC_PYGEOAPI_ES_AUTH)
+        self.ES = get_shared_es(MSC_PYGEOAPI_ES_URL,
+                                MSC_PYGEOAPI_ES_AUTH)
+        self.items = []
 
         if not self.ES.indices.exists(INDEX_NAME):
             self.ES.indices.create(index=INDEX_NAME, body=SETTINGS,
@@ -298,20 +435,30 @@ class SWOBRealtimeLoader(BaseLoader):
         """
 
         observation = swob2geojson(filepath)
-        observation_id = observation['id']
+        self.items.append(observation)
 
         LOGGER.debug('Observation {} created successfully'
-                     .format(observation_id))
-        action = {
-            '_id': observation_id,
+                     .format(observation['id']))
+
+        yield self.observation2action(observation)
+
+    def observation2action(self, observation):
+        """
+        Wraps a SWOB GeoJSON observation in an Elasticsearch bulk API
+        upsert action.
+
+        :param observation: `dict` of GeoJSON observation
+        :returns: `dict` of Elasticsearch action
+        """
+
+        return {
+            '_id': observation['id'],
             '_index': INDEX_NAME,
             '_op_type': 'update',
             'doc': observation,
             'doc_as_upsert': True
         }
 
-        yield action
-
     def load_data(self, filepath):
         """
         loads data from event to target
@@ -321,33 +468,12 @@ class SWOBRealtimeLoader(BaseLoader):
         :returns: `bool` of status result
         """
 
-        inserts = 0
-        updates = 0
-        noops = 0
-        fails = 0
-
         LOGGER.debug('Received file {}'.format(filepath))
-        chunk_size = 80000
-
-        package = self.generate_observations(filepath)
-        for ok, response in helpers.streaming_bulk(self.ES, package,
-                                                   chunk_size=chunk_size,
-                                                   request_timeout=30):
-            status = response['update']['result']
-
-            if status == 'created':
-                inserts += 1
-            elif status == 'updated':
-                updates += 1
-            elif status == 'noop':
-                noops += 1
-            else:
-                LOGGER.warning('Unhandled status code {}'.format(status))
+        self.items = []
+
+        for action in self.generate_observations(filepath):
+            self.sink.add(action, self.on_bulk_error, self.name)
 
-        total = inserts + updates + noops + fails
-        LOGGER.info('Inserted package of {} observations ({} inserts,'
-                    ' {} updates, {} no-ops, {} rejects)'
-                    .format(total, inserts, updates, noops, fails))
         return True
 
 
@@ -366,7 +492,9 @@ def swob_realtime():
               type=click.Path(exists=True, resolve_path=True,
                               dir_okay=True, file_okay=False),
               help='Path to directory')
-def add(ctx, file_, directory):
+@click.option('--workers', '-w', default=1, type=int,
+              help='Number of processes parsing SWOB files (default=1)')
+def add(ctx, file_, directory, workers):
     """adds data to system"""
 
     if all([file_ is None, directory is None]):
@@ -382,12 +510,32 @@ def add(ctx, file_, directory):
                 files_to_process.append(os.path.join(root, f))
         files_to_process.sort(key=os.path.getmtime)
 
+    plugin_def = {
+        'filename_pattern': 'marine_weather/xml',
+        'handler': 'msc_pygeoapi.loader.swob_realtime.SWOBRealtimeLoader',
+    }
+    loader = SWOBRealtimeLoader(plugin_def)
+
+    if workers > 1:
+        # parse in a process pool; results come back in mtime order and
+        # are fed to the bulk sink from this process only
+        count = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for observation in parse_parallel(pool, files_to_process,
+                                              workers):
+                if observation is None:
+                    continue
+                loader.sink.add(loader.observation2action(observation),
+                                loader.on_bulk_error, loader.name)
+                count += 1
+
+        loader.sink.flush()
+        click.echo('GeoJSON features generated: {} (from {} files)'.format(
+            count, len(files_to_process)))
+        check_bulk_errors(loader)
+        return
+
     for file_to_process in files_to_process:
-        plugin_def = {
-            'filename_pattern': 'marine_weather/xml',
-            'handler': 'msc_pygeoapi.loader.swob_realtime.SWOBRealtimeLoader',
-        }
-        loader = SWOBRealtimeLoader(plugin_def)
         result = loader.load_data(file_to_process)
         if result:
             click.echo(
@@ -396,6 +544,24 @@ def add(ctx, file_, directory):
                 )
             )
 
+    loader.sink.flush()
+    check_bulk_errors(loader)
+
+
+def check_bulk_errors(loader):
+    """
+    fail the command if Elasticsearch rejected documents of the loader
+
+    :param loader: `msc_pygeoapi.loader.base.BaseLoader` object
+
+    :returns: void
+    """
+
+    if loader.bulk_errors > 0:
+        raise click.ClickException('{} documents rejected by'
+                                   ' Elasticsearch'.format(
+                                       loader.bulk_errors))
+
 
 @click.command()
 @click.pass_context
@@ -0,0 +1,238 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+# Change-detection manifests let archive loaders reload only what changed
+# between two releases of a source database: rows are fingerprinted per key
+# (e.g. per station) and the fingerprints of the last successful load are
+# kept in a local SQLite sidecar.
+
+import hashlib
+import logging
+import sqlite3
+
+LOGGER = logging.getLogger(__name__)
+
+# source rows fetched per database round trip while fingerprinting
+ROWS_PER_FETCH = 5000
+
+
+def _digest():
+    """
+    helper function to create a fingerprint hash object
+
+    :returns: `hashlib` hash object
+    """
+
+    return hashlib.blake2b(digest_size=16)
+
+
+def _ordering(table):
+    """
+    helper function to derive a deterministic row ordering of a table
+
+    :param table: SQLAlchemy table object
+
+    :returns: `list` of columns to order by
+    """
+
+    return list(table.primary_key.columns) or list(table.columns)
+
+
+def fingerprint_table(session, table, key='STATION_NUMBER'):
+    """
+    fingerprints the rows of a table per key, in a single ordered scan
+
+    :param session: SQLAlchemy session object
+    :param table: SQLAlchemy table object
+    :param key: name of the column to group rows by
+
+    :returns: `dict` of key value to hex digest of its rows
+    """
+
+    key_column = table.c[key]
+    ordering = [key_column] + [c for c in _ordering(table)
+                               if c is not key_column]
+    key_index = list(table.columns).index(key_column)
+
+    fingerprints = {}
+    current = digest = None
+
+    query = session.query(table).order_by(*ordering)
+    for row in query.yield_per(ROWS_PER_FETCH):
+        if row[key_index] != current:
+            if digest is not None:
+                fingerprints[current] = digest.hexdigest()
+            current = row[key_index]
+            digest = _digest()
+        digest.update(repr(tuple(row)).encode('utf-8'))
+
+    if digest is not None:
+        fingerprints[current] = digest.hexdigest()
+
+    LOGGER.debug('Fingerprinted {} keys of {}'.format(
+        len(fingerprints), table.name))
+
+    return fingerprints
+
+
+def fingerprint_lookups(session, tables):
+    """
+    fingerprints the rows of (small) lookup tables as a whole
+
+    :param session: SQLAlchemy session object
+    :param tables: `list` of SQLAlchemy table objects
+
+    :returns: hex digest of all rows of all tables
+    """
+
+    digest = _digest()
+
+    for table in tables:
+        digest.update(table.name.encode('utf-8'))
+        for row in session.query(table).order_by(*_ordering(table)):
+            digest.update(repr(tuple(row)).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+def combine(fingerprints, lookups='', keys=None):
+    """
+    combines per table fingerprints into a single fingerprint per key
+
+    :param fingerprints: `list` of `dict` of key value to hex digest
+                         (one per table)
+    :param lookups: hex digest of lookup tables, which apply to every key
+    :param keys: keys to fingerprint (default: keys of any table)
+
+    :returns: `dict` of key value to hex digest
+    """
+
+    if keys is None:
+        keys = set()
+        for table in fingerprints:
+            keys.update(table)
+
+    combined = {}
+    for key in keys:
+        digest = _digest()
+        digest.update(lookups.encode('utf-8'))
+        for table in fingerprints:
+            digest.update(b'|')
+            digest.update(table.get(key, '').encode('utf-8'))
+        combined[key] = digest.hexdigest()
+
+    return combined
+
+
+def diff(previous, current):
+    """
+    compares two sets of fingerprints
+
+    :param previous: `dict` of key value to hex digest of the last load
+    :param current: `dict` of key value to hex digest of the source
+
+    :returns: `tuple` of sorted `list` of new or changed keys and
+              sorted `list` of removed keys
+    """
+
+    changed = sorted(key for key, digest in current.items()
+                     if previous.get(key) != digest)
+    removed = sorted(key for key in previous if key not in current)
+
+    return changed, removed
+
+
+class Manifest(object):
+    """fingerprints of the last successful load, per scope"""
+
+    def __init__(self, filepath):
+        """
+        initializer
+
+        :param filepath: path to SQLite manifest file (created if missing)
+
+        :returns: `msc_pygeoapi.manifest.Manifest`
+        """
+
+        self.filepath = filepath
+        self.db = sqlite3.connect(filepath)
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS manifest ('
+            'scope TEXT NOT NULL, key TEXT NOT NULL, digest TEXT NOT NULL, '
+            'PRIMARY KEY (scope, key))')
+        self.db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def load(self, scope):
+        """
+        fetches the fingerprints of the last successful load of a scope
+
+        :param scope: name of the loaded dataset
+
+        :returns: `dict` of key value to hex digest (empty if never loaded)
+        """
+
+        cursor = self.db.execute(
+            'SELECT key, digest FROM manifest WHERE scope = ?', (scope,))
+
+        return dict(cursor)
+
+    def save(self, scope, fingerprints):
+        """
+        replaces the fingerprints of a scope, in a single transaction
+
+        :param scope: name of the loaded dataset
+        :param fingerprints: `dict` of key value to hex digest
+
+        :returns: `None`
+        """
+
+        with self.db:
+            self.db.execute('DELETE FROM manifest WHERE scope = ?', (scope,))
+            self.db.executemany(
+                'INSERT INTO manifest (scope, key, digest) VALUES (?, ?, ?)',
+                ((scope, key, digest)
+                 for key, digest in fingerprints.items()))
+
+        LOGGER.debug('Saved {} fingerprints of {} to {}'.format(
+            len(fingerprints), scope, self.filepath))
+
+    def close(self):
+        """
+        closes the manifest file
+
+        :returns: `None`
+        """
+
+        self.db.close()
@@ -0,0 +1,719 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+# Per-stage loader timings, kept as in-process histograms keyed by
+# (plugin, stage) and exposed in the Prometheus text exposition format.
+#
+# Stages:
+#   read: reading a file from disk
+#   parse: parsing a file (XML, CSV, ...) into an in-memory structure
+#   transform: converting parsed data into documents / bulk actions
+#   serialize: encoding bulk actions into a request body
+#   roundtrip: Elasticsearch bulk request round-trip
+#   ack: processing the bulk response (per-document results)
+#
+# read/parse/transform are observed per file (or per package for batch
+# loaders), serialize/roundtrip/ack per bulk request.  When
+# MSC_PYGEOAPI_METRICS_DIR is set, each process periodically writes its
+# histograms to <dir>/msc_pygeoapi_<pid>.prom (e.g. for the node_exporter
+# textfile collector); 'msc-pygeoapi data stats' summarizes those files.
+# When a process exits, its histograms are folded into <dir>/msc_pygeoapi.prom
+# and its own file is removed; files left behind by processes that are no
+# longer running (e.g. killed workers) are folded in the same way.
+
+from bisect import bisect_left
+from contextlib import contextmanager
+import fcntl
+import glob
+import logging
+from multiprocessing.util import Finalize
+import os
+import re
+import threading
+from time import perf_counter
+
+import click
+
+from msc_pygeoapi.env import (MSC_PYGEOAPI_METRICS_DIR,
+                              MSC_PYGEOAPI_METRICS_INTERVAL)
+
+LOGGER = logging.getLogger(__name__)
+
+STAGES = ['read', 'parse', 'transform', 'serialize', 'roundtrip', 'ack']
+
+# histogram bucket upper bounds, in seconds
+BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_NAME = 'msc_pygeoapi_stage_duration_seconds'
+
+# process-lifetime histograms, keyed by (plugin, stage)
+HISTOGRAMS = {}
+
+_LOCK = threading.Lock()
+_WRITER = {}
+
+# serializes writing and retiring the metrics file of the current process
+_FILE_LOCK = threading.RLock()
+
+TOTALS_FILE = 'msc_pygeoapi.prom'
+
+METRICS_FILE_REGEX = re.compile(r'^msc_pygeoapi_(?P<pid>\d+)\.prom$')
+
+SAMPLE_REGEX = re.compile(
+    r'^{}_(?P<kind>bucket|sum|count)\{{(?P<labels>[^}}]*)\}} (?P<value>\S+)$'
+    .format(METRIC_NAME))
+LABEL_REGEX = re.compile(r'(\w+)="([^"]*)"')
+
+
+class Histogram(object):
+    """cumulative histogram of observed durations"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=BUCKETS):
+        """
+        initializer
+
+        :param buckets: `tuple` of bucket upper bounds (seconds)
+
+        :returns: `msc_pygeoapi.metrics.Histogram`
+        """
+
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """
+        record an observation
+
+        :param value: duration in seconds
+
+        :returns: void
+        """
+
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        """
+        add the observations of another histogram with the same buckets
+
+        :param other: `msc_pygeoapi.metrics.Histogram`
+
+        :returns: void
+        """
+
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q):
+        """
+        estimate a quantile by linear interpolation within its bucket,
+        as Prometheus' histogram_quantile() does
+
+        :param q: quantile (0 to 1)
+
+        :returns: `float` of estimated duration in seconds, or `None`
+        """
+
+        if self.count == 0:
+            return None
+
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if cumulative + count >= rank and count > 0:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+
+        return self.buckets[-1]
+
+
+def observe(plugin, stage, seconds):
+    """
+    record a stage duration for a plugin
+
+    :param plugin: plugin (loader) name
+    :param stage: stage name (one of `STAGES`)
+    :param seconds: duration in seconds
+
+    :returns: void
+    """
+
+    key = (plugin, stage)
+
+    if MSC_PYGEOAPI_METRICS_DIR is not None:
+        _start_writer()
+
+    with _LOCK:
+        if key not in HISTOGRAMS:
+            HISTOGRAMS[key] = Histogram()
+        HISTOGRAMS[key].observe(seconds)
+
+
+@contextmanager
+def timer(plugin, stage):
+    """
+    context manager recording the duration of its block
+
+    :param plugin: plugin (loader) name
+    :param stage: stage name (one of `STAGES`)
+
+    :returns: void
+    """
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        observe(plugin, stage, perf_counter() - start)
+
+
+def timed(iterable, plugin, stage):
+    """
+    wrap an iterable, recording the total time spent producing its items
+    (excluding the time the consumer spends between items) once exhausted
+
+    :param iterable: iterable to wrap
+    :param plugin: plugin (loader) name
+    :param stage: stage name (one of `STAGES`)
+
+    :returns: generator of the items of iterable
+    """
+
+    iterator = iter(iterable)
+    elapsed = 0.0
+
+    try:
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed += perf_counter() - start
+
+            yield item
+    finally:
+        observe(plugin, stage, elapsed)
+
+
+class Stopwatch(object):
+    """records the durations of consecutive stages of a plugin"""
+
+    def __init__(self, plugin):
+        """
+        initializer
+
+        :param plugin: plugin (loader) name
+
+        :returns: `msc_pygeoapi.metrics.Stopwatch`
+        """
+
+        self.plugin = plugin
+        self.last = perf_counter()
+
+    def lap(self, stage):
+        """
+        record the time elapsed since the previous lap (or creation)
+
+        :param stage: stage name (one of `STAGES`)
+
+        :returns: void
+        """
+
+        now = perf_counter()
+        observe(self.plugin, stage, now - self.last)
+        self.last = now
+
+
+class BulkTimer(object):
+    """
+    attributes the time spent in `elasticsearch.helpers.streaming_bulk`
+    to the transform (producing actions), serialize (chunking and encoding),
+    roundtrip and ack (consuming per-document results) stages
+    """
+
+    def __init__(self, plugin):
+        """
+        initializer
+
+        :param plugin: plugin (loader) name
+
+        :returns: `msc_pygeoapi.metrics.BulkTimer`
+        """
+
+        self.plugin = plugin
+        self.phase_start = perf_counter()
+        self.transform = 0.0
+        self.response_time = None
+
+    def actions(self, package):
+        """
+        wrap an iterable of bulk actions, timing their production
+
+        :param package: iterable of bulk API actions
+
+        :returns: generator of bulk API actions
+        """
+
+        iterator = iter(package)
+
+        while True:
+            start = perf_counter()
+            self._end_ack(start)
+
+            try:
+                action = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.transform += perf_counter() - start
+
+            yield action
+
+    def client(self, es):
+        """
+        wrap an Elasticsearch client, timing its bulk requests
+
+        :param es: `elasticsearch.Elasticsearch` object
+
+        :returns: `msc_pygeoapi.metrics.TimedBulkClient`
+        """
+
+        return TimedBulkClient(es, self)
+
+    def on_request(self):
+        """called when a bulk request is about to be sent"""
+
+        now = perf_counter()
+        self._end_ack(now)
+
+        observe(self.plugin, 'transform', self.transform)
+        observe(self.plugin, 'serialize',
+                max(now - self.phase_start - self.transform, 0.0))
+        self.transform = 0.0
+
+        return now
+
+    def on_response(self, start):
+        """called when a bulk request has returned"""
+
+        self.response_time = perf_counter()
+        observe(self.plugin, 'roundtrip', self.response_time - start)
+
+    def close(self):
+        """record the pending ack duration, if any"""
+
+        self._end_ack(perf_counter())
+
+    def _end_ack(self, now):
+        if self.response_time is not None:
+            observe(self.plugin, 'ack', now - self.response_time)
+            self.response_time = None
+            self.phase_start = now
+
+
+class TimedBulkClient(object):
+    """Elasticsearch client proxy timing bulk requests"""
+
+    def __init__(self, es, bulk_timer):
+        """
+        initializer
+
+        :param es: `elasticsearch.Elasticsearch` object
+        :param bulk_timer: `msc_pygeoapi.metrics.BulkTimer`
+
+        :returns: `msc_pygeoapi.metrics.TimedBulkClient`
+        """
+
+        self.es = es
+        self.bulk_timer = bulk_timer
+
+    def bulk(self, *args, **kwargs):
+        start = self.bulk_timer.on_request()
+        try:
+            return self.es.bulk(*args, **kwargs)
+        finally:
+            self.bulk_timer.on_response(start)
+
+    def __getattr__(self, name):
+        return getattr(self.es, name)
+
+
+def render(histograms=None, labels=None):
+    """
+    render histograms in the Prometheus text exposition format
+
+    :param histograms: `dict` of histograms keyed by (plugin, stage)
+                       (default: those of the current process)
+    :param labels: `dict` of extra labels to add to each sample
+
+    :returns: `str` of Prometheus text exposition
+    """
+
+    if histograms is None:
+        with _LOCK:
+            histograms = {key: _copy(value)
+                          for key, value in HISTOGRAMS.items()}
+
+    extra = ''.join(',{}="{}"'.format(key, value)
+                    for key, value in sorted((labels or {}).items()))
+
+    lines = [
+        '# HELP {} Duration of msc-pygeoapi loader stages'.format(
+            METRIC_NAME),
+        '# TYPE {} histogram'.format(METRIC_NAME)
+    ]
+
+    for (plugin, stage), histogram in sorted(histograms.items()):
+        prefix = 'plugin="{}",stage="{}"{}'.format(plugin, stage, extra)
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append('{}_bucket{{{},le="{}"}} {}'.format(
+                METRIC_NAME, prefix, bound, cumulative))
+        lines.append('{}_bucket{{{},le="+Inf"}} {}'.format(
+            METRIC_NAME, prefix, histogram.count))
+        lines.append('{}_sum{{{}}} {}'.format(
+            METRIC_NAME, prefix, repr(histogram.sum)))
+        lines.append('{}_count{{{}}} {}'.format(
+            METRIC_NAME, prefix, histogram.count))
+
+    return '\n'.join(lines) + '\n'
+
+
+def parse(text, histograms=None):
+    """
+    parse histograms from a Prometheus text exposition, merging samples
+    of the same plugin and stage (e.g. from different processes)
+
+    :param text: `str` of Prometheus text exposition
+    :param histograms: `dict` of histograms to merge into (optional)
+
+    :returns: `dict` of histograms keyed by (plugin, stage)
+    """
+
+    if histograms is None:
+        histograms = {}
+
+    parsed = {}
+
+    for line in text.splitlines():
+        match = SAMPLE_REGEX.match(line)
+        if match is None:
+            continue
+
+        labels = dict(LABEL_REGEX.findall(match.group('labels')))
+        series = (labels.get('plugin'), labels.get('stage'),
+                  labels.get('pid'))
+        sample = parsed.setdefault(series, {'buckets': {}})
+
+        kind = match.group('kind')
+        if kind == 'bucket':
+            # float('+Inf') sorts the overflow bucket last
+            bound = float(labels['le'])
+            sample['buckets'][bound] = int(float(match.group('value')))
+        else:
+            sample[kind] = float(match.group('value'))
+
+    for (plugin, stage, pid), sample in parsed.items():
+        bounds = sorted(sample['buckets'])[:-1]
+        histogram = Histogram(tuple(bounds))
+        previous = 0
+        for i, bound in enumerate(bounds):
+            histogram.counts[i] = sample['buckets'][bound] - previous
+            previous = sample['buckets'][bound]
+        histogram.count = int(sample.get('count', previous))
+        histogram.counts[-1] = histogram.count - previous
+        histogram.sum = sample.get('sum', 0.0)
+
+        key = (plugin, stage)
+        if key in histograms and histograms[key].buckets == histogram.buckets:
+            histograms[key].merge(histogram)
+        else:
+            histograms[key] = histogram
+
+    return histograms
+
+
+def _copy(histogram):
+    copy = Histogram(histogram.buckets)
+    copy.merge(histogram)
+    return copy
+
+
+def get_metrics_file(directory=MSC_PYGEOAPI_METRICS_DIR, pid=None):
+    """
+    helper function to return the metrics file of a process
+
+    :param directory: metrics directory
+    :param pid: process id (default: the current process)
+
+    :returns: `str` of path to metrics file
+    """
+
+    return os.path.join(directory, 'msc_pygeoapi_{}.prom'.format(
+        pid or os.getpid()))
+
+
+def _write_atomic(filename, text):
+    """
+    write a file atomically so that collectors never see a partial file
+
+    :param filename: path to file
+    :param text: `str` of file content
+
+    :returns: void
+    """
+
+    tmp_filename = '{}.tmp'.format(filename)
+
+    with open(tmp_filename, 'w') as fh:
+        fh.write(text)
+    os.replace(tmp_filename, filename)
+
+
+def write_metrics(directory=MSC_PYGEOAPI_METRICS_DIR):
+    """
+    write the histograms of the current process to its metrics file
+
+    :param directory: metrics directory
+
+    :returns: `bool` of write result
+    """
+
+    if directory is None:
+        return False
+
+    filename = get_metrics_file(directory)
+
+    with _FILE_LOCK:
+        if not HISTOGRAMS:
+            return False
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            _write_atomic(filename, render(labels={'pid': os.getpid()}))
+        except OSError as err:
+            LOGGER.warning('Cannot write metrics to {}: {}'.format(
+                filename, err))
+            return False
+
+    return True
+
+
+def _pid_running(pid):
+    """
+    helper function to check whether a process is running
+
+    :param pid: process id
+
+    :returns: `bool` of whether the process is running
+    """
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+def fold_metrics(directory=MSC_PYGEOAPI_METRICS_DIR, pids=()):
+    """
+    fold the metrics files of exited processes into the totals file
+    (msc_pygeoapi.prom) and remove them
+
+    :param directory: metrics directory
+    :param pids: process ids that have exited, in addition to those
+                 found not running
+
+    :returns: `int` of number of metrics files folded
+    """
+
+    if directory is None or not os.path.isdir(directory):
+        return 0
+
+    totals_file = os.path.join(directory, TOTALS_FILE)
+
+    with open('{}.lock'.format(totals_file), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        filenames = []
+        for filename in os.listdir(directory):
+            match = METRICS_FILE_REGEX.match(filename)
+            if match is None:
+                continue
+            pid = int(match.group('pid'))
+            if pid in pids or not _pid_running(pid):
+                filenames.append(os.path.join(directory, filename))
+
+        if not filenames:
+            return 0
+
+        histograms = {}
+        for filename in [totals_file] + filenames:
+            try:
+                with open(filename) as fh:
+                    parse(fh.read(), histograms)
+            except FileNotFoundError:
+                pass
+
+        try:
+            _write_atomic(totals_file, render(histograms))
+            for filename in filenames:
+                os.remove(filename)
+        except OSError as err:
+            LOGGER.warning('Cannot fold metrics into {}: {}'.format(
+                totals_file, err))
+            return 0
+
+    return len(filenames)
+
+
+def retire_metrics(directory=MSC_PYGEOAPI_METRICS_DIR):
+    """
+    write the final histograms of the current process and fold them into
+    the totals file (run when the process exits)
+
+    :param directory: metrics directory
+
+    :returns: void
+    """
+
+    with _FILE_LOCK:
+        if not write_metrics(directory):
+            return
+
+        # later writes (e.g. from the periodic writer) would count twice
+        with _LOCK:
+            HISTOGRAMS.clear()
+
+        fold_metrics(directory, pids=(os.getpid(),))
+
+
+def _start_writer():
+    """start the periodic metrics writer of the current process"""
+
+    pid = os.getpid()
+
+    if pid in _WRITER:
+        return
+
+    with _LOCK:
+        if pid in _WRITER:
+            return
+
+        # new processes (e.g. forked workers) start from empty histograms
+        if _WRITER:
+            HISTOGRAMS.clear()
+            _WRITER.clear()
+
+        _WRITER[pid] = threading.Thread(target=_run_writer,
+                                        name='metrics-writer', daemon=True)
+        _WRITER[pid].start()
+
+    # unlike atexit, also run when multiprocessing workers (e.g. of a
+    # ProcessPoolExecutor) exit, and after bulk sinks are flushed
+    Finalize(None, retire_metrics, exitpriority=5)
+
+
+def _run_writer():
+    """write metrics every MSC_PYGEOAPI_METRICS_INTERVAL seconds"""
+
+    event = threading.Event()
+
+    while not event.wait(MSC_PYGEOAPI_METRICS_INTERVAL):
+        write_metrics()
+
+
+@click.command()
+@click.pass_context
+@click.option('--directory', '-d', default=MSC_PYGEOAPI_METRICS_DIR,
+              type=click.Path(exists=True, file_okay=False),
+              help='Metrics directory (default: MSC_PYGEOAPI_METRICS_DIR)')
+@click.option('--plugin', '-p', help='Only show a given plugin')
+@click.option('--format', '-f', 'format_', default='table',
+              type=click.Choice(['table', 'prometheus']),
+              help='Output format')
+def stats(ctx, directory, plugin, format_):
+    """Summarize loader stage timings"""
+
+    if directory is None:
+        raise click.ClickException(
+            'No metrics directory (set MSC_PYGEOAPI_METRICS_DIR)')
+
+    fold_metrics(directory)
+
+    histograms = {}
+    for filename in sorted(glob.glob(os.path.join(directory, '*.prom'))):
+        with open(filename) as fh:
+            parse(fh.read(), histograms)
+
+    if plugin is not None:
+        histograms = {key: value for key, value in histograms.items()
+                      if key[0] == plugin}
+
+    if format_ == 'prometheus':
+        click.echo(render(histograms), nl=False)
+        return
+
+    if not histograms:
+        click.echo('No timings recorded')
+        return
+
+    click.echo('{:<26}{:<11}{:>10}{:>12}{:>11}{:>11}{:>11}'.format(
+        'plugin', 'stage', 'count', 'total (s)', 'mean (ms)', 'p50 (ms)',
+        'p95 (ms)'))
+
+    order = {stage: i for i, stage in enumerate(STAGES)}
+
+    for (plugin_, stage), histogram in sorted(
+            histograms.items(),
+            key=lambda item: (item[0][0], order.get(item[0][1], 99))):
+        mean = histogram.sum / histogram.count if histogram.count else 0
+        click.echo('{:<26}{:<11}{:>10}{:>12.3f}{:>11.3f}{:>11.3f}{:>11.3f}'
+                   .format(plugin_, stage, histogram.count, histogram.sum,
+                           mean * 1000,
+                           (histogram.quantile(0.5) or 0) * 1000,
+                           (histogram.quantile(0.95) or 0) * 1000))
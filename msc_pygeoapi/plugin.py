@@ -29,6 +29,7 @@
 
 import importlib
 import logging
+import re
 
 LOGGER = logging.getLogger(__name__)
 
@@ -69,6 +70,15 @@ PLUGINS = {
     }
 }
 
+# process-lifetime plugin classes, keyed by handler path
+PLUGIN_CLASSES = {}
+
+# process-lifetime plugin instances, keyed by (plugin type, plugin name)
+PLUGIN_INSTANCES = {}
+
+# process-lifetime filename routers, keyed by plugin type
+ROUTERS = {}
+
 
 def load_plugin(plugin_type, plugin_def):
     """
@@ -85,17 +95,148 @@ def load_plugin(plugin_type, plugin_def):
         LOGGER.exception(msg)
         raise InvalidPluginError(msg)
 
-    handler = plugin_def['handler']
+    class_ = resolve_plugin_class(plugin_def['handler'])
+    plugin = class_(plugin_def)
+    return plugin
 
-    packagename, classname = handler.rsplit('.', 1)
 
-    LOGGER.debug('package name: {}'.format(packagename))
-    LOGGER.debug('class name: {}'.format(classname))
+def resolve_plugin_class(handler):
+    """
+    resolves (and caches) a plugin class from its dotted path
 
-    module = importlib.import_module(packagename)
-    class_ = getattr(module, classname)
-    plugin = class_(plugin_def)
-    return plugin
+    :param handler: dotted path to plugin class
+
+    :returns: plugin class
+    """
+
+    if handler not in PLUGIN_CLASSES:
+        packagename, classname = handler.rsplit('.', 1)
+
+        LOGGER.debug('package name: {}'.format(packagename))
+        LOGGER.debug('class name: {}'.format(classname))
+
+        module = importlib.import_module(packagename)
+        PLUGIN_CLASSES[handler] = getattr(module, classname)
+
+    return PLUGIN_CLASSES[handler]
+
+
+def get_plugin(plugin_type, plugin_name):
+    """
+    returns a process-lifetime instance of a plugin by name, loading it
+    on first use so that setup costs (ES connection, index checks, lookup
+    tables) are paid once per process rather than once per file
+
+    :param plugin_type: type of plugin (loader, etc.)
+    :param plugin_name: name of plugin as defined in `PLUGINS`
+
+    :returns: plugin object
+    """
+
+    key = (plugin_type, plugin_name)
+
+    if key not in PLUGIN_INSTANCES:
+        try:
+            plugin_def = PLUGINS[plugin_type][plugin_name]
+        except KeyError:
+            msg = 'Plugin {} ({}) not found'.format(plugin_name, plugin_type)
+            LOGGER.exception(msg)
+            raise InvalidPluginError(msg)
+
+        LOGGER.debug('Loading plugin {}'.format(plugin_def))
+        PLUGIN_INSTANCES[key] = load_plugin(plugin_type, plugin_def)
+
+    return PLUGIN_INSTANCES[key]
+
+
+def get_router(plugin_type):
+    """
+    returns the process-lifetime filename router of a plugin type
+
+    :param plugin_type: type of plugin (loader, etc.)
+
+    :returns: `msc_pygeoapi.plugin.PluginRouter`
+    """
+
+    if plugin_type not in ROUTERS:
+        ROUTERS[plugin_type] = PluginRouter(plugin_type)
+
+    return ROUTERS[plugin_type]
+
+
+class PluginRouter(object):
+    """filename pattern router"""
+
+    def __init__(self, plugin_type, resolve=True):
+        """
+        initializer
+
+        Compiles all plugin filename patterns of a plugin type into a single
+        regular expression alternation.  A filepath is routed to the plugin
+        whose pattern occurs first (leftmost) in the filepath; ties are
+        broken by plugin definition order.
+
+        :param plugin_type: type of plugin (loader, etc.)
+        :param resolve: whether to import plugin classes up front
+
+        :returns: `msc_pygeoapi.plugin.PluginRouter`
+        """
+
+        if plugin_type not in PLUGINS.keys():
+            msg = 'Plugin {} not found'.format(plugin_type)
+            LOGGER.exception(msg)
+            raise InvalidPluginError(msg)
+
+        self.plugin_type = plugin_type
+        self.names = list(PLUGINS[plugin_type].keys())
+
+        self.regex = re.compile('|'.join(
+            '({})'.format(re.escape(PLUGINS[plugin_type][name][
+                'filename_pattern'])) for name in self.names))
+
+        if resolve:
+            for name in self.names:
+                handler = PLUGINS[plugin_type][name]['handler']
+                try:
+                    resolve_plugin_class(handler)
+                except (ImportError, AttributeError) as err:
+                    LOGGER.warning('Cannot resolve plugin {}: {}'.format(
+                        name, err))
+
+    def route(self, filepath):
+        """
+        detects the plugin handling a given filepath
+
+        :param filepath: path to file
+
+        :returns: `str` of plugin name, or `None` if no pattern matches
+        """
+
+        match = self.regex.search(filepath)
+
+        if match is None:
+            return None
+
+        return self.names[match.lastindex - 1]
+
+    def get_plugin(self, filepath):
+        """
+        returns the process-lifetime plugin instance handling a filepath
+
+        :param filepath: path to file
+
+        :returns: plugin object, or `None` if no pattern matches
+        """
+
+        name = self.route(filepath)
+
+        if name is None:
+            return None
+
+        return get_plugin(self.plugin_type, name)
+
+    def __repr__(self):
+        return '<PluginRouter> {}'.format(self.plugin_type)
 
 
 class InvalidPluginError(Exception):
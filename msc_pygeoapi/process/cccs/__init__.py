@@ -30,6 +30,7 @@
 
 import click
 
+from msc_pygeoapi.process.cccs.drill_cache import build_drill_cache
 from msc_pygeoapi.process.cccs.raster_drill import raster_drill_execute
 
 GEOMET_CLIMATE_CONFIG = '/opt/geomet-climate/geomet-climate.yml'
@@ -42,4 +43,5 @@ def cccs():
     pass
 
 
+cccs.add_command(build_drill_cache)
 cccs.add_command(raster_drill_execute)
@@ -0,0 +1,289 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+# Hot raster drill layers can be cached offline as pixel-major arrays
+# (rows x columns x bands), so that the time series of a point is a
+# single contiguous read of a memory-mapped file.
+
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import click
+import numpy as np
+from numpy.lib.format import open_memmap
+from osgeo import gdal
+
+from msc_pygeoapi.env import (MSC_PYGEOAPI_CACHEDIR,
+                              MSC_PYGEOAPI_RASTER_DRILL_CACHEDIR)
+
+LOGGER = logging.getLogger(__name__)
+
+CACHEDIR = (MSC_PYGEOAPI_RASTER_DRILL_CACHEDIR or
+            os.path.join(MSC_PYGEOAPI_CACHEDIR, 'raster-drill'))
+# bytes of a raster read at a time while transposing it
+STRIP_BYTES = 64 * 1024 * 1024
+
+
+def get_sidecar_path(cachedir, filepath):
+    """
+    get the path (without extension) of the drill cache of a raster file
+
+    :param cachedir: drill cache directory
+    :param filepath: filepath of raster data
+
+    :returns: `str` of sidecar path
+    """
+
+    digest = hashlib.sha1(filepath.encode('utf-8')).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(filepath))[0]
+
+    return os.path.join(cachedir, '{}-{}'.format(name, digest))
+
+
+class PixelMajorRaster(object):
+    """
+    memory-mapped drill cache of a raster file, read like the GDAL
+    dataset it was built from
+    """
+
+    def __init__(self, sidecar_path, sidecar_mtime):
+        """
+        initializer
+
+        :param sidecar_path: sidecar path (without extension)
+        :param sidecar_mtime: modification time (ns) of the sidecar
+                              metadata
+
+        :returns: `msc_pygeoapi.process.cccs.drill_cache.PixelMajorRaster`
+        """
+
+        with open('{}.json'.format(sidecar_path)) as fh:
+            metadata = json.load(fh)
+
+        self.array = np.load('{}.npy'.format(sidecar_path), mmap_mode='r')
+        self.source_mtime = metadata['mtime']
+        self.sidecar_mtime = sidecar_mtime
+        self.geotransform = tuple(metadata['geotransform'])
+        self.RasterYSize, self.RasterXSize, self.RasterCount = \
+            self.array.shape
+
+    def GetGeoTransform(self):
+        """
+        get the geotransform of the source raster
+
+        :returns: `tuple` of affine transformation coefficients
+        """
+
+        return self.geotransform
+
+    def ReadAsArray(self, xoff, yoff, xsize, ysize):
+        """
+        read a window of all bands
+
+        :param xoff: x pixel offset
+        :param yoff: y pixel offset
+        :param xsize: window width
+        :param ysize: window height
+
+        :returns: `numpy.ndarray` of bands x rows x columns (rows x
+                  columns for a single band)
+        """
+
+        window = self.array[yoff:yoff + ysize, xoff:xoff + xsize]
+        window = window.transpose(2, 0, 1)
+
+        return window[0] if self.RasterCount == 1 else window
+
+
+class DrillCache(object):
+    """drill caches of raster files, used while newer than their source"""
+
+    def __init__(self, cachedir):
+        """
+        initializer
+
+        :param cachedir: drill cache directory
+
+        :returns: `msc_pygeoapi.process.cccs.drill_cache.DrillCache`
+        """
+
+        self.cachedir = cachedir
+        self.rasters = {}
+        self.lock = threading.Lock()
+
+    def get(self, filepath):
+        """
+        get the drill cache of a raster file
+
+        :param filepath: filepath of raster data
+
+        :returns: `msc_pygeoapi.process.cccs.drill_cache.PixelMajorRaster`,
+                  or `None` if the file is not cached (or was modified
+                  since it was)
+        """
+
+        sidecar_path = get_sidecar_path(self.cachedir, filepath)
+
+        try:
+            source_mtime = os.stat(filepath).st_mtime_ns
+            sidecar_mtime = os.stat('{}.json'.format(sidecar_path)).st_mtime_ns
+        except OSError:
+            return None
+
+        with self.lock:
+            raster = self.rasters.get(filepath)
+            if raster is None or raster.sidecar_mtime != sidecar_mtime:
+                try:
+                    raster = PixelMajorRaster(sidecar_path, sidecar_mtime)
+                except (OSError, KeyError, ValueError) as err:
+                    LOGGER.warning('Invalid drill cache {}: {}'.format(
+                        sidecar_path, err))
+                    return None
+                self.rasters[filepath] = raster
+
+        if raster.source_mtime != source_mtime:
+            LOGGER.debug('Stale drill cache {}'.format(sidecar_path))
+            return None
+
+        return raster
+
+
+def build_sidecar(filepath, cachedir, layers=None):
+    """
+    transpose a raster file into a pixel-major drill cache
+
+    :param filepath: filepath of raster data
+    :param cachedir: drill cache directory
+    :param layers: `list` of layer names of the raster (informational)
+
+    :returns: `dict` of the cached array shape, size and build time
+    """
+
+    start = time.time()
+    source_mtime = os.stat(filepath).st_mtime_ns
+
+    ds = gdal.Open(filepath)
+    if ds is None:
+        raise RuntimeError('GDAL could not open {}'.format(filepath))
+
+    bands, rows, cols = ds.RasterCount, ds.RasterYSize, ds.RasterXSize
+    sidecar_path = get_sidecar_path(cachedir, filepath)
+    tmp_path = '{}.tmp.npy'.format(sidecar_path)
+
+    array = None
+    strip_rows = 1
+    y = 0
+
+    try:
+        while y < rows:
+            ysize = min(strip_rows, rows - y)
+            strip = ds.ReadAsArray(0, y, cols, ysize)
+            if strip.ndim == 2:
+                strip = strip[np.newaxis]
+
+            if array is None:
+                array = open_memmap(tmp_path, mode='w+', dtype=strip.dtype,
+                                    shape=(rows, cols, bands))
+                strip_rows = max(1, STRIP_BYTES // (
+                    bands * cols * strip.dtype.itemsize))
+
+            array[y:y + ysize] = strip.transpose(1, 2, 0)
+            y += ysize
+
+        array.flush()
+        nbytes = array.nbytes
+        del array
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    os.replace(tmp_path, '{}.npy'.format(sidecar_path))
+
+    metadata = {
+        'source': filepath,
+        'mtime': source_mtime,
+        'geotransform': list(ds.GetGeoTransform()),
+        'layers': layers or []
+    }
+
+    # the metadata (whose mtime validates the cache) is written last
+    tmp_path = '{}.tmp.json'.format(sidecar_path)
+    with open(tmp_path, 'w') as fh:
+        json.dump(metadata, fh)
+    os.replace(tmp_path, '{}.json'.format(sidecar_path))
+
+    return {
+        'shape': (rows, cols, bands),
+        'bytes': nbytes,
+        'seconds': time.time() - start
+    }
+
+
+@click.command('build-drill-cache')
+@click.pass_context
+@click.option('--layer', 'layers', multiple=True, required=True,
+              help='Layer name to cache (repeat for several layers)')
+@click.option('--cachedir', type=click.Path(file_okay=False),
+              default=CACHEDIR, show_default=True,
+              help='Drill cache directory')
+def build_drill_cache(ctx, layers, cachedir):
+    """Cache raster drill layers as pixel-major arrays"""
+
+    from msc_pygeoapi.process.cccs import GEOMET_CLIMATE_CONFIG
+    from msc_pygeoapi.process.cccs.raster_drill import get_config
+
+    config = get_config(GEOMET_CLIMATE_CONFIG)
+
+    files = OrderedDict()
+    for layer in layers:
+        try:
+            layer_info = config.get_layer(layer)
+        except ValueError as err:
+            raise click.ClickException(str(err))
+        files.setdefault(layer_info.filepath, []).append(layer)
+
+    os.makedirs(cachedir, exist_ok=True)
+
+    for filepath, layers_ in files.items():
+        click.echo('Caching {} ({})'.format(', '.join(layers_), filepath))
+        try:
+            summary = build_sidecar(filepath, cachedir, layers_)
+        except (OSError, RuntimeError) as err:
+            raise click.ClickException('Could not cache {}: {}'.format(
+                filepath, err))
+        click.echo('Cached {} x {} pixels x {} bands ({:.1f} MB) in'
+                   ' {:.1f}s'.format(*summary['shape'],
+                                     summary['bytes'] / 1e6,
+                                     summary['seconds']))
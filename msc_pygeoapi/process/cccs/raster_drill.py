@@ -28,6 +28,7 @@
 #
 # =================================================================
 
+from collections import OrderedDict
 import click
 import csv
 import io
@@ -35,12 +36,16 @@ import json
 import logging
 import os
 import re
+import threading
 
 from osgeo import gdal, osr
-from pyproj import Proj, transform
+from pyproj import Transformer
 import yaml
 from yaml import CLoader
 
+from msc_pygeoapi.env import MSC_PYGEOAPI_RASTER_DRILL_MAX_OPEN
+from msc_pygeoapi.process.cccs.drill_cache import CACHEDIR, DrillCache
+
 LOGGER = logging.getLogger(__name__)
 
 UNITS = {
@@ -66,8 +71,11 @@ UNITS = {
     'TX30': {'ABS': 'Days / Jours'}
     }
 
+# maximum number of (layer, point) drills of a batch drill
+MAX_DRILLS = 1000
+
 PROCESS_METADATA = {
-    'version': '0.1.0',
+    'version': '0.2.0',
     'id': 'raster-drill',
     'title': 'Raster Drill process',
     'description': 'Raster Drill process',
@@ -96,7 +104,7 @@ PROCESS_METADATA = {
                 }
             }
         },
-        'minOccurs': 1,
+        'minOccurs': 0,
         'maxOccurs': 1
     }, {
         'id': 'y',
@@ -109,7 +117,7 @@ PROCESS_METADATA = {
                 }
             }
         },
-        'minOccurs': 1,
+        'minOccurs': 0,
         'maxOccurs': 1
     }, {
         'id': 'x',
@@ -122,8 +130,37 @@ PROCESS_METADATA = {
                 }
             }
         },
-        'minOccurs': 1,
+        'minOccurs': 0,
         'maxOccurs': 1
+    }, {
+        'id': 'layers',
+        'title': 'layer names (batch drill)',
+        'input': {
+            'literalDataDomain': {
+                'dataType': 'string',
+                'valueDefinition': {
+                    'anyValue': True
+                }
+            }
+        },
+        'minOccurs': 0,
+        'maxOccurs': MAX_DRILLS
+    }, {
+        'id': 'points',
+        'title': 'x/y coordinate pairs (batch drill)',
+        'description': 'one point per value, given either as an `x,y` '
+                       'string (e.g. "-75.7,45.4") or as an [x, y] array '
+                       'of numbers',
+        'input': {
+            'literalDataDomain': {
+                'dataType': 'string',
+                'valueDefinition': {
+                    'anyValue': True
+                }
+            }
+        },
+        'minOccurs': 0,
+        'maxOccurs': MAX_DRILLS
     }, {
         'id': 'format',
         'title': 'format: GeoJSON or CSV',
@@ -214,62 +251,229 @@ def geo2xy(ds, x, y):
     return (x, y)
 
 
-def get_location_info(file_, x, y, cfg, layer_keys):
+class DatasetHandle(object):
+    """GDAL dataset kept open between drills, with the lock guarding it"""
+
+    def __init__(self, dataset, mtime):
+        """
+        initializer
+
+        :param dataset: GDAL dataset object
+        :param mtime: modification time (ns) of the file when opened
+
+        :returns: `msc_pygeoapi.process.cccs.raster_drill.DatasetHandle`
+        """
+
+        self.dataset = dataset
+        self.mtime = mtime
+        self.lock = threading.Lock()
+
+
+class DatasetCache(object):
     """
-    extract x/y value across all bands of a raster file
+    least recently used GDAL datasets, kept open between drills (a file
+    modified since it was opened is reopened), logging its statistics
+    every `STATS_INTERVAL` lookups
+    """
+
+    STATS_INTERVAL = 1000
+
+    def __init__(self, max_open):
+        """
+        initializer
+
+        :param max_open: maximum number of datasets kept open (0 to open
+                         a dataset per drill)
+
+        :returns: `msc_pygeoapi.process.cccs.raster_drill.DatasetCache`
+        """
+
+        self.max_open = max_open
+        self.handles = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, filepath):
+        """
+        get an open dataset, opening it if not cached (or modified)
+
+        :param filepath: filepath of raster data
+
+        :returns: `msc_pygeoapi.process.cccs.raster_drill.DatasetHandle`
+        """
+
+        mtime = os.stat(filepath).st_mtime_ns
+
+        with self.lock:
+            lookups = self.hits + self.misses + 1
+            handle = self.handles.get(filepath)
+            if handle is not None and handle.mtime == mtime:
+                self.handles.move_to_end(filepath)
+                self.hits += 1
+            else:
+                self.misses += 1
+                handle = None
+
+        if handle is None:
+            handle = self._open(filepath, mtime)
+
+        if lookups % self.STATS_INTERVAL == 0:
+            LOGGER.info('Dataset cache: {open} of {max_open} open, {hits}'
+                        ' hits, {misses} misses, {evictions} evictions'
+                        .format(**self.stats()))
+
+        return handle
+
+    def _open(self, filepath, mtime):
+        """
+        open a dataset and cache it, evicting the least recently used
+
+        :param filepath: filepath of raster data
+        :param mtime: modification time (ns) of the file
+
+        :returns: `msc_pygeoapi.process.cccs.raster_drill.DatasetHandle`
+        """
+
+        # opened without holding the cache lock, as headers of large
+        # files are slow to parse
+        dataset = gdal.Open(filepath)
+        if dataset is None:
+            raise RuntimeError('GDAL could not open {}'.format(filepath))
+        handle = DatasetHandle(dataset, mtime)
+
+        with self.lock:
+            cached = self.handles.get(filepath)
+            if cached is not None and cached.mtime == mtime:
+                # opened concurrently by another drill
+                return cached
+            if self.max_open > 0:
+                self.handles[filepath] = handle
+                self.handles.move_to_end(filepath)
+            while len(self.handles) > self.max_open:
+                # datasets still being read are closed once released
+                evicted, _ = self.handles.popitem(last=False)
+                self.evictions += 1
+                LOGGER.debug('Closing {}'.format(evicted))
+
+        return handle
+
+    def stats(self):
+        """
+        get cache statistics
+
+        :returns: `dict` of open datasets, hits, misses and evictions
+        """
+
+        with self.lock:
+            return {
+                'open': len(self.handles),
+                'max_open': self.max_open,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+DATASETS = DatasetCache(MSC_PYGEOAPI_RASTER_DRILL_MAX_OPEN)
+DRILL_CACHE = DrillCache(CACHEDIR)
+
+
+def open_dataset(file_):
+    """
+    get an open raster file: its drill cache (see build-drill-cache) if
+    up to date, otherwise the GDAL dataset from the dataset cache
 
     :param file_: filepath of raster data
-    :param x: x coordinate
-    :param y: y coordinate
-    :param cfg: yaml information
-    :param layer_keys: layer label splitted
 
-    :returns: `dict` of metadata and array values
+    :returns: `msc_pygeoapi.process.cccs.raster_drill.DatasetHandle`
     """
 
-    dict_ = {
-        'uom': None,
-        'metadata': None,
-        'time_step': None,
-        'values': [],
-        'dates': []
-    }
+    raster = DRILL_CACHE.get(file_)
+    if raster is not None:
+        LOGGER.debug('Using drill cache of {}'.format(file_))
+        return DatasetHandle(raster, raster.source_mtime)
 
     LOGGER.debug('Opening {}'.format(file_))
     try:
-        LOGGER.debug('Fetching units')
-        dict_['time_step'] = cfg['timestep']
+        return DATASETS.get(file_)
+    except (OSError, RuntimeError) as err:
+        msg = 'Cannot open file: {}'.format(err)
+        LOGGER.exception(msg)
+        raise ValueError(msg)
 
-        dict_['metadata'] = layer_keys
-        dict_['uom'] = UNITS[layer_keys['Variable']][layer_keys['Type']]
 
-        ds = gdal.Open(file_)
-        LOGGER.debug('Transforming map coordinates into image coordinates')
-        x_, y_ = geo2xy(ds, x, y)
+def read_pixel(ds, x_, y_):
+    """
+    read a pixel across all bands of a raster
 
-    except RuntimeError as err:
-        ds = None
-        msg = 'Cannot open file: {}'.format(err)
-        LOGGER.exception(msg)
+    :param ds: GDAL dataset object
+    :param x_: x pixel value
+    :param y_: y pixel value
 
-    LOGGER.debug('Running through bands')
+    :returns: `list` of band values, or `None` if outside of the raster
+    """
 
-    for band in range(1, ds.RasterCount + 1):
-        LOGGER.debug('Fetching band {}'.format(band))
+    if 0 <= x_ < ds.RasterXSize and 0 <= y_ < ds.RasterYSize:
+        # a 1x1 window of all bands (the whole time series) in one read
+        return ds.ReadAsArray(x_, y_, 1, 1).ravel().tolist()
 
-        srcband = ds.GetRasterBand(band)
-        array = srcband.ReadAsArray().tolist()
+    msg = 'Invalid x/y value: {}/{} outside of {}x{} raster'.format(
+        x_, y_, ds.RasterXSize, ds.RasterYSize)
+    LOGGER.error(msg)
 
-        try:
-            dict_['values'].append(array[y_][x_])
-        except IndexError as err:
-            msg = 'Invalid x/y value: {}'.format(err)
-            LOGGER.exception(msg)
+    return None
+
+
+def get_location_metadata(cfg, layer_keys, dates=None):
+    """
+    describe the values drilled from a layer
+
+    :param cfg: yaml information
+    :param layer_keys: layer label splitted
+    :param dates: time steps of the layer (derived from cfg if None)
+
+    :returns: `dict` of metadata, without values
+    """
+
+    LOGGER.debug('Fetching units')
+
+    return {
+        'uom': UNITS[layer_keys['Variable']][layer_keys['Type']],
+        'metadata': layer_keys,
+        'time_step': cfg['timestep'],
+        'values': [],
+        'dates': dates if dates is not None else get_time_info(cfg)
+    }
+
+
+def get_location_info(file_, x, y, cfg, layer_keys, dates=None):
+    """
+    extract x/y value across all bands of a raster file
+
+    :param file_: filepath of raster data
+    :param x: x coordinate
+    :param y: y coordinate
+    :param cfg: yaml information
+    :param layer_keys: layer label splitted
+    :param dates: time steps of the layer (derived from cfg if None)
+
+    :returns: `dict` of metadata and array values
+    """
 
-    dict_['dates'] = get_time_info(cfg)
+    dict_ = get_location_metadata(cfg, layer_keys, dates)
+    handle = open_dataset(file_)
 
-    LOGGER.debug('Freeing dataset object')
-    ds = None
+    # GDAL datasets must not be read by several threads at once
+    with handle.lock:
+        ds = handle.dataset
+
+        LOGGER.debug('Transforming map coordinates into image coordinates')
+        x_, y_ = geo2xy(ds, x, y)
+
+        LOGGER.debug('Reading pixel across all bands')
+        dict_['values'] = read_pixel(ds, x_, y_) or []
 
     return dict_
 
@@ -406,6 +610,160 @@ def serialize(values_dict, cfg, output_format, x, y):
     return data
 
 
+class LayerInfo(object):
+    """
+    geomet-climate layer resolved for drilling: raster filepath, layer
+    keys, time steps and coordinate transformer
+    """
+
+    def __init__(self, layer, cfg):
+        """
+        initializer
+
+        :param layer: layer name
+        :param cfg: CCCS Yaml section for the layer
+
+        :returns: `msc_pygeoapi.process.cccs.raster_drill.LayerInfo`
+        """
+
+        from msc_pygeoapi.process.cccs import (GEOMET_CLIMATE_BASEPATH,
+                                               GEOMET_CLIMATE_BASEPATH_VRT)
+
+        self.layer = layer
+        self.cfg = cfg
+
+        data_basepath = GEOMET_CLIMATE_BASEPATH
+        climate_model_path = cfg['climate_model']['basepath']
+        file_path = cfg['filepath']
+        inter_path = os.path.join(climate_model_path, file_path)
+
+        if ('ABS' in layer or 'ANO' in layer and
+           layer.startswith('CANGRD') is False):
+
+            keys = ['Model',
+                    'Variable',
+                    'Scenario',
+                    'Period',
+                    'Type',
+                    'Percentile']
+            values = layer.replace('_', '.').split('.')
+            layer_keys = dict(zip(keys, values))
+
+            file_name = cfg['filename']
+
+        elif 'TREND' not in layer and layer.startswith('CANGRD'):
+            keys = ['Model', 'Type', 'Variable', 'Period']
+            values = layer.replace('_', '.').split('.')
+            layer_keys = dict(zip(keys, values))
+
+            data_basepath = GEOMET_CLIMATE_BASEPATH_VRT
+
+            file_name = '{}.vrt'.format(cfg['filename'])
+
+        elif layer.startswith('SPEI'):
+            keys = ['Variable', 'Variation', 'Scenario', 'Period',
+                    'Percentile']
+            values = layer.replace('-', '.').replace('_', '.').split('.')
+            layer_keys = dict(zip(keys, values))
+            layer_keys['Type'] = 'ABS'
+
+            file_name = cfg['filename']
+
+        elif layer.startswith('INDICES'):
+            keys = ['Model', 'Variable', 'Scenario', 'Percentile']
+            values = layer.replace('_', '.').split('.')
+            layer_keys = dict(zip(keys, values))
+            layer_keys['Type'] = 'ABS'
+
+            file_name = cfg['filename']
+
+        else:
+            msg = 'Not a valid or time enabled layer: {}'.format(layer)
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        self.keys = layer_keys
+        self.filepath = os.path.join(data_basepath, inter_path, file_name)
+        self.dates = get_time_info(cfg)
+
+        srs = osr.SpatialReference()
+        srs.ImportFromWkt(cfg['climate_model']['projection'])
+        self.transformer = Transformer.from_crs(
+            'EPSG:4326', srs.ExportToProj4(), always_xy=True)
+
+
+class ClimateConfig(object):
+    """
+    geomet-climate configuration, reloaded when its file is modified,
+    and the layers resolved from it
+    """
+
+    def __init__(self, filepath):
+        """
+        initializer
+
+        :param filepath: path to geomet-climate YAML configuration
+
+        :returns: `msc_pygeoapi.process.cccs.raster_drill.ClimateConfig`
+        """
+
+        self.filepath = filepath
+        self.mtime = None
+        self.cfg = None
+        self.layers = {}
+        self.lock = threading.Lock()
+
+    def get_layer(self, layer):
+        """
+        get a resolved layer, (re)loading the configuration if its file
+        was modified since it was last loaded
+
+        :param layer: layer name
+
+        :returns: `msc_pygeoapi.process.cccs.raster_drill.LayerInfo`
+        """
+
+        mtime = os.stat(self.filepath).st_mtime_ns
+
+        with self.lock:
+            if mtime != self.mtime:
+                LOGGER.info('Loading {}'.format(self.filepath))
+                with open(self.filepath) as fh:
+                    self.cfg = yaml.load(fh, Loader=CLoader)
+                self.mtime = mtime
+                self.layers = {}
+
+            if layer not in self.layers:
+                if layer not in self.cfg['layers']:
+                    msg = 'Not a valid or time enabled layer: {}'.format(
+                        layer)
+                    LOGGER.error(msg)
+                    raise ValueError(msg)
+                self.layers[layer] = LayerInfo(layer,
+                                               self.cfg['layers'][layer])
+
+            return self.layers[layer]
+
+
+CONFIGS = {}
+CONFIGS_LOCK = threading.Lock()
+
+
+def get_config(filepath):
+    """
+    get the (process-wide) geomet-climate configuration of a file
+
+    :param filepath: path to geomet-climate YAML configuration
+
+    :returns: `msc_pygeoapi.process.cccs.raster_drill.ClimateConfig`
+    """
+
+    with CONFIGS_LOCK:
+        if filepath not in CONFIGS:
+            CONFIGS[filepath] = ClimateConfig(filepath)
+        return CONFIGS[filepath]
+
+
 def raster_drill(layer, x, y, format_):
     """
     Writes the information in the format provided by the user
@@ -419,9 +777,7 @@ def raster_drill(layer, x, y, format_):
     :return: return the final file fo a given location
     """
 
-    from msc_pygeoapi.process.cccs import (GEOMET_CLIMATE_CONFIG,
-                                           GEOMET_CLIMATE_BASEPATH,
-                                           GEOMET_CLIMATE_BASEPATH_VRT)
+    from msc_pygeoapi.process.cccs import GEOMET_CLIMATE_CONFIG
     LOGGER.info('start raster drilling')
 
     if format_ not in ['CSV', 'GeoJSON']:
@@ -429,73 +785,140 @@ def raster_drill(layer, x, y, format_):
         LOGGER.error(msg)
         raise ValueError(msg)
 
-    with open(GEOMET_CLIMATE_CONFIG) as fh:
-        cfg = yaml.load(fh, Loader=CLoader)
+    layer_info = get_config(GEOMET_CLIMATE_CONFIG).get_layer(layer)
+    _x, _y = layer_info.transformer.transform(x, y)
 
-    data_basepath = GEOMET_CLIMATE_BASEPATH
-    climate_model_path = cfg['layers'][layer]['climate_model']['basepath']
-    file_path = cfg['layers'][layer]['filepath']
-    inter_path = os.path.join(climate_model_path, file_path)
+    data = get_location_info(layer_info.filepath, _x, _y, layer_info.cfg,
+                             layer_info.keys, layer_info.dates)
+    output = serialize(data, layer_info.cfg, format_, x, y)
 
-    if ('ABS' in layer or 'ANO' in layer and
-       layer.startswith('CANGRD') is False):
+    return output
 
-        keys = ['Model',
-                'Variable',
-                'Scenario',
-                'Period',
-                'Type',
-                'Percentile']
-        values = layer.replace('_', '.').split('.')
-        layer_keys = dict(zip(keys, values))
 
-        file_name = cfg['layers'][layer]['filename']
+def parse_points(points):
+    """
+    parse the points of a batch drill
 
-    elif 'TREND' not in layer and layer.startswith('CANGRD'):
-        keys = ['Model', 'Type', 'Variable', 'Period']
-        values = layer.replace('_', '.').split('.')
-        layer_keys = dict(zip(keys, values))
+    :param points: list of x/y pairs (or of `x,y` strings)
 
-        data_basepath = GEOMET_CLIMATE_BASEPATH_VRT
-        climate_model_path = cfg['layers'][layer]['climate_model']['basepath']
-        file_path = cfg['layers'][layer]['filepath']
-        inter_path = os.path.join(climate_model_path, file_path)
+    :returns: `list` of (x, y) tuples of floats
+    """
 
-        file_name = '{}.vrt'.format(cfg['layers'][layer]['filename'])
+    points_ = []
 
-    elif layer.startswith('SPEI'):
-        keys = ['Variable', 'Variation', 'Scenario', 'Period', 'Percentile']
-        values = layer.replace('-', '.').replace('_', '.').split('.')
-        layer_keys = dict(zip(keys, values))
-        layer_keys['Type'] = 'ABS'
+    for point in points:
+        if isinstance(point, str):
+            point = point.split(',')
+        try:
+            x, y = point
+            points_.append((float(x), float(y)))
+        except (TypeError, ValueError):
+            msg = 'Invalid point: {}'.format(point)
+            LOGGER.error(msg)
+            raise ValueError(msg)
 
-        file_name = cfg['layers'][layer]['filename']
+    return points_
 
-    elif layer.startswith('INDICES'):
-        keys = ['Model', 'Variable', 'Scenario', 'Percentile']
-        values = layer.replace('_', '.').split('.')
-        layer_keys = dict(zip(keys, values))
-        layer_keys['Type'] = 'ABS'
 
-        file_name = cfg['layers'][layer]['filename']
+def raster_drill_batch(layers, points, format_):
+    """
+    Drills every layer at every point, reading each raster file once
+    (pixels in storage order), and combines the results
 
-    else:
-        msg = 'Not a valid or time enabled layer: {}'.format(layer)
+    :param layers: list of layer names
+    :param points: list of (x, y) coordinates
+    :param format_: output format (GeoJSON or CSV)
+
+    :return: GeoJSON FeatureCollection or CSV of all drills
+    """
+
+    from msc_pygeoapi.process.cccs import GEOMET_CLIMATE_CONFIG
+    LOGGER.info('start batch raster drilling')
+
+    if format_ not in ['CSV', 'GeoJSON']:
+        msg = 'Invalid format'
         LOGGER.error(msg)
         raise ValueError(msg)
 
-    srs = osr.SpatialReference()
-    srs.ImportFromWkt(cfg['layers'][layer]['climate_model']['projection'])
-    inProj = Proj(init='epsg:4326')
-    outProj = Proj(srs.ExportToProj4())
-    _x, _y = transform(inProj, outProj, x, y)
+    if not layers or not points:
+        msg = 'At least one layer and one point are required'
+        LOGGER.error(msg)
+        raise ValueError(msg)
 
-    ds = os.path.join(data_basepath, inter_path, file_name)
+    if len(layers) * len(points) > MAX_DRILLS:
+        msg = 'Too many drills: {} layers x {} points (max {})'.format(
+            len(layers), len(points), MAX_DRILLS)
+        LOGGER.error(msg)
+        raise ValueError(msg)
 
-    data = get_location_info(ds, _x, _y, cfg['layers'][layer], layer_keys)
-    output = serialize(data, cfg['layers'][layer], format_, x, y)
+    config = get_config(GEOMET_CLIMATE_CONFIG)
+    layer_infos = [config.get_layer(layer) for layer in layers]
+
+    files = OrderedDict()
+    for i, layer_info in enumerate(layer_infos):
+        files.setdefault(layer_info.filepath, []).append(i)
+
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    values = {}
+
+    for file_, indexes in files.items():
+        handle = open_dataset(file_)
+
+        with handle.lock:
+            ds = handle.dataset
+
+            # drills (layer and point indexes) of each pixel
+            pixels = {}
+            for i in indexes:
+                _xs, _ys = layer_infos[i].transformer.transform(xs, ys)
+                for j, (_x, _y) in enumerate(zip(_xs, _ys)):
+                    x_, y_ = geo2xy(ds, _x, _y)
+                    pixels.setdefault((y_, x_), []).append((i, j))
+
+            LOGGER.debug('Reading {} pixels of {}'.format(len(pixels), file_))
+            # row by row, as blocks are stored
+            for y_, x_ in sorted(pixels):
+                pixel_values = read_pixel(ds, x_, y_)
+                for drill in pixels[(y_, x_)]:
+                    values[drill] = pixel_values
+
+    outputs = []
+    for i, layer_info in enumerate(layer_infos):
+        for j, (x, y) in enumerate(points):
+            data = get_location_metadata(layer_info.cfg, layer_info.keys,
+                                         layer_info.dates)
+            data['values'] = values[(i, j)] or []
+            output = serialize(data, layer_info.cfg, format_, x, y)
+            if output is None:
+                LOGGER.warning('No values for {} at {}/{}'.format(
+                    layers[i], x, y))
+                continue
+            outputs.append((layers[i], output))
 
-    return output
+    if format_ == 'GeoJSON':
+        features = []
+        for layer, feature in outputs:
+            feature['properties']['layer'] = layer
+            features.append(feature)
+
+        return {
+            'type': 'FeatureCollection',
+            'features': features
+        }
+
+    data = io.StringIO()
+    writer = csv.writer(data)
+    for i, (layer, output) in enumerate(outputs):
+        rows = csv.reader(io.StringIO(output.getvalue()))
+        header = next(rows)
+        if i == 0:
+            # time steps differ between layers: a single time column
+            writer.writerow(['layer', 'time'] + header[1:])
+        for row in rows:
+            writer.writerow([layer] + row)
+
+    return data
 
 
 @click.group('execute')
@@ -505,14 +928,31 @@ def raster_drill_execute():
 
 @click.command('raster-drill')
 @click.pass_context
-@click.option('--layer', help='Layer name to process', required=True)
-@click.option('--x', help='x coordinate', required=True)
-@click.option('--y', help='y coordinate', required=True)
+@click.option('--layer', help='Layer name to process (repeat for a batch'
+              ' drill)', required=True, multiple=True)
+@click.option('--x', help='x coordinate')
+@click.option('--y', help='y coordinate')
+@click.option('--point', 'points', multiple=True,
+              help='x,y coordinates (repeat for a batch drill)')
 @click.option('--format', 'format_', type=click.Choice(['GeoJSON', 'CSV']),
               default='GeoJSON', help='output format')
-def raster_drill_cli(ctx, layer, x, y, format_='GeoJSON'):
+def raster_drill_cli(ctx, layer, x, y, points, format_='GeoJSON'):
+
+    if x is not None and y is not None:
+        points = ('{},{}'.format(x, y),) + points
+    if not points:
+        raise click.UsageError('Missing --x/--y or --point')
 
-    output = raster_drill(layer, float(x), float(y), format_)
+    try:
+        points_ = parse_points(points)
+    except ValueError as err:
+        raise click.BadParameter(str(err), param_hint='--point')
+
+    if len(layer) == 1 and len(points_) == 1:
+        output = raster_drill(layer[0], points_[0][0], points_[0][1],
+                              format_)
+    else:
+        output = raster_drill_batch(list(layer), points_, format_)
     if format_ == 'GeoJSON':
         click.echo(json.dumps(output, ensure_ascii=False))
     elif format_ == 'CSV':
@@ -539,13 +979,19 @@ try:
             BaseProcessor.__init__(self, provider_def, PROCESS_METADATA)
 
         def execute(self, data):
-            layer = data['layer']
-            x = float(data['x'])
-            y = float(data['y'])
             format_ = data['format']
 
             try:
-                output = raster_drill(layer, x, y, format_)
+                if 'layers' in data or 'points' in data:
+                    layers = data.get('layers') or [data['layer']]
+                    points = parse_points(
+                        data.get('points') or [(data['x'], data['y'])])
+                    output = raster_drill_batch(layers, points, format_)
+                else:
+                    layer = data['layer']
+                    x = float(data['x'])
+                    y = float(data['y'])
+                    output = raster_drill(layer, x, y, format_)
             except ValueError as err:
                 msg = 'Process execution error: {}'.format(err)
                 LOGGER.error(msg)
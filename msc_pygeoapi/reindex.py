@@ -0,0 +1,231 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+# Archive loaders build each reload into a new generation of an index
+# (<alias>_<YYYYmmddHHMMSS>) tuned for bulk indexing, then atomically point
+# the alias served by pygeoapi at it, so collections are never empty or
+# partial while a reload runs.
+
+from copy import deepcopy
+from datetime import datetime
+import logging
+import re
+
+LOGGER = logging.getLogger(__name__)
+
+# bulk indexing settings of a generation being built
+BUILD_SETTINGS = {
+    'refresh_interval': '-1',
+    'number_of_replicas': 0
+}
+
+# previous generations kept (for rollback) after an alias swap
+KEEP_GENERATIONS = 1
+
+FORCEMERGE_TIMEOUT = 3600
+
+
+class IndexGeneration(object):
+    """new generation of an index served through an alias"""
+
+    def __init__(self, es, alias, body, version=None):
+        """
+        initializer
+
+        :param es: `elasticsearch.Elasticsearch` object
+        :param alias: alias (i.e. name used by readers and documents)
+        :param body: `dict` of index settings and mappings
+        :param version: generation version (default: current UTC time)
+
+        :returns: `msc_pygeoapi.reindex.IndexGeneration`
+        """
+
+        if version is None:
+            version = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+
+        self.es = es
+        self.alias = alias
+        self.name = '{}_{}'.format(alias, version)
+        self.body = body
+
+        settings = body.get('settings', {})
+        self.settings = {key: settings.get(key) for key in BUILD_SETTINGS}
+
+    def create(self):
+        """
+        create the index with bulk indexing settings
+
+        :returns: `msc_pygeoapi.reindex.IndexGeneration`
+        """
+
+        body = deepcopy(self.body)
+        body.setdefault('settings', {}).update(BUILD_SETTINGS)
+
+        self.es.indices.create(index=self.name, body=body)
+        LOGGER.info('Created index {}'.format(self.name))
+
+        return self
+
+    def resume(self):
+        """
+        reuse the index of this generation left by an interrupted load,
+        creating it if missing
+
+        :returns: `msc_pygeoapi.reindex.IndexGeneration`
+        """
+
+        if not self.es.indices.exists(index=self.name):
+            LOGGER.warning('Index {} not found'.format(self.name))
+            return self.create()
+
+        LOGGER.info('Resuming load into index {}'.format(self.name))
+
+        return self
+
+    @property
+    def version(self):
+        """generation version (i.e. suffix of the index name)"""
+
+        return self.name[len(self.alias) + 1:]
+
+    def publish(self):
+        """
+        optimize the index, restore its settings, point the alias at it
+        and delete old generations
+
+        :returns: void
+        """
+
+        LOGGER.info('Force merging index {}'.format(self.name))
+        self.es.indices.forcemerge(index=self.name, max_num_segments=1,
+                                   request_timeout=FORCEMERGE_TIMEOUT)
+
+        # None resets a setting to its default
+        self.es.indices.put_settings(index=self.name,
+                                     body={'index': self.settings})
+        self.es.indices.refresh(index=self.name)
+
+        actions = [{'add': {'index': self.name, 'alias': self.alias}}]
+
+        if self.es.indices.exists_alias(name=self.alias):
+            for index in self.es.indices.get_alias(name=self.alias):
+                actions.append({'remove': {'index': index,
+                                           'alias': self.alias}})
+        elif self.es.indices.exists(index=self.alias):
+            # index created before loaders used aliases
+            actions.append({'remove_index': {'index': self.alias}})
+
+        self.es.indices.update_aliases(body={'actions': actions})
+        LOGGER.info('Alias {} now points to {}'.format(self.alias,
+                                                       self.name))
+
+        self.delete_old_generations()
+
+    def abort(self):
+        """
+        delete the index, leaving the alias untouched
+
+        :returns: void
+        """
+
+        LOGGER.warning('Discarding index {}'.format(self.name))
+        self.es.indices.delete(index=self.name, ignore_unavailable=True)
+
+    def delete_old_generations(self, keep=KEEP_GENERATIONS):
+        """
+        delete generations older than the `keep` most recent ones not
+        served by the alias (including those of aborted or failed loads)
+
+        :param keep: number of previous generations to keep
+
+        :returns: `list` of deleted index names
+        """
+
+        pattern = re.compile(r'^{}_\d{{14}}$'.format(re.escape(self.alias)))
+
+        indexes = self.es.indices.get_alias(
+            index='{}_*'.format(self.alias))
+        generations = sorted(
+            (index for index, info in indexes.items()
+             if pattern.match(index) and index != self.name and
+             self.alias not in info.get('aliases', {})),
+            reverse=True)
+
+        deleted = generations[keep:]
+        for index in deleted:
+            LOGGER.info('Deleting old index {}'.format(index))
+            self.es.indices.delete(index=index)
+
+        return deleted
+
+    def __repr__(self):
+        return '<IndexGeneration> {}'.format(self.name)
+
+
+def retarget(actions, generations):
+    """
+    point bulk actions addressed to aliases at the generations being built
+
+    :param actions: iterable of bulk API actions
+    :param generations: `list` of `msc_pygeoapi.reindex.IndexGeneration`
+
+    :returns: generator of bulk API actions
+    """
+
+    names = {generation.alias: generation.name for generation in generations}
+
+    for action in actions:
+        if action.get('_index') in names:
+            action['_index'] = names[action['_index']]
+        yield action
+
+
+def publish_generations(generations, success=True, discard=True):
+    """
+    publish generations after a load, or discard them if it failed
+
+    :param generations: `list` of `msc_pygeoapi.reindex.IndexGeneration`
+    :param success: whether the load succeeded
+    :param discard: whether to delete the generations of a failed load
+                    (`False` keeps them for a resumed load)
+
+    :returns: `bool` of whether generations were published
+    """
+
+    if not success:
+        LOGGER.error('Load failed, keeping previous indexes')
+        if discard:
+            for generation in generations:
+                generation.abort()
+        return False
+
+    for generation in generations:
+        generation.publish()
+
+    return True
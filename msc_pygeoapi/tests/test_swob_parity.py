@@ -0,0 +1,84 @@
+# =================================================================
+#
+# Author: Tom Kralidis <tom.kralidis@canada.ca>
+#
+# Copyright (c) 2020 Tom Kralidis
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# =================================================================
+
+import glob
+import json
+import os
+import unittest
+
+from msc_pygeoapi.loader.swob_realtime import (swob2geojson,
+                                               swob2geojson_or_none)
+
+THISDIR = os.path.dirname(os.path.realpath(__file__))
+SWOB_DIR = os.path.join(THISDIR, 'data', 'swob')
+
+
+class SWOBParityTest(unittest.TestCase):
+    """Check SWOB-ML parsing against GeoJSON from the original parser"""
+
+    def test_swob2geojson(self):
+        """GeoJSON output is byte-identical to the recorded output"""
+
+        expected_files = sorted(glob.glob(os.path.join(SWOB_DIR,
+                                                       '*.geojson')))
+        self.assertTrue(expected_files)
+
+        for expected_file in expected_files:
+            swob_file = expected_file.replace('.geojson', '.xml')
+            with self.subTest(swob_file=os.path.basename(swob_file)):
+                with open(expected_file, encoding='utf-8') as fh:
+                    expected = json.load(fh)
+
+                feature = swob2geojson(swob_file)
+
+                self.assertEqual(feature, expected)
+                self.assertEqual(json.dumps(feature), json.dumps(expected))
+
+    def test_data_flag_without_code_src(self):
+        """A data flag without code-src is rejected, as before"""
+
+        swob_file = os.path.join(SWOB_DIR,
+                                 '2020-10-10-1300-CZZZ-AUTO-swob.xml')
+
+        with self.assertRaises(KeyError):
+            swob2geojson(swob_file)
+
+        with self.assertLogs('msc_pygeoapi.loader.swob_realtime',
+                             level='WARNING'):
+            self.assertIsNone(swob2geojson_or_none(swob_file))
+
+    def test_unparseable_file(self):
+        """Missing files raise RuntimeError"""
+
+        with self.assertRaises(RuntimeError):
+            swob2geojson(os.path.join(SWOB_DIR, 'missing-swob.xml'))
+
+
+if __name__ == '__main__':
+    unittest.main()
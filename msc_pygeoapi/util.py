@@ -30,17 +30,23 @@
 from datetime import datetime, date, time
 import json
 import logging
+import os
 from urllib.parse import urlparse
 
 from elasticsearch import Elasticsearch
 from elasticsearch.helpers import streaming_bulk, BulkIndexError
 
+from msc_pygeoapi.metrics import BulkTimer
+
 LOGGER = logging.getLogger(__name__)
 
 VERIFY = False
 
 DATETIME_RFC3339_FMT = '%Y-%m-%dT%H:%M:%SZ'
 
+# process-lifetime Elasticsearch clients, keyed by (pid, url, auth)
+_ES_CLIENTS = {}
+
 
 def get_es(url, auth=None):
     """
@@ -85,7 +91,28 @@ def get_es(url, auth=None):
     return es
 
 
-def submit_elastic_package(es, package, request_size=10000):
+def get_shared_es(url, auth=None):
+    """
+    helper function to return a process-wide Elasticsearch connection,
+    instantiating (and pinging) it only on first use
+
+    :param url: URL of ES endpoint
+    :param auth: HTTP username-password tuple for authentication (optional)
+    :returns: `elasticsearch.Elasticsearch` object
+    """
+
+    # keyed by PID so that forked workers never reuse a parent connection
+    key = (os.getpid(), url, auth)
+
+    if key not in _ES_CLIENTS:
+        LOGGER.debug('Creating shared Elasticsearch connection')
+        _ES_CLIENTS[key] = get_es(url, auth)
+
+    return _ES_CLIENTS[key]
+
+
+def submit_elastic_package(es, package, request_size=10000, plugin=None,
+                           on_result=None):
     """
     Helper function to send an update request to Elasticsearch and
     log the status of the request. Returns True iff the upload succeeded.
@@ -93,6 +120,10 @@ def submit_elastic_package(es, package, request_size=10000):
     :param es: Elasticsearch client object.
     :param package: Iterable of bulk API update actions.
     :param request_size: Number of documents to upload per request.
+    :param plugin: plugin name under which stage timings are recorded
+                   (optional)
+    :param on_result: function called with the (ok, response) result of
+                      each action, in order (optional)
     :returns: `bool` of whether the operation was successful.
     """
 
@@ -101,11 +132,18 @@ def submit_elastic_package(es, package, request_size=10000):
     noops = 0
     errors = []
 
+    if plugin is not None:
+        bulk_timer = BulkTimer(plugin)
+        es = bulk_timer.client(es)
+        package = bulk_timer.actions(package)
+
     try:
         for ok, response in streaming_bulk(es, package,
                                            chunk_size=request_size,
                                            request_timeout=30,
                                            raise_on_error=False):
+            if on_result is not None:
+                on_result(ok, response)
             if not ok:
                 errors.append(response)
             else:
@@ -124,6 +162,9 @@ def submit_elastic_package(es, package, request_size=10000):
         LOGGER.error('Unable to perform bulk insert due to: {}'
                      .format(err.errors))
         return False
+    finally:
+        if plugin is not None:
+            bulk_timer.close()
 
     total = inserts + updates + noops
     LOGGER.info('Inserted package of {} observations ({} inserts, {} updates,'